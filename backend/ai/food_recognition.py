@@ -1,132 +1,110 @@
 # AI Yemek Tanıma - TensorFlow Lite
 
-import numpy as np
-try:
-    import tflite_runtime.interpreter as tflite
-except ImportError:
-    try:
-        import tensorflow.lite as tflite
-    except ImportError:
-        tflite = None
-        print("[Mock] TensorFlow Lite bulunamadı - simülasyon modu")
+import os
 from PIL import Image
 import random
-from config import MODEL_PATH, LABELS_PATH, CONFIDENCE_THRESHOLD, INPUT_SIZE
+from ai.model_registry import BACKEND_DIR
+from ai.predictor import load_labels
+from ai.inference_executor import InferenceQueueFull
+from config import LABELS_PATH, CONFIDENCE_THRESHOLD
 
 class FoodRecognizer:
-    def __init__(self):
-        self.interpreter = None
+    def __init__(self, predictor=None):
+        """
+        Args:
+            predictor: Paylaşılan TFLitePredictor veya InferenceExecutor
+                       (None ise simülasyon modu)
+        """
+        self.predictor = predictor
         self.labels = []
-        self.input_details = None
-        self.output_details = None
-        self.load_model()
-    
-    def load_model(self):
-        """TFLite modelini yükle"""
+        self.load_labels()
+
+    def load_labels(self):
+        """Etiketleri paylaşılan modelden al (model yoksa dosyadan oku)"""
+        if self.predictor is not None:
+            self.labels = list(self.predictor.class_names.values())
+            return
+
+        print("[Mock] Model simülasyon modunda")
         try:
-            if tflite is None:
-                raise ImportError("TFLite yok")
-            
-            self.interpreter = tflite.Interpreter(model_path=MODEL_PATH)
-            self.interpreter.allocate_tensors()
-            
-            self.input_details = self.interpreter.get_input_details()
-            self.output_details = self.interpreter.get_output_details()
-            
-            with open(LABELS_PATH, 'r', encoding='utf-8') as f:
-                self.labels = [line.strip() for line in f.readlines()]
-            
-            print(f"Model yüklendi: {len(self.labels)} sınıf")
-        except Exception as e:
-            print(f"[Mock] Model simülasyon modunda: {e}")
-            try:
-                with open(LABELS_PATH, 'r', encoding='utf-8') as f:
-                    self.labels = [line.strip() for line in f.readlines()]
-            except:
-                self.labels = ['bulgur_pilavi', 'tavuk_izgara', 'omlet']
-    
-    def preprocess_image(self, image):
-        """Görüntüyü model için hazırla"""
-        if isinstance(image, np.ndarray):
-            image = Image.fromarray(image)
-        
-        image = image.resize(INPUT_SIZE)
-        image = image.convert('RGB')
-        
-        input_data = np.array(image, dtype=np.float32)
-        input_data = np.expand_dims(input_data, axis=0)
-        input_data = input_data / 255.0
-        
-        return input_data
-    
+            self.labels = [name for name in load_labels(os.path.join(BACKEND_DIR, LABELS_PATH)) if name]
+        except:
+            self.labels = ['bulgur_pilavi', 'tavuk_izgara', 'omlet']
+
+    def _mock_recognize(self):
+        """Model yokken rastgele yemek seç"""
+        print("[Mock] Rastgele yemek seçiliyor...")
+        if self.labels:
+            food_name = random.choice(self.labels)
+            confidence = random.uniform(0.75, 0.95)
+            return food_name, confidence
+        return None, 0.0
+
+    def _select(self, predictions):
+        """En yüksek tahmini güven eşiğine göre değerlendir"""
+        food_name, confidence = predictions.top()
+
+        if confidence >= CONFIDENCE_THRESHOLD:
+            return food_name, confidence
+        else:
+            return None, confidence
+
     def recognize(self, image):
         """Yemek tanı"""
-        if self.interpreter is None:
-            print("[Mock] Rastgele yemek seçiliyor...")
-            if self.labels:
-                food_name = random.choice(self.labels)
-                confidence = random.uniform(0.75, 0.95)
-                return food_name, confidence
+        if self.predictor is None:
+            return self._mock_recognize()
+
+        try:
+            return self._select(self.predictor.predict(image, top_k=1))
+        except Exception as e:
+            print(f"Tanıma hatası: {e}")
             return None, 0.0
-        
+
+    async def recognize_async(self, image):
+        """Yemek tanı (InferenceExecutor ile, event loop'u bloklamadan)"""
+        if self.predictor is None:
+            return self._mock_recognize()
+
         try:
-            input_data = self.preprocess_image(image)
-            
-            self.interpreter.set_tensor(self.input_details[0]['index'], input_data)
-            self.interpreter.invoke()
-            
-            output_data = self.interpreter.get_tensor(self.output_details[0]['index'])
-            predictions = output_data[0]
-            
-            top_idx = np.argmax(predictions)
-            confidence = float(predictions[top_idx])
-            
-            if confidence >= CONFIDENCE_THRESHOLD:
-                food_name = self.labels[top_idx]
-                return food_name, confidence
-            else:
-                return None, confidence
-        
+            return self._select(await self.predictor.predict_async(image, top_k=1))
+        except InferenceQueueFull:
+            raise
         except Exception as e:
             print(f"Tanıma hatası: {e}")
             return None, 0.0
-    
+
     def get_top_predictions(self, image, top_k=3):
         """En yüksek olasılıklı tahminleri getir"""
-        if self.interpreter is None:
+        if self.predictor is None:
             return []
-        
+
         try:
-            input_data = self.preprocess_image(image)
-            
-            self.interpreter.set_tensor(self.input_details[0]['index'], input_data)
-            self.interpreter.invoke()
-            
-            output_data = self.interpreter.get_tensor(self.output_details[0]['index'])
-            predictions = output_data[0]
-            
-            top_indices = np.argsort(predictions)[-top_k:][::-1]
-            
-            results = []
-            for idx in top_indices:
-                results.append({
-                    'name': self.labels[idx],
-                    'confidence': float(predictions[idx])
-                })
-            
-            return results
-        
+            predictions = self.predictor.predict(image, top_k=top_k)
+            return [
+                {'name': name, 'confidence': confidence}
+                for name, confidence in zip(predictions.names, predictions.confidences.tolist())
+            ]
+
         except Exception as e:
             print(f"Tahmin hatası: {e}")
             return []
 
 # Test fonksiyonu
 if __name__ == "__main__":
-    recognizer = FoodRecognizer()
-    
+    from ai.model_registry import ModelRegistry
+    from config import MODEL_PATH
+
+    try:
+        predictor = ModelRegistry().load(MODEL_PATH, LABELS_PATH)
+    except Exception as e:
+        print(f"Model yüklenemedi: {e}")
+        predictor = None
+
+    recognizer = FoodRecognizer(predictor)
+
     test_image = Image.new('RGB', (224, 224), color='red')
     food, confidence = recognizer.recognize(test_image)
-    
+
     if food:
         print(f"Tanınan yemek: {food} (%{confidence*100:.1f})")
     else:
@@ -0,0 +1,211 @@
+# AI Çıkarım Havuzu - Event loop'u bloklamadan model çalıştırma
+#
+# Her worker thread kendi interpreter kopyasına sahiptir (TFLite interpreter
+# thread-safe değil). İş kuyruğu sınırlıdır; dolduğunda yeni işler beklemek
+# yerine InferenceQueueFull ile reddedilir.
+#
+# paused() çalışan işlerin bitmesini bekler ve worker'ları durdurur (örn. benchmark
+# ölçümleri CPU'yu çıkarımla paylaşmasın); bu sürede işler kuyrukta bekler.
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+
+class InferenceQueueFull(Exception):
+    """Çıkarım kuyruğu dolu - istemci daha sonra tekrar denemeli"""
+
+
+class InferenceJob:
+    __slots__ = ("fn", "args", "kwargs", "future", "submitted_at")
+
+    def __init__(self, fn, args, kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.submitted_at = time.time()
+
+
+def _predict(predictor, image_data, top_k):
+    return predictor.predict(image_data, top_k=top_k)
+
+
+def _predict_batch(predictor, images, top_k, aggregate):
+    return predictor.predict_batch(images, top_k=top_k, aggregate=aggregate)
+
+
+def _predict_tta(predictor, image_data, views, top_k, center_crop):
+    return predictor.predict_tta(image_data, views, top_k=top_k, center_crop=center_crop)
+
+
+class InferenceExecutor:
+    def __init__(self, predictor, num_workers=2, max_queue=4):
+        """
+        Args:
+            predictor: Paylaşılan TFLitePredictor (ilk worker bunu kullanır, diğerleri kopyasını)
+            num_workers: Worker thread sayısı
+            max_queue: Bekleyen en fazla iş sayısı (çalışanlar hariç)
+        """
+        self.predictor = predictor
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.max_queue = max_queue
+        self.workers = []
+
+        self.stats_lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.busy = 0
+        self.total_wait_time = 0.0
+        self.total_run_time = 0.0
+
+        # Duraklatma: worker'lar iş başlatmadan önce kapıdan geçer
+        self.gate = threading.Condition()
+        self.pausing = False
+        self.running = 0
+
+        for i in range(num_workers):
+            worker_predictor = predictor if i == 0 else predictor.clone()
+            worker = threading.Thread(
+                target=self._worker_loop,
+                args=(worker_predictor,),
+                name=f"inference-{i}",
+                daemon=True
+            )
+            worker.start()
+            self.workers.append(worker)
+
+        print(f"[Inference] {num_workers} worker başlatıldı (kuyruk: {max_queue})")
+
+    # Paylaşılan predictor bilgileri (etiketler, model adı)
+    @property
+    def model_name(self):
+        return self.predictor.model_name
+
+    @property
+    def class_names(self):
+        return self.predictor.class_names
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        İşi kuyruğa ekle: fn(worker_predictor, *args, **kwargs)
+
+        Returns:
+            concurrent.futures.Future
+
+        Raises:
+            InferenceQueueFull: Kuyruk doluysa
+        """
+        job = InferenceJob(fn, args, kwargs)
+        try:
+            self.queue.put_nowait(job)
+        except queue.Full:
+            with self.stats_lock:
+                self.rejected += 1
+            raise InferenceQueueFull("Çıkarım kuyruğu dolu")
+        return job.future
+
+    async def run_async(self, fn, *args, **kwargs):
+        """submit() sonucunu event loop'u bloklamadan bekle"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def predict(self, image_data, top_k=5):
+        """Tahmin yap (çağıran thread sonucu bekler)"""
+        return self.submit(_predict, image_data, top_k).result()
+
+    async def predict_async(self, image_data, top_k=5):
+        """Tahmin yap (await edilebilir)"""
+        return await self.run_async(_predict, image_data, top_k)
+
+    async def predict_batch_async(self, images, top_k=5, aggregate=True):
+        """Birden fazla görüntüyü tek iş (ve tek invoke) olarak tahmin et"""
+        return await self.run_async(_predict_batch, images, top_k, aggregate)
+
+    async def predict_tta_async(self, image_data, views, top_k=5, center_crop=0.8):
+        """Görüntünün kırpma/ayna görünümleriyle tahmin et (bkz. TFLitePredictor.predict_tta)"""
+        return await self.run_async(_predict_tta, image_data, views, top_k, center_crop)
+
+    @contextmanager
+    def paused(self):
+        """Blok süresince iş çalıştırma (çalışan işler bitene kadar bekler)"""
+        with self.gate:
+            while self.pausing:
+                self.gate.wait()
+            self.pausing = True
+            while self.running:
+                self.gate.wait()
+        try:
+            yield
+        finally:
+            with self.gate:
+                self.pausing = False
+                self.gate.notify_all()
+
+    def _worker_loop(self, predictor):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                break
+            with self.gate:
+                while self.pausing:
+                    self.gate.wait()
+                self.running += 1
+            try:
+                self._run_job(predictor, job)
+            finally:
+                with self.gate:
+                    self.running -= 1
+                    self.gate.notify_all()
+
+    def _run_job(self, predictor, job):
+        if not job.future.set_running_or_notify_cancel():
+            return
+
+        started = time.time()
+        with self.stats_lock:
+            self.busy += 1
+            self.total_wait_time += started - job.submitted_at
+
+        try:
+            result = job.fn(predictor, *job.args, **job.kwargs)
+        except Exception as e:
+            job.future.set_exception(e)
+            with self.stats_lock:
+                self.failed += 1
+        else:
+            job.future.set_result(result)
+            with self.stats_lock:
+                self.completed += 1
+        finally:
+            with self.stats_lock:
+                self.busy -= 1
+                self.total_run_time += time.time() - started
+
+    def shutdown(self):
+        """Worker'ları durdur (kuyruktaki işler bitirilir)"""
+        for _ in self.workers:
+            self.queue.put(None)
+        for worker in self.workers:
+            worker.join(timeout=5)
+        self.workers = []
+
+    def get_stats(self):
+        """Havuz istatistikleri"""
+        with self.stats_lock:
+            finished = self.completed + self.failed
+            return {
+                "workers": len(self.workers),
+                "busy": self.busy,
+                "paused": self.pausing,
+                "queued": self.queue.qsize(),
+                "max_queue": self.max_queue,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.total_wait_time / finished * 1000, 1) if finished else 0.0,
+                "avg_run_ms": round(self.total_run_time / finished * 1000, 1) if finished else 0.0
+            }
@@ -0,0 +1,121 @@
+# AI Model Benchmark - Cihaza göre en hızlı interpreter ayarını bulma
+#
+# Her thread/delegate kombinasyonu için ayrı bir interpreter oluşturur, boş bir
+# girişle invoke() süresini ölçer ve sonuçları data/ altına kaydeder.
+
+import json
+import os
+import platform
+import statistics
+import time
+from datetime import datetime
+import numpy as np
+from ai.predictor import create_interpreter, op_resolver_type
+
+
+def benchmark_options(model_content, options, runs=10, warmup=2):
+    """
+    Tek bir ayar için invoke gecikmesini ölç
+
+    Returns:
+        {"options", "median_ms", "min_ms", "max_ms"} veya hata durumunda {"options", "error"}
+    """
+    if options.get("delegate") == "none" and op_resolver_type() is None:
+        # create_interpreter XNNPACK'e dönerdi: ölçüm "none" adıyla XNNPACK olurdu
+        return {"options": options, "error": "Bu TFLite sürümünde delegate'siz çalıştırma yok"}
+    try:
+        interpreter, used_options = create_interpreter(model_content, options)
+        if used_options.get("delegate") != options.get("delegate"):
+            return {"options": options, "error": "Delegate yüklenemedi"}
+
+        input_details = interpreter.get_input_details()[0]
+        dummy = np.zeros(input_details['shape'], dtype=input_details['dtype'])
+
+        timings = []
+        for i in range(warmup + runs):
+            interpreter.set_tensor(input_details['index'], dummy)
+            start = time.perf_counter()
+            interpreter.invoke()
+            elapsed = (time.perf_counter() - start) * 1000
+            if i >= warmup:
+                timings.append(elapsed)
+
+        return {
+            "options": options,
+            "median_ms": round(statistics.median(timings), 2),
+            "min_ms": round(min(timings), 2),
+            "max_ms": round(max(timings), 2)
+        }
+    except Exception as e:
+        return {"options": options, "error": f"{type(e).__name__}: {e}"}
+
+
+def run_benchmark(predictor, thread_counts, delegates, runs=10, external_delegate_path=None):
+    """
+    Tüm thread/delegate kombinasyonlarını ölç, en hızlıdan yavaşa sırala
+
+    Args:
+        predictor: TFLitePredictor (model içeriği buradan alınır)
+        thread_counts: Denenecek thread sayıları (örn. [1, 2, 4])
+        delegates: Denenecek delegate'ler (örn. ["xnnpack", "none"])
+        runs: Ayar başına ölçüm sayısı
+        external_delegate_path: "external" delegate için kütüphane yolu
+    """
+    results = []
+    for delegate in delegates:
+        if delegate == "external" and not external_delegate_path:
+            continue
+        for num_threads in thread_counts:
+            options = {"num_threads": num_threads, "delegate": delegate}
+            if delegate == "external":
+                options["external_delegate_path"] = external_delegate_path
+            result = benchmark_options(predictor.model_content, options, runs=runs)
+            print(f"[Benchmark] {options} -> {result.get('median_ms', result.get('error'))}")
+            results.append(result)
+
+    results.sort(key=lambda r: r.get("median_ms", float("inf")))
+    return results
+
+
+def save_results(results_path, model_name, results):
+    """Sonuçları model ve cihaz bilgisiyle kaydet"""
+    try:
+        with open(results_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except Exception:
+        data = {}
+
+    data[model_name] = {
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": datetime.now().isoformat(),
+        "results": results
+    }
+
+    with open(results_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def load_results(results_path, model_name):
+    """Kayıtlı benchmark sonuçlarını getir (yoksa None)"""
+    try:
+        with open(results_path, 'r', encoding='utf-8') as f:
+            return json.load(f).get(model_name)
+    except Exception:
+        return None
+
+
+def best_options(results):
+    """Hatasız en hızlı ayar (yoksa None)"""
+    for result in results:
+        if "median_ms" in result:
+            return result["options"]
+    return None
+
+
+def load_best_options(results_path, model_name):
+    """Bu cihazda bu model için kaydedilmiş en hızlı ayar (yoksa None)"""
+    recorded = load_results(results_path, model_name)
+    if not recorded or recorded.get("machine") != platform.machine():
+        return None
+    return best_options(recorded.get("results", []))
@@ -0,0 +1,82 @@
+# AI Model Kaydı - Her model bir kez yüklenir, tüm endpoint'ler paylaşır
+
+import os
+import threading
+from ai.predictor import TFLitePredictor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ModelRegistry:
+    """Yüklü modelleri (interpreter + etiketler + ön işleme ayarları) tutar"""
+
+    def __init__(self, base_dir=BACKEND_DIR):
+        self.base_dir = base_dir
+        self.predictors = {}
+        self.lock = threading.Lock()
+
+    def resolve_path(self, path):
+        """Göreli yolları backend dizinine göre çöz"""
+        if os.path.isabs(path):
+            return path
+        return os.path.join(self.base_dir, path)
+
+    def load(self, model_path, labels_path, interpreter_options=None, max_batch=8):
+        """
+        Modeli yükle (daha önce yüklendiyse aynı nesneyi döndür)
+
+        Args:
+            model_path: TFLite model dosyası
+            labels_path: class_indices.json veya labels.txt
+            interpreter_options: Thread/delegate ayarları (ilk yüklemede kullanılır)
+            max_batch: Tek invoke() içinde en fazla görüntü
+
+        Returns:
+            TFLitePredictor
+        """
+        model_path = self.resolve_path(model_path)
+        labels_path = self.resolve_path(labels_path)
+        key = (model_path, labels_path)
+
+        with self.lock:
+            predictor = self.predictors.get(key)
+            if predictor is None:
+                print(f"🔍 Model yolu: {model_path}")
+                print(f"🔍 Etiket yolu: {labels_path}")
+                predictor = TFLitePredictor(model_path, labels_path, interpreter_options, max_batch)
+                self.predictors[key] = predictor
+            return predictor
+
+    def load_variant(self, variants, variant, labels_path, fallback=None, interpreter_options=None, max_batch=8):
+        """
+        Yapılandırmadaki model varyantlarından birini yükle
+
+        Args:
+            variants: {"varyant_adı": model_yolu}
+            variant: Tercih edilen varyant (örn. "int8")
+            labels_path: class_indices.json veya labels.txt
+            fallback: Tercih edilen yüklenemezse denenecek varyant
+            interpreter_options: Thread/delegate ayarları
+            max_batch: Tek invoke() içinde en fazla görüntü
+        """
+        try:
+            return self.load(variants[variant], labels_path, interpreter_options, max_batch)
+        except Exception as e:
+            if fallback is None or fallback == variant:
+                raise
+            print(f"⚠️ '{variant}' modeli yüklenemedi ({e}), '{fallback}' kullanılıyor")
+            return self.load(variants[fallback], labels_path, interpreter_options, max_batch)
+
+    def get_loaded_models(self):
+        """Yüklü modellerin listesi"""
+        return [
+            {
+                "model": predictor.model_name,
+                "input_size": predictor.input_size,
+                "input_dtype": predictor.input_dtype.__name__,
+                "interpreter": predictor.interpreter_options,
+                "max_batch": predictor.max_batch,
+                "classes": len(predictor.class_names)
+            }
+            for predictor in self.predictors.values()
+        ]
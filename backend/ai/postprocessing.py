@@ -0,0 +1,167 @@
+# AI Son İşleme - Olasılık vektöründen top-K sonuç ve besin değerleri
+#
+# Sınıf isimleri ve 100g besin değerleri sınıf indeksine hizalı numpy dizilerinde
+# tutulur. Top-K kısmi seçimle (argpartition) bulunur, sonuç endpoint'te tek
+# seferde JSON'a çevrilir.
+
+import numpy as np
+
+# 100g başına besin alanları (datas.json: carbohydrate, foods.json: carb)
+NUTRIENT_FIELDS = ("calorie", "protein", "carbohydrate", "sugar", "fat")
+
+# Besin değeri bulunamayan sınıflar için varsayılan 100g değerleri
+DEFAULT_NUTRITION = {"calorie": 150, "protein": 5.0, "carbohydrate": 20.0, "sugar": 5.0}
+
+
+class TopKResult:
+    """Top-K tahmin: sınıf indeksleri ve güven skorları (büyükten küçüğe)"""
+
+    __slots__ = ("indices", "confidences", "postprocessor")
+
+    def __init__(self, indices, confidences, postprocessor):
+        self.indices = indices
+        self.confidences = confidences
+        self.postprocessor = postprocessor
+
+    def __len__(self):
+        return len(self.indices)
+
+    @property
+    def names(self):
+        return self.postprocessor.class_names[self.indices].tolist()
+
+    def top(self):
+        """(sınıf_adı, güven) - sonuç boşsa (None, 0.0)"""
+        if not len(self.indices):
+            return None, 0.0
+        return self.postprocessor.class_names[self.indices[0]], float(self.confidences[0])
+
+    def to_list(self):
+        """API formatı: [{"food_name", "confidence", "percentage"}]"""
+        confidences = self.confidences.astype(np.float64)
+        return [
+            {"food_name": name, "confidence": confidence, "percentage": percentage}
+            for name, confidence, percentage in zip(
+                self.names, confidences.tolist(), (confidences * 100).tolist()
+            )
+        ]
+
+    def nutrition(self, weight, rank=0):
+        """rank. tahminin ağırlığa göre besin değerleri (bkz. PredictionPostprocessor.nutrition)"""
+        return self.postprocessor.nutrition(self.indices[rank], weight)
+
+
+class PredictionPostprocessor:
+    def __init__(self, labels, food_db=None):
+        """
+        Args:
+            labels: İndeks sıralı sınıf isimleri (boşluklar None)
+            food_db: {"sınıf_adı": {"name", "calorie", ...}} - 100g besin değerleri
+        """
+        self.class_names = np.array([name or "" for name in labels], dtype=object)
+        self.labeled = np.array([name is not None for name in labels], dtype=bool)
+        self.valid_indices = {}  # çıkış boyutu -> etiketli indeksler (hepsi etiketliyse None)
+        self.load_nutrition(food_db or {})
+
+    def load_nutrition(self, food_db):
+        """Besin değerlerini sınıf indeksine hizalı tabloya yükle"""
+        count = len(self.class_names)
+        self.nutrition_table = np.empty((count, len(NUTRIENT_FIELDS)), dtype=np.float64)
+        self.has_nutrition = np.zeros(count, dtype=bool)
+        self.nutrition_info = [None] * count
+
+        default_row = [DEFAULT_NUTRITION.get(field, 0.0) for field in NUTRIENT_FIELDS]
+        for idx, key in enumerate(self.class_names.tolist()):
+            food = food_db.get(key) if key else None
+            if food is None:
+                self.nutrition_table[idx] = default_row
+                self.nutrition_info[idx] = dict(DEFAULT_NUTRITION, name=key)
+                continue
+            food = dict(food)
+            if "carbohydrate" not in food:
+                food["carbohydrate"] = food.get("carb", 0.0)
+            self.nutrition_table[idx] = [food.get(field, 0.0) for field in NUTRIENT_FIELDS]
+            self.has_nutrition[idx] = True
+            self.nutrition_info[idx] = food
+
+    def _valid_for(self, output_size):
+        """Çıkış boyutu için etiketli sınıf indeksleri (önbellekli)"""
+        if output_size not in self.valid_indices:
+            labeled = np.zeros(output_size, dtype=bool)
+            count = min(output_size, len(self.labeled))
+            labeled[:count] = self.labeled[:count]
+            self.valid_indices[output_size] = None if labeled.all() else np.flatnonzero(labeled)
+        return self.valid_indices[output_size]
+
+    def top_k(self, probabilities, k=5):
+        """
+        En yüksek K etiketli sınıf (tam sıralama yok, O(n) kısmi seçim)
+
+        Returns:
+            TopKResult
+        """
+        valid = self._valid_for(len(probabilities))
+        scores = probabilities if valid is None else probabilities[valid]
+        k = min(k, len(scores))
+        if k <= 0:
+            return TopKResult(np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32), self)
+
+        candidates = np.argpartition(scores, -k)[-k:]
+        order = candidates[np.argsort(scores[candidates])[::-1]]
+        indices = order if valid is None else valid[order]
+        return TopKResult(indices, probabilities[indices], self)
+
+    def nutrition(self, index, weight):
+        """
+        Sınıfın ağırlığa göre besin değerleri (100g bazlı)
+
+        Returns:
+            {"name", "weight", "calorie", "protein", "carbohydrate", "sugar", "fat",
+             "base_values_per_100g"} - değer yoksa varsayılan değerler kullanılır
+        """
+        if not self.has_nutrition[index]:
+            print(f"⚠️ {self.class_names[index]} için besin değeri bulunamadı, varsayılan değerler kullanılıyor")
+
+        values = np.round(self.nutrition_table[index] * (weight / 100.0), 1).tolist()
+        result = {"name": self.class_names[index], "weight": weight}
+        result.update(zip(NUTRIENT_FIELDS, values))
+        result["base_values_per_100g"] = self.nutrition_info[index]
+        return result
+
+
+# Microbenchmark: argsort + dict (eski yol) ile argpartition + hizalı diziler
+if __name__ == "__main__":
+    import time
+
+    def legacy_top_k(predictions, class_names, top_k):
+        top_indices = np.argsort(predictions)[-top_k:][::-1]
+        results = []
+        for idx in top_indices:
+            if idx not in class_names:
+                continue
+            results.append({
+                'class': class_names[idx],
+                'confidence': float(predictions[idx]),
+                'percentage': float(predictions[idx] * 100)
+            })
+        return results
+
+    rng = np.random.default_rng(0)
+    for num_classes in (101, 1000, 5000):
+        labels = [f"yemek_{i}" for i in range(num_classes)]
+        class_names = dict(enumerate(labels))
+        post = PredictionPostprocessor(labels)
+        probabilities = rng.dirichlet(np.ones(num_classes)).astype(np.float32)
+
+        assert legacy_top_k(probabilities, class_names, 5)[0]['class'] == post.top_k(probabilities, 5).top()[0]
+
+        runs = 2000
+        for name, fn in (
+            ("eski", lambda: legacy_top_k(probabilities, class_names, 5)),
+            ("yeni", lambda: post.top_k(probabilities, 5).to_list())
+        ):
+            start = time.perf_counter()
+            for _ in range(runs):
+                fn()
+            elapsed = (time.perf_counter() - start) / runs * 1e6
+            print(f"{num_classes:5d} sınıf {name}: {elapsed:7.1f} µs")
@@ -0,0 +1,351 @@
+# AI Tahmin - TFLite Model Çalışma Zamanı
+
+import os
+import copy
+import json
+import numpy as np
+from ai.preprocessing import ImagePreprocessor
+from ai.postprocessing import PredictionPostprocessor
+
+try:
+    import tflite_runtime.interpreter as tflite
+except ImportError:
+    try:
+        import tensorflow.lite as tflite
+    except ImportError:
+        tflite = None
+        print("[Mock] TensorFlow Lite bulunamadı - simülasyon modu")
+
+
+def _load_delegate_fn():
+    """tflite_runtime ve tensorflow.lite'da delegate yükleyici farklı yerde"""
+    if tflite is None:
+        return None
+    load_delegate = getattr(tflite, 'load_delegate', None)
+    if load_delegate is None:
+        load_delegate = getattr(getattr(tflite, 'experimental', None), 'load_delegate', None)
+    return load_delegate
+
+
+def op_resolver_type():
+    """
+    OpResolverType: tflite_runtime'da interpreter modülünde, tensorflow.lite'da
+    experimental altında (bulunamazsa None - delegate'siz çalıştırma desteklenmiyor)
+    """
+    if tflite is None:
+        return None
+    resolver_type = getattr(tflite, 'OpResolverType', None)
+    if resolver_type is None:
+        resolver_type = getattr(getattr(tflite, 'experimental', None), 'OpResolverType', None)
+    return resolver_type
+
+
+def create_interpreter(model_content, options=None):
+    """
+    Interpreter'ı thread sayısı ve delegate ayarlarıyla oluştur
+
+    Args:
+        model_content: TFLite model bytes
+        options: {
+            "num_threads": XNNPACK/CPU thread sayısı (None = varsayılan),
+            "delegate": "xnnpack" (varsayılan CPU delegate), "none" (delegate yok)
+                        veya "external" (harici .so delegate),
+            "external_delegate_path": Harici delegate kütüphanesi,
+            "external_delegate_options": Delegate seçenekleri (dict)
+        }
+
+    Returns:
+        (interpreter, kullanılan_ayarlar) - delegate yüklenemezse varsayılana döner
+    """
+    options = dict(options or {})
+    delegate = options.get("delegate", "xnnpack")
+    kwargs = {"model_content": model_content, "num_threads": options.get("num_threads")}
+
+    try:
+        if delegate == "none":
+            # Varsayılan delegate'leri (XNNPACK) devre dışı bırak
+            resolver_type = op_resolver_type()
+            if resolver_type is None:
+                raise RuntimeError("Bu TFLite sürümü delegate'siz çalıştırmayı desteklemiyor")
+            kwargs["experimental_op_resolver_type"] = resolver_type.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+        elif delegate == "external":
+            load_delegate = _load_delegate_fn()
+            if load_delegate is None:
+                raise RuntimeError("Bu TFLite sürümü harici delegate desteklemiyor")
+            kwargs["experimental_delegates"] = [
+                load_delegate(options["external_delegate_path"], options.get("external_delegate_options") or {})
+            ]
+
+        interpreter = tflite.Interpreter(**kwargs)
+        interpreter.allocate_tensors()
+        return interpreter, options
+    except Exception as e:
+        if delegate == "xnnpack":
+            raise
+        print(f"⚠️ '{delegate}' delegate kullanılamadı ({e}), varsayılan ayarlara dönülüyor")
+        fallback = {"num_threads": options.get("num_threads"), "delegate": "xnnpack"}
+        return create_interpreter(model_content, fallback)
+
+
+def load_labels(labels_path):
+    """
+    Etiket dosyasını indeks sıralı listeye çevir
+
+    Desteklenen formatlar:
+        class_indices.json: {"sınıf_adı": indeks}
+        labels.txt: Satır başına bir sınıf adı
+    """
+    if labels_path.endswith('.json'):
+        with open(labels_path, 'r', encoding='utf-8') as f:
+            class_indices = json.load(f)
+        # İndeksler ardışık olmayabilir - boşluklar None kalır
+        labels = [None] * (max(int(idx) for idx in class_indices.values()) + 1)
+        for name, idx in class_indices.items():
+            labels[int(idx)] = name
+        return labels
+
+    with open(labels_path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f.readlines() if line.strip()]
+
+
+class TFLitePredictor:
+    """TFLite model ile tahmin yapma"""
+
+    def __init__(self, tflite_path, labels_path, interpreter_options=None, max_batch=8):
+        """
+        Args:
+            tflite_path: TFLite model dosya yolu
+            labels_path: Sınıf indeksleri (class_indices.json) veya labels.txt dosyası
+            interpreter_options: Thread/delegate ayarları (bkz. create_interpreter)
+            max_batch: Tek invoke() içinde çalıştırılacak en fazla görüntü
+        """
+        if tflite is None:
+            raise ImportError("TFLite yok")
+
+        self.model_path = tflite_path
+        self.max_batch = max_batch
+        self.model_name = os.path.basename(tflite_path)
+
+        # Model dosyası bir kez okunur, tüm interpreter kopyaları paylaşır
+        with open(tflite_path, 'rb') as f:
+            self.model_content = f.read()
+
+        # TFLite interpreter yükle
+        self.interpreter_options = interpreter_options
+        self._create_interpreter()
+
+        # Ön işleme ayarları (modelin giriş tensöründen)
+        input_shape = self.input_details[0]['shape']
+        self.input_size = (int(input_shape[2]), int(input_shape[1]))  # (genişlik, yükseklik)
+        self._configure_io()
+
+        # Sınıf isimlerini yükle
+        self.labels = load_labels(labels_path)
+        self.class_names = {idx: name for idx, name in enumerate(self.labels) if name is not None}
+        self.postprocessor = PredictionPostprocessor(self.labels)
+
+        print(f"✅ TFLite model yüklendi: {tflite_path}")
+        print(f"   Giriş boyutu: {self.input_details[0]['shape']} ({self.input_dtype.__name__})")
+        print(f"   Çıkış boyutu: {self.output_details[0]['shape']} ({self.output_details[0]['dtype'].__name__})")
+        print(f"   Kategori sayısı: {len(self.class_names)}")
+        print(f"   Interpreter: {self.interpreter_options}")
+
+    def _create_interpreter(self):
+        """Model içeriğinden interpreter oluştur ve tensörleri ayır"""
+        self.interpreter, self.interpreter_options = create_interpreter(
+            self.model_content, self.interpreter_options
+        )
+
+        # Giriş/çıkış detayları
+        self.input_details = self.interpreter.get_input_details()
+        self.output_details = self.interpreter.get_output_details()
+
+        # Interpreter başına önceden ayrılmış giriş buffer'ı (kopyalar paylaşmaz)
+        input_shape = self.input_details[0]['shape']
+        self.input_buffer = np.empty((1, *input_shape[1:]), dtype=self.input_details[0]['dtype'])
+        self.batch_size = int(self.input_details[0]['shape'][0])
+
+    def _resize_batch(self, batch_size):
+        """
+        Giriş tensörünün batch boyutunu değiştir (aynıysa bir şey yapmaz)
+
+        Returns:
+            False - model batch boyutu değişimini desteklemiyorsa (max_batch 1'e düşer)
+        """
+        if batch_size == self.batch_size:
+            return True
+
+        shape = list(self.input_details[0]['shape'])
+        shape[0] = batch_size
+        try:
+            self.interpreter.resize_tensor_input(self.input_details[0]['index'], shape)
+            self.interpreter.allocate_tensors()
+        except Exception as e:
+            print(f"⚠️ Batch boyutu {batch_size} desteklenmiyor ({e}), görüntüler tek tek çalıştırılacak")
+            self.max_batch = 1
+            self._create_interpreter()
+            return False
+
+        self.input_details = self.interpreter.get_input_details()
+        self.output_details = self.interpreter.get_output_details()
+        self.batch_size = batch_size
+        return True
+
+    def _configure_io(self):
+        """
+        Giriş/çıkış tensörlerinin tipine ve quantization parametrelerine göre dönüşümleri hazırla
+
+        Giriş dönüşümü (float /255, uint8/int8 quantization) ImagePreprocessor'dadır.
+        """
+        self.input_dtype = self.input_details[0]['dtype']
+        self.preprocessor = ImagePreprocessor(self.input_size, self.input_details[0])
+        self.quantized_input = self.preprocessor.quantized
+
+        output_scale, output_zero_point = self.output_details[0]['quantization']
+        if np.issubdtype(self.output_details[0]['dtype'], np.integer) and output_scale > 0:
+            self.output_quantization = (output_scale, output_zero_point)
+        else:
+            self.output_quantization = None
+
+    def dequantize_output(self, output):
+        """Quantized çıktıyı float olasılıklara çevir"""
+        if self.output_quantization is None:
+            return output
+        scale, zero_point = self.output_quantization
+        return (output.astype(np.float32) - zero_point) * scale
+
+    def set_interpreter_options(self, options):
+        """Thread/delegate ayarlarını değiştir ve interpreter'ı yeniden oluştur"""
+        self.interpreter_options = options
+        self._create_interpreter()
+
+    def clone(self):
+        """
+        Aynı model ve etiketlerle ayrı bir interpreter'a sahip kopya oluştur
+
+        TFLite interpreter thread-safe değildir; her worker thread kendi kopyasını kullanır.
+        """
+        predictor = copy.copy(self)
+        predictor._create_interpreter()
+        return predictor
+
+    def preprocess_image(self, image_data, out=None):
+        """
+        Görüntüyü model için hazırlar
+
+        Args:
+            image_data: Görüntü dosya yolu, bytes, PIL Image veya RGB numpy array
+            out: Yazılacak (1, H, W, 3) buffer (varsayılan: interpreter'ın input_buffer'ı)
+
+        Returns:
+            out - bir sonraki çağrıda üzerine yazılır
+        """
+        if out is None:
+            out = self.input_buffer
+        pixels = self.preprocessor.load_pixels(image_data)
+        self.preprocessor.fill(pixels, out[0])
+        return out
+
+    def run_batch(self, pixel_list):
+        """
+        Model boyutundaki RGB pikselleri max_batch'lik gruplar halinde çalıştır
+
+        Görüntüler doğrudan interpreter'ın giriş tensörüne yazılır (set_tensor kopyası yok).
+
+        Returns:
+            (N, sınıf_sayısı) float olasılıklar
+        """
+        input_index = self.input_details[0]['index']
+        outputs = []
+        start = 0
+        while start < len(pixel_list):
+            chunk = pixel_list[start:start + self.max_batch]
+            if not self._resize_batch(len(chunk)):
+                continue  # max_batch 1'e düştü, aynı gruptan tekrar dene
+
+            # tensor() görünümü invoke'tan önce bırakılmalı
+            input_tensor = self.interpreter.tensor(input_index)
+            batch = input_tensor()
+            for i, pixels in enumerate(chunk):
+                self.preprocessor.fill(pixels, batch[i])
+            del batch, input_tensor
+
+            self.interpreter.invoke()
+            outputs.append(self.dequantize_output(self.interpreter.get_tensor(self.output_details[0]['index'])))
+            start += len(chunk)
+
+        return np.concatenate(outputs)
+
+    def format_predictions(self, predictions, top_k=5):
+        """Olasılık vektöründen top-K sonuç (TopKResult)"""
+        return self.postprocessor.top_k(predictions, top_k)
+
+    def predict(self, image_data, top_k=5):
+        """
+        Görüntüden tahmin yapar
+
+        Args:
+            image_data: Görüntü dosya yolu, bytes, PIL Image veya RGB numpy array
+            top_k: En yüksek K tahmin
+
+        Returns:
+            TopKResult (bkz. ai/postprocessing.py)
+        """
+        try:
+            # Görüntüyü çöz/küçült, model girişine run_batch yazar
+            pixels = self.preprocessor.load_pixels(image_data)
+            print(f"🔍 Preprocessed image shape: {pixels.shape}")
+
+            # Tahmin yap
+            predictions = self.run_batch([pixels])[0]
+            print(f"📊 Predictions shape: {predictions.shape}, min: {predictions.min():.4f}, max: {predictions.max():.4f}")
+
+            # Top-K tahminleri al
+            return self.format_predictions(predictions, top_k)
+        except Exception as e:
+            print(f"❌ TFLitePredictor.predict error: {type(e).__name__}: {str(e)}")
+            raise
+
+    def predict_batch(self, images, top_k=5, aggregate=True):
+        """
+        Birden fazla görüntüyü tek invoke() ile tahmin et
+
+        Args:
+            images: Görüntü listesi (predict ile aynı tipler)
+            top_k: En yüksek K tahmin
+            aggregate: True ise olasılıkların ortalamasıyla tek sonuç listesi
+                (aynı tabağın farklı çekimleri), False ise görüntü başına liste
+
+        Returns:
+            TopKResult (aggregate=False ise görüntü başına TopKResult listesi)
+        """
+        try:
+            predictions = self.run_batch([self.preprocessor.load_pixels(image) for image in images])
+            print(f"📊 Batch predictions shape: {predictions.shape}")
+
+            if aggregate:
+                return self.format_predictions(predictions.mean(axis=0), top_k)
+            return [self.format_predictions(row, top_k) for row in predictions]
+        except Exception as e:
+            print(f"❌ TFLitePredictor.predict_batch error: {type(e).__name__}: {str(e)}")
+            raise
+
+    def predict_tta(self, image_data, views, top_k=5, center_crop=0.8):
+        """
+        Test-time augmentation: görüntünün kırpma/ayna görünümlerini tek batch'te
+        çalıştır, olasılıkların ortalamasını al
+
+        Args:
+            image_data: predict ile aynı
+            views: Görünüm listesi (bkz. ImagePreprocessor.load_views)
+            top_k: En yüksek K tahmin
+            center_crop: Merkez kırpma oranı
+        """
+        try:
+            pixels = self.preprocessor.load_views(image_data, views, center_crop)
+            predictions = self.run_batch(pixels)
+            print(f"📊 TTA predictions shape: {predictions.shape} ({', '.join(views)})")
+            return self.format_predictions(predictions.mean(axis=0), top_k)
+        except Exception as e:
+            print(f"❌ TFLitePredictor.predict_tta error: {type(e).__name__}: {str(e)}")
+            raise
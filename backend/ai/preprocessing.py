@@ -0,0 +1,176 @@
+# AI Ön İşleme - Görüntüyü model giriş tensörüne yazma
+#
+# JPEG'ler DCT ölçekleme ile küçük çözülür (draft), pikseller normalizasyon /
+# quantization ile birlikte tek adımda önceden ayrılmış buffer'a (veya doğrudan
+# interpreter'ın giriş tensörüne) yazılır. Kararlı durumda tahmin başına
+# büyük bir ara dizi oluşturulmaz.
+
+import io
+import numpy as np
+from PIL import Image
+
+
+class ImagePreprocessor:
+    def __init__(self, input_size, input_detail):
+        """
+        Args:
+            input_size: Model giriş boyutu (genişlik, yükseklik)
+            input_detail: interpreter.get_input_details()[0]
+        """
+        self.input_size = tuple(input_size)
+        self.dtype = input_detail['dtype']
+        scale, zero_point = input_detail['quantization']
+
+        # Model [0, 1] aralığına normalize edilmiş görüntü bekler. Piksel -> giriş
+        # dönüşümü 256 elemanlı tabloyla (LUT) tanımlanır, sonra mümkünse daha
+        # ucuz bir eşdeğer işleme indirgenir.
+        pixels = np.arange(256, dtype=np.float64)
+        if np.issubdtype(self.dtype, np.integer) and scale > 0:
+            info = np.iinfo(self.dtype)
+            quantized = np.round(pixels / 255.0 / scale + zero_point)
+            self.lut = np.clip(quantized, info.min, info.max).astype(self.dtype)
+            self.quantized = True
+        else:
+            self.lut = (pixels / 255.0).astype(self.dtype)
+            self.quantized = False
+
+        offsets = self.lut.astype(np.int64) - np.arange(256)
+        if not self.quantized:
+            # float: piksel * (1/255)
+            self.mode = "scale"
+            self.scale = self.dtype(1.0 / 255.0)
+        elif self.lut.itemsize == 1 and np.all(offsets == offsets[0]):
+            # uint8/int8 ve sabit kaydırma (örn. zp=-128): byte düzeyinde mod 256 toplama
+            self.mode = "copy" if offsets[0] == 0 else "offset"
+            self.offset = np.uint8(offsets[0] % 256)
+        else:
+            self.mode = "lut"
+
+    def _open(self, image_data, min_size):
+        """Girdiyi PIL RGB görüntüye çevir (JPEG'ler en az min_size olacak şekilde küçük çözülür)"""
+        if isinstance(image_data, np.ndarray):
+            return Image.fromarray(image_data)
+        if isinstance(image_data, bytes):
+            img = Image.open(io.BytesIO(image_data))
+        elif isinstance(image_data, str):
+            img = Image.open(image_data)
+        else:
+            img = image_data
+
+        # JPEG'i DCT ölçekleme ile küçük çöz (1/2, 1/4, 1/8) - 8 MP yerine ~0.1 MP
+        if img.format == 'JPEG':
+            img.draft('RGB', min_size)
+        return img.convert('RGB')
+
+    def _resize(self, img):
+        if img.size != self.input_size:
+            img = img.resize(self.input_size, reducing_gap=3.0)
+        return np.asarray(img)
+
+    def load_pixels(self, image_data):
+        """
+        Görüntüyü model boyutunda RGB uint8 array'e çevir
+
+        Args:
+            image_data: Dosya yolu, JPEG/PNG bytes, PIL Image veya RGB numpy array
+        """
+        # Kameradan gelen ham RGB buffer zaten model boyutundaysa kopyalama yok
+        if isinstance(image_data, np.ndarray) and image_data.shape[1::-1] == self.input_size:
+            return image_data
+        return self._resize(self._open(image_data, self.input_size))
+
+    def load_views(self, image_data, views, center_crop=0.8):
+        """
+        Test-time augmentation için aynı görüntüden birden fazla görünüm üret
+
+        Args:
+            image_data: load_pixels ile aynı
+            views: Görünüm listesi - "full", "flip", "center", "center_flip"
+            center_crop: "center" kırpmasının kenar oranı
+
+        Returns:
+            Model boyutunda RGB uint8 array listesi (flip'ler kopyasız görünümdür)
+        """
+        # Merkez kırpma da model boyutunun altına düşmesin
+        min_size = tuple(int(side / center_crop) for side in self.input_size)
+        img = self._open(image_data, min_size)
+
+        full = center = None
+        pixels = []
+        for view in views:
+            if view in ("full", "flip"):
+                if full is None:
+                    full = self._resize(img)
+                pixels.append(full if view == "full" else full[:, ::-1])
+            elif view in ("center", "center_flip"):
+                if center is None:
+                    width, height = img.size
+                    crop_w, crop_h = int(width * center_crop), int(height * center_crop)
+                    left, top = (width - crop_w) // 2, (height - crop_h) // 2
+                    center = self._resize(img.crop((left, top, left + crop_w, top + crop_h)))
+                pixels.append(center if view == "center" else center[:, ::-1])
+            else:
+                raise ValueError(f"Bilinmeyen TTA görünümü: {view}")
+        return pixels
+
+    def fill(self, pixels, out):
+        """Pikselleri normalizasyon/quantization ile birlikte out buffer'ına yaz"""
+        if self.mode == "scale":
+            np.multiply(pixels, self.scale, out=out)
+        elif self.mode == "copy":
+            np.copyto(out, pixels)
+        elif self.mode == "offset":
+            np.add(pixels, self.offset, out=out.view(np.uint8))
+        else:
+            np.take(self.lut, pixels, out=out)
+        return out
+
+
+# Microbenchmark: eski yol (tam çözme + float dizi + /255 + expand_dims) ile yeni yol
+if __name__ == "__main__":
+    import time
+    import tracemalloc
+
+    def legacy_preprocess(image_data, input_size):
+        if isinstance(image_data, bytes):
+            img = Image.open(io.BytesIO(image_data)).convert('RGB')
+        else:
+            img = Image.fromarray(image_data)
+        img = img.resize(input_size)
+        img_array = np.array(img, dtype=np.float32)
+        img_array = img_array / 255.0
+        return np.expand_dims(img_array, axis=0)
+
+    def measure(fn, runs):
+        fn()
+        tracemalloc.start()
+        start = time.perf_counter()
+        for _ in range(runs):
+            fn()
+        elapsed = (time.perf_counter() - start) / runs * 1000
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return elapsed, peak / 1024
+
+    input_size = (224, 224)
+    rng = np.random.default_rng(0)
+
+    # 8 MP JPEG (rpicam-still çıktısı gibi) ve ISP ölçekli 640x480 kare
+    full = (rng.random((2464, 3280, 3)) * 255).astype(np.uint8)
+    jpeg_io = io.BytesIO()
+    Image.fromarray(full).save(jpeg_io, format='JPEG', quality=90)
+    jpeg_bytes = jpeg_io.getvalue()
+    frame = (rng.random((480, 640, 3)) * 255).astype(np.uint8)
+    exact = (rng.random((224, 224, 3)) * 255).astype(np.uint8)
+
+    for dtype, quantization in ((np.float32, (0.0, 0)), (np.uint8, (1 / 255, 0)), (np.int8, (1 / 255, -128))):
+        pre = ImagePreprocessor(input_size, {'dtype': dtype, 'quantization': quantization})
+        buffer = np.empty((1, 224, 224, 3), dtype=dtype)
+        print(f"\n=== Giriş tipi: {dtype.__name__} (mod: {pre.mode}) ===")
+
+        for name, data, runs in (("8 MP JPEG", jpeg_bytes, 5), ("640x480 RGB", frame, 50), ("224x224 RGB", exact, 200)):
+            if dtype is np.float32:
+                old_ms, old_kb = measure(lambda: legacy_preprocess(data, input_size), runs)
+                print(f"{name:12s} eski: {old_ms:8.2f} ms  tepe bellek {old_kb:8.1f} KB")
+            new_ms, new_kb = measure(lambda: pre.fill(pre.load_pixels(data), buffer[0]), runs)
+            print(f"{name:12s} yeni: {new_ms:8.2f} ms  tepe bellek {new_kb:8.1f} KB")
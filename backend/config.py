@@ -15,20 +15,132 @@ FPS = 30
 HX711_DOUT_PIN = 5
 HX711_SCK_PIN = 6
 HX711_REFERENCE_UNIT = 210  # Kalibrasyon sonrası güncellenecek
+HX711_GPIO_BACKEND = "auto"  # auto (rpi, olmazsa lgpio), rpi, lgpio veya fake (simüle HX711)
+HX711_GPIO_CHIP = 0  # lgpio için /dev/gpiochipN
+HX711_ACQUISITION_MODE = "interrupt"  # interrupt (DOUT kenar kesmesi) veya poll
+HX711_BUFFER_SIZE = 64  # Halka buffer (örnek)
+
+# Çoklu yük hücresi - boş: tek hücre (HX711_DOUT_PIN/SCK, kanal A)
+# Aynı DOUT/SCK'deki hücreler tek HX711'in A (gain 128/64) ve B (gain 32) kanallarıdır,
+# dönüşümlü okunur. x/y: ağırlık merkezi için hücre konumu (örn. mm)
+# Örnek: [{"dout": 5, "sck": 6, "gain": 128, "x": -100, "y": 0},
+#         {"dout": 5, "sck": 6, "gain": 32, "x": 100, "y": 0},
+#         {"dout": 13, "sck": 19, "gain": 128, "x": 0, "y": 150}]
+SCALE_CELLS = []
 MAX_WEIGHT_KG = 5.0
 TARE_SAMPLES = 10
 
+# Tartı filtreleri (ham sayı üzerinde, örnek başına - bkz. hardware/filters.py)
+SCALE_FILTERS = [
+    {"type": "median", "size": 5},
+    {"type": "kalman", "process_var": 50.0, "measurement_var": 400.0, "step_threshold": 2000}  # ~10 g
+]
+SCALE_NOISE_WINDOW = 20  # örnek
+
+# Kararlı ağırlık algılama (placed / stable / unsettled / removed olayları)
+SCALE_STABLE_WINDOW = 8  # örnek
+SCALE_STABLE_TOLERANCE = 0.5  # gram (standart sapma)
+SCALE_STABLE_HOLD = 0.4  # saniye
+SCALE_EMPTY_THRESHOLD = 5.0  # gram
+SCALE_CHANGE_THRESHOLD = 2.0  # gram - kararlı ağırlıktan sapma yeni yerleşme başlatır
+
+# Ağırlık yayını (/ws/weight) - sadece değişimde veya heartbeat'te gönderilir
+SCALE_STREAM_DELTA = 1.0  # gram
+SCALE_STREAM_HEARTBEAT = 2.0  # saniye
+
+# Tare/kalibrasyon işleri (okuma thread'inde, örnek akışından)
+SCALE_CALIBRATION_SAMPLES = 10  # örnek (medyan)
+SCALE_CALIBRATION_SETTLE = 1.0  # saniye - bilinen ağırlık otursun
+SCALE_JOB_TIMEOUT = 10.0  # saniye
+SCALE_JOB_HISTORY = 16  # durumu sorgulanabilecek son iş sayısı
+
+# Kalibrasyon profili (DATA_DIR içinde) - varsa açılışta tare yapılmaz
+SCALE_CALIBRATION_FILE = "scale_calibration.json"
+
+# Sıfır takibi (sıcaklık kayması) - tartı boş ve kararlıyken offset yavaşça düzeltilir
+SCALE_ZERO_TRACK_BAND = 1.0  # gram - sadece bu kadar sapma sıfır sayılır
+SCALE_ZERO_TRACK_RATE = 0.02  # örnek başına düzeltme oranı (0: kapalı)
+SCALE_ZERO_TRACK_MAX = 20.0  # gram - son tare'den en fazla toplam düzeltme
+SCALE_ZERO_TRACK_SAVE_INTERVAL = 300.0  # saniye - düzeltilen offset'in kaydedilme aralığı
+
+# Örnekleme güç politikası - kararlı ve izleyen yoksa düşük hız, uzun boşlukta HX711 kapalı
+SCALE_POWER_POLICY = True  # False: her zaman tam hız
+SCALE_IDLE_AFTER = 30.0  # saniye - sonra düşük hız
+SCALE_IDLE_INTERVAL = 0.5  # saniye - düşük hızda okumalar arası
+SCALE_SLEEP_AFTER = 600.0  # saniye - sonra HX711 kapatılır (0: kapatma yok)
+SCALE_SLEEP_CHECK_INTERVAL = 5.0  # saniye - uykuda ağırlık kontrolü için kısa açılma aralığı
+SCALE_WAKE_SETTLE = 0.4  # saniye - açılıştan sonra atılan örnekler (10 SPS: 4 dönüşüm)
+SCALE_WAKE_SAMPLES = 3  # uykuda kısa açılmada okunan örnek (medyan filtresinin yarısından fazlası)
+SCALE_POWER_SAVE_ON_MAINS = True  # False: adaptör takılıyken (şarj oluyor) hep tam hız
+
+# Ham örnek kaydı ve tekrar oynatma (hardware/sample_recording.py)
+SCALE_RECORDING_DIR = "recordings"  # DATA_DIR içinde
+SCALE_RECORDING_MAX_SECONDS = 3600.0  # saniye - kayıt bu süreden sonra kendiliğinden durur
+SCALE_REPLAY_FILE = None  # Kayıt dosyası verilirse HX711 yerine kayıt oynatılır (geliştirme/benchmark)
+SCALE_REPLAY_SPEED = 1.0  # 1: gerçek süre, 10: 10 kat hızlı (zamanlamalar da kısalır)
+SCALE_REPLAY_LOOP = True  # Kayıt bitince baştan oynat
+
 # Kamera Modülü
 CAMERA_RESOLUTION = (640, 480)
 CAMERA_FORMAT = "RGB888"
 CAMERA_ROTATION = 0
 
-# AI Model
-MODEL_PATH = "models/food_classifier.tflite"
-LABELS_PATH = "models/labels.txt"
+# Sürekli açık kamera akışı (auto, picamera2, rpicam, fake)
+CAMERA_STREAM_BACKEND = "auto"
+CAMERA_STREAM_FPS = 15
+CAMERA_STREAM_FORMAT = "yuv420"  # rpicam-vid çıkışı: yuv420 (ham, ISP ölçekli) veya mjpeg
+CAMERA_CAPTURE_TIMEOUT = 3.0  # saniye
+CAMERA_STREAM_ARGS = [
+    "--denoise", "off",
+    "--tuning-file", "/usr/share/libcamera/ipa/rpi/vc4/imx219_noir.json",
+    "--sharpness", "2.0",
+    "--contrast", "1.15"
+]
+
+# AI Model (tek paylaşılan model - /api/analyze ve /api/scan-complete aynı interpreter'ı kullanır)
+# Varyantlar: int8 tam quantized model Cortex-A72'de float modele göre 2-4x hızlıdır
+MODEL_VARIANTS = {
+    "float32": "models/model_float32.tflite",
+    "float16": "models/model_float16.tflite",
+    "int8": "models/model_int8.tflite"
+}
+MODEL_VARIANT = "float16"
+DEFAULT_MODEL_VARIANT = "float16"  # Seçilen varyant yüklenemezse kullanılır
+MODEL_PATH = MODEL_VARIANTS[MODEL_VARIANT]
+LABELS_PATH = "models/class_indices.json"  # class_indices.json veya labels.txt
 CONFIDENCE_THRESHOLD = 0.7
 INPUT_SIZE = (224, 224)
 
+# Interpreter ayarları (INFERENCE_WORKERS x MODEL_NUM_THREADS <= çekirdek sayısı önerilir)
+MODEL_NUM_THREADS = 2
+MODEL_DELEGATE = "xnnpack"  # xnnpack (varsayılan CPU), none veya external
+MODEL_EXTERNAL_DELEGATE_PATH = None  # örn. "/usr/lib/libedgetpu.so.1"
+MODEL_EXTERNAL_DELEGATE_OPTIONS = {}
+
+# Interpreter benchmark (thread/delegate kombinasyonlarının invoke süreleri)
+MODEL_BENCHMARK_ON_STARTUP = False
+MODEL_BENCHMARK_THREADS = [1, 2, 4]
+MODEL_BENCHMARK_DELEGATES = ["xnnpack", "none", "external"]
+MODEL_BENCHMARK_RUNS = 10
+MODEL_BENCHMARK_FILE = "model_benchmark.json"  # DATA_DIR içinde
+MODEL_AUTO_TUNE = True  # Bu cihaz için kayıtlı en hızlı ayarı kullan
+
+# Çıkarım havuzu (her worker kendi interpreter'ını kullanır)
+INFERENCE_WORKERS = 2
+INFERENCE_QUEUE_SIZE = 4  # Dolunca yeni istekler 503 ile reddedilir
+SCAN_COALESCE_WINDOW = 0.5  # saniye - bu sürede gelen tarama istekleri aynı sonucu paylaşır
+SCAN_STABLE_TIMEOUT = 3.0  # saniye - tarama ağırlığın oturmasını en fazla bu kadar bekler
+
+# Batch çıkarım ve test-time augmentation (TTA)
+MODEL_MAX_BATCH = 8  # Tek invoke() içinde en fazla görüntü
+SCAN_TTA_VIEWS = []  # örn. ["full", "flip", "center"] - boşsa tek görüntü
+TTA_CENTER_CROP = 0.8  # "center" görünümünün kenar oranı
+MODEL_TEST_MAX_FILES = 8
+
+# Tarama fotoğrafı arşivi (tahmin bellekten yapılır, kayıt arka planda)
+SCAN_PHOTO_ARCHIVE = True
+SCAN_PHOTO_PATH = "foto.jpg"  # backend dizinine göre
+
 # LED Ring (WS2812B - GPIO 18)
 LED_PIN = 18
 LED_COUNT = 24
@@ -53,3 +165,8 @@ ASSETS_DIR = "assets"
 MODELS_DIR = "models"
 WALLPAPERS_DIR = "assets/images/Wallpapers"
 
+# Veritabanı (DATA_DIR içinde)
+DATABASE_BACKEND = "sqlite"  # sqlite (indeksli, WAL) veya json (eski dosya başına JSON)
+DATABASE_FILE = "nutriquant.db"  # sqlite: ilk açılışta data/*.json içe aktarılır
+DATABASE_WRITE_DELAY = 0.5  # json: yazmaların biriktirilip diske yazılma gecikmesi (saniye)
+
@@ -0,0 +1,69 @@
+# Yayın Merkezi - Tek yayıncı, çok abone (WebSocket istemcileri, bekleyen istekler)
+#
+# Yayıncı (örn. tartı thread'i) mesajı bir kez yayınlar; mesaj her aboneye ait
+# sınırlı asyncio kuyruğuna konur. Yavaş abonenin kuyruğu dolarsa en eski mesajı
+# atılır, yayıncı ve diğer aboneler beklemez.
+
+import asyncio
+
+
+class BroadcastHub:
+    def __init__(self, name, max_queue=8):
+        """
+        Args:
+            name: Log ve istatistikler için ad
+            max_queue: Abone başına bekleyen en fazla mesaj
+        """
+        self.name = name
+        self.max_queue = max_queue
+        self.loop = None
+        self.subscribers = set()
+        self.last_message = None
+
+        self.published = 0
+        self.dropped = 0
+
+    def attach(self, loop):
+        """Mesajların dağıtılacağı event loop (uygulama başlangıcında)"""
+        self.loop = loop
+
+    def publish_threadsafe(self, message):
+        """Herhangi bir thread'den yayınla (event loop yoksa mesaj atılır)"""
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self.publish, message)
+
+    def publish(self, message):
+        """Mesajı tüm abonelere dağıt (event loop thread'inde)"""
+        self.last_message = message
+        self.published += 1
+        for queue in list(self.subscribers):
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(message)
+
+    def subscribe(self, replay_last=False):
+        """
+        Yeni abone kuyruğu
+
+        Args:
+            replay_last: Son yayınlanan mesaj kuyruğa hemen konsun (örn. güncel ağırlık)
+        """
+        queue = asyncio.Queue(maxsize=self.max_queue)
+        if replay_last and self.last_message is not None:
+            queue.put_nowait(self.last_message)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def get_stats(self):
+        """Yayın istatistikleri"""
+        return {
+            "subscribers": len(self.subscribers),
+            "published": self.published,
+            "dropped": self.dropped
+        }
@@ -1,83 +1,419 @@
 # Veritabanı Yönetimi
+#
+# JSON dosyaları bellekte önbelleklenir: okumalar diskten ayrıştırılmaz, sadece
+# dosyanın mtime'ı kontrol edilir (dışarıdan düzenlenen dosya yeniden okunur).
+# Yazmalar DATABASE_WRITE_DELAY kadar biriktirilip tek seferde diske yazılır:
+# geçici dosya + fsync + atomik rename, güç kesintisinde dosya ya eski ya yeni
+# haliyle kalır, yarım yazılmış JSON oluşmaz.
 
 import json
 import os
+import threading
+from bisect import bisect_left, bisect_right
 from datetime import datetime
-from config import DATA_DIR
+from config import DATA_DIR, DATABASE_WRITE_DELAY
+from core.nutrition_aggregates import (
+    accumulate, add_bucket, empty_bucket, measurement_keys, summary_range, summarize
+)
+
+MEASUREMENT_HISTORY_LIMIT = 100  # JSON'da saklanan en fazla ölçüm (eskiler kırpılır)
+
+
+def normalize_timestamp(value):
+    """
+    Sorgu sınırını kayıtlardaki ISO biçimine çevir ("2026-01-07" -> "2026-01-07T00:00:00")
+    
+    Raises:
+        ValueError: Geçersiz tarih
+    """
+    if value is None:
+        return None
+    return datetime.fromisoformat(value).isoformat()
+
+def make_cursor(measurement):
+    """Sayfa imleci: "zaman_id" - aynı zaman damgalı ölçümler de ayrışır"""
+    return f"{measurement['timestamp']}_{measurement['id']}"
+
+def parse_cursor(value):
+    """
+    Sayfa imlecini (zaman, id) olarak çöz; id'siz eski imleç (sadece zaman) için id None
+    
+    Raises:
+        ValueError: Geçersiz imleç
+    """
+    if value is None:
+        return None
+    timestamp, sep, measurement_id = value.rpartition("_")
+    if not sep:
+        return normalize_timestamp(value), None
+    return normalize_timestamp(timestamp), int(measurement_id)
 
 class Database:
-    def __init__(self):
+    def __init__(self, write_delay=DATABASE_WRITE_DELAY):
+        """
+        Args:
+            write_delay: Yazmaların biriktirileceği süre (saniye, 0: hemen yaz)
+        """
         self.data_dir = DATA_DIR
         self.ensure_data_dir()
+        
+        # filename -> [veri, diskteki mtime_ns]; dirty: diske yazılmayı bekleyenler
+        self.cache = {}
+        self.dirty = set()
+        self.lock = threading.RLock()  # Oku-değiştir-yaz dizileri ve flush için
+        self.write_delay = write_delay
+        self.flush_timer = None
+        self.flushes = 0
+        self.writes = 0
+        
+        # ID indeksleri: filename -> (indekslenen veri nesnesi, {id: kayıt});
+        # dosya yeniden okunursa (yeni nesne) indeks yeniden kurulur
+        self.indexes = {}
     
     def ensure_data_dir(self):
         """Data klasörünü oluştur"""
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
     
+    def _mtime(self, filepath):
+        try:
+            return os.stat(filepath).st_mtime_ns
+        except FileNotFoundError:
+            return None
+    
     def load_json(self, filename, default=None):
-        """JSON dosyası yükle"""
+        """
+        JSON dosyası yükle (önbellekten; dosya dışarıdan değiştiyse yeniden okunur)
+        
+        Dönen nesne önbelleğin kendisidir: değiştiren save_json ile kaydetmeli.
+        """
         filepath = os.path.join(self.data_dir, filename)
         
-        if not os.path.exists(filepath):
-            if default is not None:
-                self.save_json(filename, default)
+        with self.lock:
+            entry = self.cache.get(filename)
+            mtime = self._mtime(filepath)
+            if entry is not None and (filename in self.dirty or entry[1] == mtime):
+                return entry[0]
+            if entry is not None:
+                print(f"[DB] {filename} dışarıdan değişmiş, yeniden okunuyor")
+            
+            if mtime is None:
+                if default is not None:
+                    self.save_json(filename, default)
+                    return default
+                return None
+            
+            try:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"JSON yükleme hatası ({filename}): {e}")
                 return default
-            return None
-        
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"JSON yükleme hatası ({filename}): {e}")
-            return default
+            self.cache[filename] = [data, mtime]
+            return data
     
     def save_json(self, filename, data):
-        """JSON dosyası kaydet"""
-        filepath = os.path.join(self.data_dir, filename)
+        """JSON dosyası kaydet (önbelleğe; diske write_delay sonra toplu yazılır)"""
+        with self.lock:
+            entry = self.cache.get(filename)
+            self.cache[filename] = [data, entry[1] if entry is not None else None]
+            self.dirty.add(filename)
+            self.writes += 1
+            if self.write_delay <= 0:
+                return self.flush()
+            if self.flush_timer is None:
+                self.flush_timer = threading.Timer(self.write_delay, self.flush)
+                self.flush_timer.daemon = True
+                self.flush_timer.start()
+        return True
+    
+    def flush(self):
+        """
+        Bekleyen yazmaları diske yaz (geçici dosya + fsync + rename)
         
+        Yazılamayan dosyalar (disk dolu, G/Ç hatası) bekleyen kalır ve write_delay
+        sonra yeniden denenir; close() da onları tekrar yazmayı dener.
+        """
+        with self.lock:
+            if self.flush_timer is not None:
+                self.flush_timer.cancel()
+                self.flush_timer = None
+            for filename in sorted(self.dirty):
+                if self._write_file(filename, self.cache[filename]):
+                    self.dirty.discard(filename)
+            self.flushes += 1
+            if self.dirty and self.write_delay > 0:
+                self.flush_timer = threading.Timer(self.write_delay, self.flush)
+                self.flush_timer.daemon = True
+                self.flush_timer.start()
+            return not self.dirty
+    
+    def _write_file(self, filename, entry):
+        filepath = os.path.join(self.data_dir, filename)
+        tmp_path = filepath + ".tmp"
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry[0], f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, filepath)
+            # Rename'in kendisi de kalıcı olsun (klasör girdisi)
+            dir_fd = os.open(self.data_dir, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+            entry[1] = self._mtime(filepath)
             return True
         except Exception as e:
             print(f"JSON kaydetme hatası ({filename}): {e}")
             return False
     
+    def close(self):
+        """Kapanış: bekleyen yazmaları diske yaz"""
+        ok = self.flush()
+        with self.lock:
+            if self.flush_timer is not None:
+                self.flush_timer.cancel()
+                self.flush_timer = None
+        if not ok:
+            print(f"[DB] Kapanışta yazılamayan dosyalar: {sorted(self.dirty)}")
+        return ok
+    
+    def get_cache_stats(self):
+        return {
+            "files": len(self.cache),
+            "pending": len(self.dirty),
+            "writes": self.writes,
+            "flushes": self.flushes
+        }
+    
+    def _index(self, filename, collection):
+        """
+        Dosyadaki kayıtların ID indeksi (self.lock tutulurken)
+        
+        Returns:
+            (veri, {id: kayıt})
+        """
+        data = self.load_json(filename, {collection: []})
+        entry = self.indexes.get(filename)
+        if entry is None or entry[0] is not data:
+            entry = (data, {item["id"]: item for item in data[collection] if "id" in item})
+            self.indexes[filename] = entry
+        return entry
+    
+    def _next_id(self, data, ids):
+        """
+        Artan ID dizisi: dosyadaki next_id sayacı (silinen ID'ler tekrar verilmez)
+        
+        Args:
+            ids: Mevcut ID'ler - sadece sayacı olmayan eski dosyada, bir kez taranır
+        """
+        if "next_id" not in data:
+            data["next_id"] = max(ids, default=0) + 1
+        new_id = data["next_id"]
+        data["next_id"] = new_id + 1
+        return new_id
+    
     def add_measurement(self, user_id, food_name, weight, nutrition, bmi_data):
         """Ölçüm kaydet"""
-        measurements = self.load_json("measurements.json", {"measurements": []})
+        with self.lock:
+            measurements = self.load_json("measurements.json", {"measurements": []})
+            # Özetler kırpılan kayıtları da kapsar (geçmiş sınırından etkilenmez). İlk
+            # kullanımda geçmişten hesaplanırlar: yeni ölçüm eklenmeden önce yüklenmeli,
+            # yoksa yeniden hesaplama onu da sayar ve accumulate ikinci kez ekler.
+            aggregates = self._aggregates()
+            # İndeks eski kayıtlara id verir; yeni id onlardan devam eder
+            everyone, users = self._measurement_index()
+            
+            measurement = {
+                "id": self._next_id(measurements, (m["id"] for m in measurements["measurements"])),
+                "timestamp": datetime.now().isoformat(),
+                "user_id": user_id,
+                "food_name": food_name,
+                "food": food_name,  # Backward compatibility
+                "weight": weight,
+                "calories": nutrition.get("calories", 0),
+                "protein": nutrition.get("protein", 0),
+                "carbs": nutrition.get("carbs", 0),
+                "fat": nutrition.get("fat", 0),
+                "confidence": nutrition.get("confidence", 0),
+                "nutrition": nutrition,
+                "bmi": bmi_data
+            }
+            
+            measurements["measurements"].append(measurement)
+            
+            if len(measurements["measurements"]) > MEASUREMENT_HISTORY_LIMIT:
+                dropped = measurements["measurements"][:-MEASUREMENT_HISTORY_LIMIT]
+                measurements["measurements"] = measurements["measurements"][-MEASUREMENT_HISTORY_LIMIT:]
+                # Özetlerin yeniden hesaplanması kırpılan ölçümlerin günlerine dokunmasın
+                stamps = [m["timestamp"] for m in dropped if m.get("timestamp")]
+                if stamps:
+                    measurements["dropped_until"] = max(stamps + [measurements.get("dropped_until") or ""])
+                self.indexes.pop("measurements.json", None)  # Kırpılan kayıtlar indeksten de çıksın
+            else:
+                self._index_measurement(everyone, measurement)
+                self._index_measurement(users.setdefault(user_id, ([], [])), measurement)
+            
+            accumulate(aggregates["users"].setdefault(str(user_id), {}), measurement)
+            self.save_json("aggregates.json", aggregates)
+            
+            return self.save_json("measurements.json", measurements)
+    
+    def _measurement_index(self):
+        """
+        Zaman sıralı ölçüm indeksi (self.lock tutulurken)
         
-        measurement = {
-            "timestamp": datetime.now().isoformat(),
-            "user_id": user_id,
-            "food_name": food_name,
-            "food": food_name,  # Backward compatibility
-            "weight": weight,
-            "calories": nutrition.get("calories", 0),
-            "protein": nutrition.get("protein", 0),
-            "carbs": nutrition.get("carbs", 0),
-            "fat": nutrition.get("fat", 0),
-            "confidence": nutrition.get("confidence", 0),
-            "nutrition": nutrition,
-            "bmi": bmi_data
-        }
+        Anahtar (timestamp, id): aynı zaman damgalı ölçümler de sıralı ve tekildir,
+        sayfa imleci aralarında kaybolmaz.
+        
+        Returns:
+            (tümü, {user_id: grup}) - grup: ([(timestamp, id)], [ölçüm]) eskiden yeniye
+        """
+        data = self.load_json("measurements.json", {"measurements": []})
+        entry = self.indexes.get("measurements.json")
+        if entry is None or entry[0] is not data:
+            self._assign_measurement_ids(data)
+            everyone = ([], [])
+            users = {}
+            # Kayıtlar zaten ekleme (zaman) sırasında: sıralama tek geçiş
+            for measurement in sorted(data["measurements"], key=self._measurement_key):
+                for group in (everyone, users.setdefault(measurement.get("user_id"), ([], []))):
+                    group[0].append(self._measurement_key(measurement))
+                    group[1].append(measurement)
+            entry = (data, everyone, users)
+            self.indexes["measurements.json"] = entry
+        return entry[1], entry[2]
+    
+    def _assign_measurement_ids(self, data):
+        """Eski (id'siz) ölçümlere ekleme sırasıyla id ver - bir kez, dosyaya kaydedilir"""
+        missing = [m for m in data["measurements"] if "id" not in m]
+        if not missing:
+            return
+        ids = (m["id"] for m in data["measurements"] if "id" in m)
+        for measurement in missing:
+            measurement["id"] = self._next_id(data, ids)
+        self.save_json("measurements.json", data)
+    
+    @staticmethod
+    def _measurement_key(measurement):
+        return measurement.get("timestamp", ""), measurement["id"]
+    
+    @classmethod
+    def _index_measurement(cls, group, measurement):
+        keys, items = group
+        key = cls._measurement_key(measurement)
+        if not keys or key >= keys[-1]:
+            keys.append(key)
+            items.append(measurement)
+        else:
+            # Saat geri alındıysa araya ekle
+            i = bisect_right(keys, key)
+            keys.insert(i, key)
+            items.insert(i, measurement)
+    
+    def get_all_measurements(self):
+        """Tüm ölçümler (eskiden yeniye)"""
+        return self.load_json("measurements.json", {"measurements": []})["measurements"]
+    
+    def _aggregates(self):
+        """Besin özetleri: {"users": {user_id: {"day": {...}, "week": {...}}}} (self.lock tutulurken)"""
+        aggregates = self.load_json("aggregates.json")
+        if aggregates is None:
+            # İlk kullanım: mevcut geçmişten hesapla
+            self.rebuild_aggregates()
+            aggregates = self.load_json("aggregates.json")
+        return aggregates
+    
+    def rebuild_aggregates(self):
+        """
+        Besin özetlerini mevcut ölçüm geçmişinden yeniden hesapla
         
-        measurements["measurements"].append(measurement)
+        Geçmiş kırpıldıysa kırpılan son ölçümün günü ve öncesindeki gün kovaları
+        korunur (o ölçümler artık yok), yalnızca sonraki günler yeniden hesaplanır;
+        sınır haftası korunan günlerden ve sonraki ölçümlerden yeniden toplanır.
         
-        if len(measurements["measurements"]) > 100:
-            measurements["measurements"] = measurements["measurements"][-100:]
+        Returns:
+            İşlenen ölçüm sayısı
+        """
+        with self.lock:
+            data = self.load_json("measurements.json", {"measurements": []})
+            measurements = [m for m in data["measurements"] if m.get("timestamp")]
+            boundary = data.get("dropped_until")
+            if boundary is None and measurements and len(data["measurements"]) >= MEASUREMENT_HISTORY_LIMIT:
+                # Kırpma işareti olmayan eski dosya: en eski kalan ölçümün günü sınır
+                boundary = min(m["timestamp"] for m in measurements)
+            
+            users = {}
+            if boundary:
+                boundary_day = boundary[:10]
+                boundary_week = measurement_keys({"timestamp": boundary})["week"]
+                old = self.load_json("aggregates.json") or {"users": {}}
+                for user_id, buckets in old["users"].items():
+                    days = {key: dict(b) for key, b in buckets.get("day", {}).items() if key <= boundary_day}
+                    weeks = {key: dict(b) for key, b in buckets.get("week", {}).items() if key < boundary_week}
+                    for key, bucket in days.items():
+                        if measurement_keys({"timestamp": key})["week"] == boundary_week:
+                            add_bucket(weeks.setdefault(boundary_week, empty_bucket()), bucket)
+                    users[user_id] = {"day": days, "week": weeks}
+                measurements = [m for m in measurements if m["timestamp"][:10] > boundary_day]
+                print(f"[DB] Geçmiş kırpılmış: {boundary_day} ve öncesinin özetleri korundu")
+            
+            for measurement in measurements:
+                accumulate(users.setdefault(str(measurement.get("user_id")), {}), measurement)
+            self.save_json("aggregates.json", {"users": users})
+            return len(measurements)
+    
+    def get_nutrition_summary(self, user_id, period="day", since=None, until=None):
+        """
+        Profilin gün/hafta besin toplamları (aralıktaki kovalar, ölçümler okunmaz)
         
-        return self.save_json("measurements.json", measurements)
+        Args:
+            period: "day" veya "week"
+            since, until: ISO tarih (ikisi de dahil) - varsayılan son 7 gün / bu hafta
+        """
+        first, last = summary_range(period, since, until)
+        with self.lock:
+            buckets = self._aggregates()["users"].get(str(user_id), {}).get(period, {})
+            rows = sorted((key, dict(bucket)) for key, bucket in buckets.items() if first <= key <= last)
+        return summarize(period, first, last, rows)
     
     def get_measurements_by_user(self, user_id):
-        """Kullanıcıya ait tüm ölçümleri getir"""
-        measurements = self.load_json("measurements.json", {"measurements": []})
-        user_measurements = [
-            m for m in measurements["measurements"] 
-            if m.get("user_id") == user_id
-        ]
-        return user_measurements
+        """Kullanıcıya ait tüm ölçümleri getir (eskiden yeniye)"""
+        with self.lock:
+            _, users = self._measurement_index()
+            return list(users.get(user_id, ([], []))[1])
+    
+    def query_measurements(self, user_id=None, since=None, until=None, before=None, limit=None):
+        """
+        Ölçümler, en yeniden eskiye (sayfalı)
+        
+        Args:
+            user_id: Sadece bu kullanıcı (None: tümü)
+            since: Bu zamandan (dahil) sonraki ölçümler (ISO tarih/zaman)
+            until: Bu zamandan (hariç) önceki ölçümler
+            before: Sayfa imleci - önceki sayfanın next_cursor değeri
+            limit: Sayfa boyutu (None: tümü)
+        
+        Returns:
+            (ölçümler, next_cursor - sonraki sayfa yoksa None)
+        """
+        since, until = normalize_timestamp(since), normalize_timestamp(until)
+        before = parse_cursor(before)
+        # (zaman,) anahtarı o zamandaki tüm (zaman, id) anahtarlarından küçüktür
+        bounds = [(until,)] if until else []
+        if before:
+            bounds.append(before if before[1] is not None else before[:1])
+        with self.lock:
+            everyone, users = self._measurement_index()
+            keys, items = everyone if user_id is None else users.get(user_id, ([], []))
+            lo = bisect_left(keys, (since,)) if since else 0
+            hi = bisect_left(keys, min(bounds)) if bounds else len(items)
+            start = lo if limit is None else max(lo, hi - limit)
+            page = items[start:hi][::-1]
+        next_cursor = make_cursor(page[-1]) if start > lo else None
+        return page, next_cursor
     
     def get_user(self, user_id):
         """Kullanıcı bilgisi getir"""
@@ -86,55 +422,66 @@ class Database:
     
     def save_user(self, user_id, user_data):
         """Kullanıcı bilgisi kaydet"""
-        users = self.load_json("users.json", {"users": {}})
-        users["users"][str(user_id)] = user_data
-        return self.save_json("users.json", users)
+        with self.lock:
+            users = self.load_json("users.json", {"users": {}})
+            users["users"][str(user_id)] = user_data
+            return self.save_json("users.json", users)
     
     def get_all_profiles(self):
         """Tüm profilleri getir"""
         profiles = self.load_json("profiles.json", {"profiles": []})
         return profiles["profiles"]
     
+    def get_profile(self, profile_id):
+        """ID ile profil (yoksa None)"""
+        with self.lock:
+            return self._index("profiles.json", "profiles")[1].get(profile_id)
+    
     def add_profile(self, name, gender, height, weight):
         """Yeni profil ekle"""
-        profiles = self.load_json("profiles.json", {"profiles": []})
-        
-        # Yeni ID oluştur
-        new_id = max([p.get("id", 0) for p in profiles["profiles"]], default=0) + 1
-        
-        profile = {
-            "id": new_id,
-            "name": name,
-            "gender": gender,
-            "height": height,
-            "weight": weight,
-            "created_at": datetime.now().isoformat()
-        }
-        
-        profiles["profiles"].append(profile)
-        self.save_json("profiles.json", profiles)
-        return profile
+        with self.lock:
+            profiles, index = self._index("profiles.json", "profiles")
+            
+            # Yeni ID oluştur
+            new_id = self._next_id(profiles, index)
+            
+            profile = {
+                "id": new_id,
+                "name": name,
+                "gender": gender,
+                "height": height,
+                "weight": weight,
+                "created_at": datetime.now().isoformat()
+            }
+            
+            profiles["profiles"].append(profile)
+            index[new_id] = profile
+            self.save_json("profiles.json", profiles)
+            return profile
     
     def update_profile(self, profile_id, name, gender, height, weight):
         """Profil güncelle"""
-        profiles = self.load_json("profiles.json", {"profiles": []})
-        
-        for profile in profiles["profiles"]:
-            if profile["id"] == profile_id:
+        with self.lock:
+            profiles, index = self._index("profiles.json", "profiles")
+            
+            profile = index.get(profile_id)
+            if profile is not None:
                 profile["name"] = name
                 profile["gender"] = gender
                 profile["height"] = height
                 profile["weight"] = weight
                 profile["updated_at"] = datetime.now().isoformat()
-                break
-        
-        return self.save_json("profiles.json", profiles)
+            
+            return self.save_json("profiles.json", profiles)
     
     def delete_profile(self, profile_id):
         """Profil sil"""
-        profiles = self.load_json("profiles.json", {"profiles": []})
-        profiles["profiles"] = [p for p in profiles["profiles"] if p["id"] != profile_id]
-        return self.save_json("profiles.json", profiles)
+        with self.lock:
+            profiles, index = self._index("profiles.json", "profiles")
+            if index.pop(profile_id, None) is None:
+                return True
+            profiles["profiles"] = [p for p in profiles["profiles"] if p["id"] != profile_id]
+            return self.save_json("profiles.json", profiles)
     
     def get_settings(self):
         """Uygulama ayarlarını getir"""
@@ -147,9 +494,10 @@ class Database:
     
     def save_setting(self, key, value):
         """Tek bir ayarı kaydet"""
-        settings = self.get_settings()
-        settings[key] = value
-        return self.save_json("settings.json", settings)
+        with self.lock:
+            settings = self.get_settings()
+            settings[key] = value
+            return self.save_json("settings.json", settings)
     
     def get_wallpaper(self):
         """Kayıtlı arka planı getir"""
@@ -165,29 +513,53 @@ class Database:
         plates = self.load_json("plates.json", {"plates": []})
         return plates["plates"]
     
+    def get_plate(self, plate_id):
+        """ID ile tabak (yoksa None)"""
+        with self.lock:
+            return self._index("plates.json", "plates")[1].get(plate_id)
+    
     def add_plate(self, name, weight):
         """Yeni tabak ekle"""
-        plates = self.load_json("plates.json", {"plates": []})
-        
-        # Yeni ID oluştur
-        new_id = max([p.get("id", 0) for p in plates["plates"]], default=0) + 1
-        
-        plate = {
-            "id": new_id,
-            "name": name,
-            "weight": weight,
-            "created_at": datetime.now().isoformat()
-        }
-        
-        plates["plates"].append(plate)
-        self.save_json("plates.json", plates)
-        return plate
+        with self.lock:
+            plates, index = self._index("plates.json", "plates")
+            
+            # Yeni ID oluştur
+            new_id = self._next_id(plates, index)
+            
+            plate = {
+                "id": new_id,
+                "name": name,
+                "weight": weight,
+                "created_at": datetime.now().isoformat()
+            }
+            
+            plates["plates"].append(plate)
+            index[new_id] = plate
+            self.save_json("plates.json", plates)
+            return plate
     
     def delete_plate(self, plate_id):
         """Tabak sil"""
-        plates = self.load_json("plates.json", {"plates": []})
-        plates["plates"] = [p for p in plates["plates"] if p["id"] != plate_id]
-        return self.save_json("plates.json", plates)
+        with self.lock:
+            plates, index = self._index("plates.json", "plates")
+            if index.pop(plate_id, None) is None:
+                return True
+            plates["plates"] = [p for p in plates["plates"] if p["id"] != plate_id]
+            return self.save_json("plates.json", plates)
+
+def create_database(backend="json"):
+    """
+    Veritabanı arka ucu (DATABASE_BACKEND)
+    
+    Args:
+        backend: "sqlite" (core/sqlite_database.py) veya "json"
+    """
+    if backend == "sqlite":
+        from core.sqlite_database import SQLiteDatabase
+        return SQLiteDatabase()
+    if backend != "json":
+        raise ValueError(f"Bilinmeyen veritabanı arka ucu: {backend}")
+    return Database()
 
 # Test fonksiyonu
 if __name__ == "__main__":
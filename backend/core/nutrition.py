@@ -2,7 +2,7 @@
 
 import json
 import os
-from config import DATA_DIR
+from config import DATA_DIR, MODELS_DIR
 
 class NutritionCalculator:
     def __init__(self):
@@ -18,6 +18,16 @@ class NutritionCalculator:
             print(f"Veritabanı yüklendi: {len(self.food_db)} yemek")
         except Exception as e:
             print(f"Veritabanı yükleme hatası: {e}")
+        
+        # Model sınıflarının besin değerleri (datas.json) - paylaşılan model bu anahtarları döndürür
+        model_db_path = os.path.join(MODELS_DIR, "datas.json")
+        try:
+            with open(model_db_path, 'r', encoding='utf-8') as f:
+                model_foods = json.load(f)
+            for key, food in model_foods.items():
+                self.food_db.setdefault(key, food)
+        except Exception as e:
+            print(f"Model besin veritabanı yükleme hatası: {e}")
     
     def get_food_info(self, food_key):
         """Yemek bilgilerini getir"""
@@ -37,8 +47,8 @@ class NutritionCalculator:
             'weight': weight_grams,
             'calorie': round(food['calorie'] * factor, 1),
             'protein': round(food['protein'] * factor, 1),
-            'carb': round(food['carb'] * factor, 1),
-            'fat': round(food['fat'] * factor, 1)
+            'carb': round(food.get('carb', food.get('carbohydrate', 0)) * factor, 1),
+            'fat': round(food.get('fat', 0) * factor, 1)
         }
         
         return result
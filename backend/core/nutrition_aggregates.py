@@ -0,0 +1,132 @@
+# Besin Özetleri - Profil başına günlük/haftalık toplamlar
+#
+# Her add_measurement ölçümün besin değerlerini profilin gün ("2026-01-07") ve
+# ISO hafta ("2026-W02") kovalarına ekler; özet sorgusu ölçümleri değil, aralıktaki
+# kovaları okur (O(gün)). Kovalar veritabanı arka ucunda saklanır (JSON:
+# aggregates.json, SQLite: aggregates tablosu); rebuild tüm geçmişten yeniden
+# hesaplar. JSON geçmişi son 100 ölçümle sınırlıdır: kırpılan günlerin kovaları
+# korunur, yalnızca kalan ölçümlerin günleri yeniden hesaplanır.
+#
+#   python -m core.nutrition_aggregates rebuild
+
+from datetime import date, timedelta
+
+# Scan sonucu alanları (ai/postprocessing.py); eski kayıtlar calories/carb/carbs kullanır
+NUTRIENTS = ("calorie", "protein", "carbohydrate", "sugar")
+NUTRIENT_ALIASES = {
+    "calorie": ("calorie", "calories"),
+    "protein": ("protein",),
+    "carbohydrate": ("carbohydrate", "carb", "carbs"),
+    "sugar": ("sugar",)
+}
+PERIODS = ("day", "week")
+
+
+def measurement_totals(measurement):
+    """Ölçümün besin değerleri (önce nutrition sözlüğü, yoksa üst düzey alanlar)"""
+    nutrition = measurement.get("nutrition") or {}
+    totals = {}
+    for name, aliases in NUTRIENT_ALIASES.items():
+        value = next((nutrition[key] for key in aliases if nutrition.get(key) is not None), None)
+        if value is None:
+            value = next((measurement[key] for key in aliases if measurement.get(key) is not None), 0)
+        try:
+            totals[name] = float(value)
+        except (TypeError, ValueError):
+            totals[name] = 0.0
+    return totals
+
+
+def period_key(day, period):
+    """Gün veya ISO hafta anahtarı (sözlük sırası = zaman sırası)"""
+    if period == "day":
+        return day.isoformat()
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def measurement_keys(measurement):
+    """{dönem: anahtar} - ölçüm zaman damgasının günü/haftası"""
+    day = date.fromisoformat(measurement["timestamp"][:10])
+    return {period: period_key(day, period) for period in PERIODS}
+
+
+def empty_bucket():
+    return {**dict.fromkeys(NUTRIENTS, 0.0), "count": 0}
+
+
+def add_bucket(target, bucket):
+    """Kova toplamlarını target'a ekle"""
+    for name in NUTRIENTS:
+        target[name] += bucket[name]
+    target["count"] += bucket["count"]
+
+
+def accumulate(buckets, measurement):
+    """
+    Ölçümü kullanıcının kovalarına ekle
+
+    Args:
+        buckets: {"day": {anahtar: kova}, "week": {...}}
+    """
+    totals = measurement_totals(measurement)
+    for period, key in measurement_keys(measurement).items():
+        bucket = buckets.setdefault(period, {}).setdefault(key, empty_bucket())
+        for name, value in totals.items():
+            bucket[name] += value
+        bucket["count"] += 1
+
+
+def summary_range(period, since=None, until=None):
+    """
+    Sorgu aralığının kova anahtarları (ikisi de dahil)
+
+    Varsayılan: gün için son 7 gün, hafta için bu hafta.
+
+    Raises:
+        ValueError: Geçersiz dönem veya tarih
+    """
+    if period not in PERIODS:
+        raise ValueError(f"Bilinmeyen dönem: {period} (day / week)")
+    until = date.fromisoformat(until[:10]) if until else date.today()
+    if since:
+        since = date.fromisoformat(since[:10])
+    else:
+        since = until - timedelta(days=6) if period == "day" else until
+    return period_key(since, period), period_key(until, period)
+
+
+def summarize(period, first, last, rows):
+    """
+    Args:
+        rows: [(anahtar, kova)] anahtar sırasıyla
+
+    Returns:
+        {"period", "since", "until", "rows": [...], "total"}
+    """
+    total = empty_bucket()
+    result = []
+    for key, bucket in rows:
+        add_bucket(total, bucket)
+        result.append({"key": key, **_rounded(bucket)})
+    return {"period": period, "since": first, "until": last, "rows": result, "total": _rounded(total)}
+
+
+def _rounded(bucket):
+    return {**{name: round(bucket[name], 1) for name in NUTRIENTS}, "count": bucket["count"]}
+
+
+# Yeniden hesaplama komutu - mevcut geçmişten (DATABASE_BACKEND)
+if __name__ == "__main__":
+    import sys
+    from config import DATABASE_BACKEND
+    from core.database import create_database
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "rebuild"
+    if command != "rebuild":
+        print("Kullanım: python -m core.nutrition_aggregates rebuild")
+        sys.exit(1)
+    db = create_database(DATABASE_BACKEND)
+    count = db.rebuild_aggregates()
+    db.close()
+    print(f"Besin özetleri yeniden hesaplandı: {count} ölçüm ({DATABASE_BACKEND})")
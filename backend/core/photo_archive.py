@@ -0,0 +1,73 @@
+# Tarama Fotoğrafı Arşivi - Arka Planda Diske Yazma
+#
+# Tahmin bellekteki kare üzerinden yapılır; fotoğrafın JPEG olarak kaydedilmesi
+# isteğe bağlıdır ve kritik yolu bekletmemek için ayrı bir thread'de yapılır.
+
+import os
+import queue
+import threading
+
+
+class PhotoArchiver:
+    def __init__(self, photo_path, enabled=True, max_pending=2):
+        """
+        Args:
+            photo_path: Son tarama fotoğrafının yazılacağı dosya
+            enabled: False ise hiçbir şey kaydedilmez
+            max_pending: Kuyrukta bekleyebilecek en fazla kare
+        """
+        self.photo_path = photo_path
+        self.enabled = enabled
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.saved = 0
+        self.dropped = 0
+        self.worker = None
+
+        if self.enabled:
+            self.worker = threading.Thread(target=self._worker_loop, daemon=True)
+            self.worker.start()
+
+    def submit(self, frame):
+        """
+        Kareyi kaydetmek üzere kuyruğa ekle (beklemeden döner)
+
+        Returns:
+            Fotoğrafın yazılacağı yol (arşiv kapalıysa None)
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            self.queue.put_nowait(frame)
+        except queue.Full:
+            # Kuyruk doluysa en eski kareyi at - sadece en sonuncusu önemli
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+            self.queue.put_nowait(frame)
+        return self.photo_path
+
+    def _worker_loop(self):
+        while True:
+            frame = self.queue.get()
+            if frame is None:
+                break
+            try:
+                # Önce geçici dosyaya yaz, sonra yeniden adlandır (yarım dosya görünmesin)
+                tmp_path = self.photo_path + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(frame.to_jpeg())
+                os.replace(tmp_path, self.photo_path)
+                self.saved += 1
+            except Exception as e:
+                print(f"[PhotoArchiver] Kaydetme hatası: {e}")
+
+    def stop(self):
+        """Bekleyen kareleri yaz ve thread'i durdur"""
+        if self.worker is None:
+            return
+        self.queue.put(None)
+        self.worker.join(timeout=5)
+        self.worker = None
@@ -0,0 +1,68 @@
+# Single-Flight - Eşzamanlı istekleri tek çalıştırmada birleştirme
+#
+# Aynı anahtarla gelen çağrılardan ilki işi başlatır; iş sürerken (veya bittikten
+# sonraki kısa pencere içinde) gelen diğer çağrılar yeni iş başlatmadan aynı
+# sonucu alır. Sadece event loop thread'inden kullanılmalıdır.
+
+import asyncio
+import time
+
+
+class SingleFlight:
+    def __init__(self, window=0.0):
+        """
+        Args:
+            window: Tamamlanan sonucun yeni çağrılarla paylaşılacağı süre (saniye)
+        """
+        self.window = window
+        self.inflight = {}  # anahtar -> asyncio.Task
+        self.recent = {}  # anahtar -> (bitiş zamanı, sonuç)
+
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn):
+        """
+        fn() coroutine'ini anahtar başına tek sefer çalıştır, sonucu tüm bekleyenlere dağıt
+
+        Dönen sonuç çağıranlar arasında paylaşılır, değiştirilmemelidir.
+        """
+        self.calls += 1
+
+        recent = self.recent.get(key)
+        if recent is not None and time.monotonic() - recent[0] <= self.window:
+            self.coalesced += 1
+            return recent[1]
+
+        task = self.inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(self._run(key, fn))
+            # Bekleyen kalmazsa "exception was never retrieved" uyarısı çıkmasın
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self.inflight[key] = task
+        else:
+            self.coalesced += 1
+
+        # shield: bir çağıranın bağlantısı koparsa ortak iş iptal olmasın
+        return await asyncio.shield(task)
+
+    async def _run(self, key, fn):
+        try:
+            result = await fn()
+            if self.window > 0:
+                self.recent[key] = (time.monotonic(), result)
+            return result
+        finally:
+            self.inflight.pop(key, None)
+
+    def get_stats(self):
+        """Birleştirme metrikleri"""
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "inflight": len(self.inflight),
+            "window": self.window
+        }
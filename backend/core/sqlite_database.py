@@ -0,0 +1,532 @@
+# SQLite Veritabanı - Database ile aynı arayüz, indeksli tablolar (WAL)
+#
+# JSON arka ucu her değişiklikte tüm dosyayı okuyup yeniden yazar ve ölçüm
+# geçmişini son 100 kayıtla sınırlar. Burada her kayıt tek satırdır: ekleme ve
+# kullanıcı ölçümleri (user_id, timestamp) indeksiyle geçmiş büyüdükçe
+# yavaşlamaz. WAL modunda okumalar yazmayı beklemez, synchronous=NORMAL ile
+# güç kesintisinde en fazla son işlemler kaybolur, dosya bozulmaz.
+#
+# Ölçümler JSON arka ucundaki biçimiyle (eski kayıtlar dahil) data sütununda
+# saklanır; sorgulanan alanlar (user_id, timestamp) ayrı, indeksli sütunlardır.
+# İlk açılışta data/*.json dosyaları bir kez içe aktarılır (migrate_json);
+# JSON dosyalarına dokunulmaz.
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from config import DATA_DIR, DATABASE_FILE
+from core.database import make_cursor, normalize_timestamp, parse_cursor
+from core.nutrition_aggregates import (
+    NUTRIENTS, accumulate, measurement_totals, measurement_keys, summary_range, summarize
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    gender TEXT,
+    height NUMERIC,
+    weight NUMERIC,
+    created_at TEXT,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS plates (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    weight NUMERIC,
+    created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS measurements (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    timestamp TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS measurements_user_time ON measurements (user_id, timestamp);
+CREATE INDEX IF NOT EXISTS measurements_time ON measurements (timestamp);
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS aggregates (
+    user_id INTEGER,
+    period TEXT NOT NULL,
+    key TEXT NOT NULL,
+    calorie REAL NOT NULL DEFAULT 0,
+    protein REAL NOT NULL DEFAULT 0,
+    carbohydrate REAL NOT NULL DEFAULT 0,
+    sugar REAL NOT NULL DEFAULT 0,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, period, key)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+DEFAULT_SETTINGS = {
+    "wallpaper": None,  # Seçili arka plan (None = varsayılan)
+    "sound_enabled": True,
+    "brightness": 100
+}
+
+
+class SQLiteDatabase:
+    def __init__(self, path=None, data_dir=DATA_DIR, migrate=True):
+        """
+        Args:
+            path: Veritabanı dosyası (varsayılan: data_dir/DATABASE_FILE)
+            data_dir: JSON dosyalarının bulunduğu klasör (ilk açılışta içe aktarılır)
+            migrate: JSON içe aktarma yapılsın
+        """
+        self.data_dir = data_dir
+        os.makedirs(data_dir, exist_ok=True)
+        self.path = path or os.path.join(data_dir, DATABASE_FILE)
+
+        # Endpoint'ler hem event loop'tan hem thread havuzundan çağrılır: tek bağlantı + kilit
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+        if migrate:
+            self.migrate_json()
+
+        # Besin özetleri yoksa (ilk açılış / eski veritabanı) mevcut geçmişten hesapla
+        if not self._query("SELECT value FROM meta WHERE key = 'aggregates_built'"):
+            self.rebuild_aggregates()
+
+    def _execute(self, sql, params=()):
+        """Tek yazma işlemi (commit ile)"""
+        with self.lock, self.conn:
+            return self.conn.execute(sql, params)
+
+    def _query(self, sql, params=()):
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    # --- JSON içe aktarma ---
+
+    def migrate_json(self):
+        """
+        data/*.json dosyalarını bir kez içe aktar (profil/tabak ID'leri korunur)
+
+        Returns:
+            İçe aktarılan kayıt sayıları (zaten yapıldıysa None)
+        """
+        with self.lock:
+            done = self.conn.execute("SELECT value FROM meta WHERE key = 'json_migrated'").fetchone()
+        if done is not None:
+            return None
+
+        counts = {}
+        with self.lock, self.conn:
+            conn = self.conn
+            profiles = self._load_json("profiles.json", {}).get("profiles", [])
+            conn.executemany(
+                "INSERT OR REPLACE INTO profiles (id, name, gender, height, weight, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(p["id"], p.get("name"), p.get("gender"), p.get("height"), p.get("weight"),
+                  p.get("created_at"), p.get("updated_at")) for p in profiles]
+            )
+            counts["profiles"] = len(profiles)
+
+            plates = self._load_json("plates.json", {}).get("plates", [])
+            conn.executemany(
+                "INSERT OR REPLACE INTO plates (id, name, weight, created_at) VALUES (?, ?, ?, ?)",
+                [(p["id"], p.get("name"), p.get("weight"), p.get("created_at")) for p in plates]
+            )
+            counts["plates"] = len(plates)
+
+            measurements = [m for m in self._load_json("measurements.json", {}).get("measurements", [])
+                            if m.get("timestamp")]
+            conn.executemany(
+                "INSERT INTO measurements (user_id, timestamp, data) VALUES (?, ?, ?)",
+                [self._measurement_row(m) for m in measurements]
+            )
+            counts["measurements"] = len(measurements)
+
+            users = self._load_json("users.json", {}).get("users", {})
+            conn.executemany(
+                "INSERT OR REPLACE INTO users (id, data) VALUES (?, ?)",
+                [(str(key), json.dumps(value, ensure_ascii=False)) for key, value in users.items()]
+            )
+            counts["users"] = len(users)
+
+            settings = self._load_json("settings.json", {})
+            conn.executemany(
+                "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value, ensure_ascii=False)) for key, value in settings.items()]
+            )
+            counts["settings"] = len(settings)
+
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('json_migrated', ?)",
+                (datetime.now().isoformat(),)
+            )
+
+        if any(counts.values()):
+            print(f"[DB] JSON verileri SQLite'a aktarıldı: {counts}")
+        return counts
+
+    def _load_json(self, filename, default):
+        filepath = os.path.join(self.data_dir, filename)
+        if not os.path.exists(filepath):
+            return default
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"[DB] JSON içe aktarma hatası ({filename}): {e}")
+            return default
+
+    # --- Ölçümler ---
+
+    @staticmethod
+    def _measurement_row(measurement):
+        return (
+            measurement.get("user_id"), measurement["timestamp"],
+            json.dumps(measurement, ensure_ascii=False)
+        )
+
+    @staticmethod
+    def _measurement(row):
+        """Satırdan ölçüm (JSON arka ucundaki biçim + id)"""
+        # İçe aktarılan JSON kayıtlarının kendi id'si olabilir: satır id'si geçerli
+        return {**json.loads(row["data"]), "id": row["id"]}
+
+    def add_measurement(self, user_id, food_name, weight, nutrition, bmi_data):
+        """Ölçüm kaydet (geçmiş sınırı yok)"""
+        measurement = {
+            "timestamp": datetime.now().isoformat(),
+            "user_id": user_id,
+            "food_name": food_name,
+            "food": food_name,  # Backward compatibility
+            "weight": weight,
+            "calories": nutrition.get("calories", 0),
+            "protein": nutrition.get("protein", 0),
+            "carbs": nutrition.get("carbs", 0),
+            "fat": nutrition.get("fat", 0),
+            "confidence": nutrition.get("confidence", 0),
+            "nutrition": nutrition,
+            "bmi": bmi_data
+        }
+        try:
+            # Ölçüm ve özet kovaları tek işlemde
+            with self.lock, self.conn:
+                self.conn.execute(
+                    "INSERT INTO measurements (user_id, timestamp, data) VALUES (?, ?, ?)",
+                    self._measurement_row(measurement)
+                )
+                self._add_to_aggregates(measurement)
+            return True
+        except sqlite3.Error as e:
+            print(f"[DB] Ölçüm kaydetme hatası: {e}")
+            return False
+
+    def get_measurements_by_user(self, user_id):
+        """Kullanıcıya ait tüm ölçümleri getir (eskiden yeniye)"""
+        rows = self._query(
+            "SELECT * FROM measurements WHERE user_id = ? ORDER BY timestamp, id", (user_id,)
+        )
+        return [self._measurement(row) for row in rows]
+
+    def query_measurements(self, user_id=None, since=None, until=None, before=None, limit=None):
+        """
+        Ölçümler, en yeniden eskiye (sayfalı) - indeks sırasında okunur, sıralama yapılmaz
+
+        Args:
+            user_id: Sadece bu kullanıcı (None: tümü)
+            since: Bu zamandan (dahil) sonraki ölçümler (ISO tarih/zaman)
+            until: Bu zamandan (hariç) önceki ölçümler
+            before: Sayfa imleci - önceki sayfanın next_cursor değeri
+            limit: Sayfa boyutu (None: tümü)
+
+        Returns:
+            (ölçümler, next_cursor - sonraki sayfa yoksa None)
+        """
+        conditions, params = [], []
+        if user_id is not None:
+            conditions.append("user_id = ?")
+            params.append(user_id)
+        for op, value in ((">=", since), ("<", until)):
+            value = normalize_timestamp(value)
+            if value is not None:
+                conditions.append(f"timestamp {op} ?")
+                params.append(value)
+        before = parse_cursor(before)
+        if before is not None:
+            if before[1] is None:
+                conditions.append("timestamp < ?")
+                params.append(before[0])
+            else:
+                # Aynı zaman damgalı satırlar id ile ayrışır (indeks satır id'sini de içerir)
+                conditions.append("(timestamp, id) < (?, ?)")
+                params.extend(before)
+        sql = "SELECT * FROM measurements"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY timestamp DESC, id DESC"
+        if limit is not None:
+            # Bir fazlası: sonraki sayfa var mı
+            sql += " LIMIT ?"
+            params.append(limit + 1)
+        rows = self._query(sql, params)
+        page = [self._measurement(row) for row in rows[:limit]]
+        next_cursor = make_cursor(page[-1]) if limit is not None and len(rows) > limit else None
+        return page, next_cursor
+
+    # --- Besin özetleri ---
+
+    def _add_to_aggregates(self, measurement):
+        """Ölçümü gün/hafta kovalarına ekle (self.lock ve işlem içinde)"""
+        totals = measurement_totals(measurement)
+        values = [totals[name] for name in NUTRIENTS]
+        for period, key in measurement_keys(measurement).items():
+            self.conn.execute(
+                "INSERT INTO aggregates (user_id, period, key, calorie, protein, carbohydrate, sugar, count) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, 1) ON CONFLICT (user_id, period, key) DO UPDATE SET "
+                "calorie = calorie + excluded.calorie, protein = protein + excluded.protein, "
+                "carbohydrate = carbohydrate + excluded.carbohydrate, sugar = sugar + excluded.sugar, "
+                "count = count + 1",
+                (measurement.get("user_id"), period, key, *values)
+            )
+
+    def rebuild_aggregates(self):
+        """
+        Besin özetlerini tüm geçmişten yeniden hesapla
+
+        Returns:
+            İşlenen ölçüm sayısı
+        """
+        users = {}
+        count = 0
+        with self.lock, self.conn:
+            for row in self.conn.execute("SELECT user_id, data FROM measurements"):
+                accumulate(users.setdefault(row["user_id"], {}), json.loads(row["data"]))
+                count += 1
+            self.conn.execute("DELETE FROM aggregates")
+            self.conn.executemany(
+                "INSERT INTO aggregates (user_id, period, key, calorie, protein, carbohydrate, sugar, count) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(user_id, period, key, *(bucket[name] for name in NUTRIENTS), bucket["count"])
+                 for user_id, buckets in users.items()
+                 for period, keys in buckets.items()
+                 for key, bucket in keys.items()]
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('aggregates_built', ?)",
+                (datetime.now().isoformat(),)
+            )
+        return count
+
+    def get_nutrition_summary(self, user_id, period="day", since=None, until=None):
+        """
+        Profilin gün/hafta besin toplamları (aralıktaki kovalar, ölçümler okunmaz)
+
+        Args:
+            period: "day" veya "week"
+            since, until: ISO tarih (ikisi de dahil) - varsayılan son 7 gün / bu hafta
+        """
+        first, last = summary_range(period, since, until)
+        rows = self._query(
+            "SELECT * FROM aggregates WHERE user_id = ? AND period = ? AND key BETWEEN ? AND ? ORDER BY key",
+            (user_id, period, first, last)
+        )
+        return summarize(period, first, last, [(row["key"], dict(row)) for row in rows])
+
+    def get_all_measurements(self):
+        """Tüm ölçümler (eskiden yeniye)"""
+        rows = self._query("SELECT * FROM measurements ORDER BY id")
+        return [self._measurement(row) for row in rows]
+
+    # --- Kullanıcılar ---
+
+    def get_user(self, user_id):
+        """Kullanıcı bilgisi getir"""
+        rows = self._query("SELECT data FROM users WHERE id = ?", (str(user_id),))
+        return json.loads(rows[0]["data"]) if rows else None
+
+    def save_user(self, user_id, user_data):
+        """Kullanıcı bilgisi kaydet"""
+        self._execute(
+            "INSERT OR REPLACE INTO users (id, data) VALUES (?, ?)",
+            (str(user_id), json.dumps(user_data, ensure_ascii=False))
+        )
+        return True
+
+    # --- Profiller ---
+
+    @staticmethod
+    def _profile(row):
+        profile = {
+            "id": row["id"],
+            "name": row["name"],
+            "gender": row["gender"],
+            "height": row["height"],
+            "weight": row["weight"],
+            "created_at": row["created_at"]
+        }
+        if row["updated_at"]:
+            profile["updated_at"] = row["updated_at"]
+        return profile
+
+    def get_all_profiles(self):
+        """Tüm profilleri getir"""
+        return [self._profile(row) for row in self._query("SELECT * FROM profiles ORDER BY id")]
+
+    def get_profile(self, profile_id):
+        """ID ile profil (yoksa None)"""
+        rows = self._query("SELECT * FROM profiles WHERE id = ?", (profile_id,))
+        return self._profile(rows[0]) if rows else None
+
+    def add_profile(self, name, gender, height, weight):
+        """Yeni profil ekle (ID'ler silinen profillerden sonra da tekrar kullanılmaz)"""
+        created_at = datetime.now().isoformat()
+        cursor = self._execute(
+            "INSERT INTO profiles (name, gender, height, weight, created_at) VALUES (?, ?, ?, ?, ?)",
+            (name, gender, height, weight, created_at)
+        )
+        return {
+            "id": cursor.lastrowid,
+            "name": name,
+            "gender": gender,
+            "height": height,
+            "weight": weight,
+            "created_at": created_at
+        }
+
+    def update_profile(self, profile_id, name, gender, height, weight):
+        """Profil güncelle"""
+        self._execute(
+            "UPDATE profiles SET name = ?, gender = ?, height = ?, weight = ?, updated_at = ? WHERE id = ?",
+            (name, gender, height, weight, datetime.now().isoformat(), profile_id)
+        )
+        return True
+
+    def delete_profile(self, profile_id):
+        """Profil sil"""
+        self._execute("DELETE FROM profiles WHERE id = ?", (profile_id,))
+        return True
+
+    # --- Ayarlar ---
+
+    def get_settings(self):
+        """Uygulama ayarlarını getir"""
+        settings = dict(DEFAULT_SETTINGS)
+        for row in self._query("SELECT key, value FROM settings"):
+            settings[row["key"]] = json.loads(row["value"])
+        return settings
+
+    def save_setting(self, key, value):
+        """Tek bir ayarı kaydet"""
+        self._execute(
+            "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+            (key, json.dumps(value, ensure_ascii=False))
+        )
+        return True
+
+    def get_wallpaper(self):
+        """Kayıtlı arka planı getir"""
+        return self.get_settings().get("wallpaper")
+
+    def save_wallpaper(self, wallpaper_name):
+        """Arka plan seçimini kaydet"""
+        return self.save_setting("wallpaper", wallpaper_name)
+
+    # --- Tabaklar ---
+
+    def get_all_plates(self):
+        """Tüm tabakları getir"""
+        rows = self._query("SELECT id, name, weight, created_at FROM plates ORDER BY id")
+        return [dict(row) for row in rows]
+
+    def get_plate(self, plate_id):
+        """ID ile tabak (yoksa None)"""
+        rows = self._query("SELECT id, name, weight, created_at FROM plates WHERE id = ?", (plate_id,))
+        return dict(rows[0]) if rows else None
+
+    def add_plate(self, name, weight):
+        """Yeni tabak ekle"""
+        created_at = datetime.now().isoformat()
+        cursor = self._execute(
+            "INSERT INTO plates (name, weight, created_at) VALUES (?, ?, ?)",
+            (name, weight, created_at)
+        )
+        return {"id": cursor.lastrowid, "name": name, "weight": weight, "created_at": created_at}
+
+    def delete_plate(self, plate_id):
+        """Tabak sil"""
+        self._execute("DELETE FROM plates WHERE id = ?", (plate_id,))
+        return True
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def benchmark(sizes=(1000, 10000, 50000, 100000), probes=200):
+    """
+    Geçmiş büyürken ekleme ve sorgu maliyeti
+
+    Her boyutta probes kadar tek tek ekleme (her biri ayrı commit) ve az ölçümlü
+    bir kullanıcının geçmişi + profil listesi sorgulanır. Aradaki dolgu toplu eklenir.
+    """
+    import tempfile
+    import time
+
+    nutrition = {"calories": 250, "protein": 12, "carbs": 30, "fat": 8, "confidence": 0.9}
+    with tempfile.TemporaryDirectory() as directory:
+        db = SQLiteDatabase(os.path.join(directory, "bench.db"), data_dir=directory, migrate=False)
+        for i in range(5):
+            db.add_profile(f"Profil {i}", "female", 165, 60)
+        # Az ölçümlü kullanıcı: sorgu süresi toplam geçmişten bağımsız olmalı
+        for _ in range(20):
+            db.add_measurement(99, "elma", 150, nutrition, None)
+
+        rows = 0
+        for size in sizes:
+            timestamp = datetime.now().isoformat()
+            fill = [SQLiteDatabase._measurement_row({"timestamp": timestamp, "user_id": i % 5 + 1,
+                                                     "food_name": "pilav", "weight": 200, "nutrition": nutrition})
+                    for i in range(size - rows - probes)]
+            with db.lock, db.conn:
+                db.conn.executemany(
+                    "INSERT INTO measurements (user_id, timestamp, data) VALUES (?, ?, ?)", fill
+                )
+            started = time.perf_counter()
+            for i in range(probes):
+                db.add_measurement(i % 5 + 1, "pilav", 200, nutrition, None)
+            insert_ms = (time.perf_counter() - started) / probes * 1000
+            rows = size
+
+            started = time.perf_counter()
+            for _ in range(probes):
+                history = db.get_measurements_by_user(99)
+                db.get_all_profiles()
+            query_ms = (time.perf_counter() - started) / probes * 1000
+            print(f"{size:7d} ölçüm: ekleme {insert_ms:6.3f} ms, geçmiş ({len(history)}) + profiller {query_ms:6.3f} ms")
+        db.close()
+
+
+# Test fonksiyonu - JSON içe aktarma ve benchmark
+#   python -m core.sqlite_database [migrate|benchmark]
+if __name__ == "__main__":
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "benchmark"
+    if command == "migrate":
+        db = SQLiteDatabase(migrate=False)
+        print(db.migrate_json() or "JSON verileri daha önce aktarılmış")
+    else:
+        benchmark()
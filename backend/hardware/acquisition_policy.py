@@ -0,0 +1,107 @@
+# Örnekleme Güç Politikası - tam hız / düşük hız / uyku (HX711 kapalı)
+#
+# Ağırlık değişirken, iş (tare/kalibrasyon) beklerken veya bir istemci canlı
+# veri isterken tam hızda örneklenir. Tartı kararlı ve kimse izlemiyorsa
+# idle_after sonra düşük hıza, sleep_after sonra uykuya geçilir: HX711 kapatılır
+# ve sadece sleep_check aralıklarıyla kısa bir kontrol için açılır. Her durumda
+# geçen süre ve HX711'in açık kaldığı oran (duty cycle) raporlanır.
+
+ACTIVE = "active"
+IDLE = "idle"
+SLEEP = "sleep"
+
+
+class AcquisitionPolicy:
+    def __init__(self, idle_after=30.0, sleep_after=600.0, enabled=True):
+        """
+        Args:
+            idle_after: Hareketsizlikten sonra düşük hıza geçiş (saniye, 0: kapalı)
+            sleep_after: Hareketsizlikten sonra uyku (saniye, 0: kapalı)
+            enabled: False ise hep tam hız
+        """
+        self.idle_after = idle_after
+        self.sleep_after = sleep_after
+        self.enabled = enabled
+
+        self.state = ACTIVE
+        self.last_activity = None
+        self.last_update = None
+        self.time_in = {ACTIVE: 0.0, IDLE: 0.0, SLEEP: 0.0}
+        self.powered = True
+        self.powered_time = 0.0
+        self.transitions = 0
+
+    def update(self, now, busy, settled):
+        """
+        Args:
+            busy: İstemci/iş tam hız istiyor
+            settled: Ağırlık boş veya kararlı (değişmiyor)
+
+        Returns:
+            Hedef durum: ACTIVE / IDLE / SLEEP
+        """
+        self._account(now)
+        if self.last_activity is None or busy or not settled or not self.enabled:
+            self.last_activity = now
+
+        quiet = now - self.last_activity
+        if self.sleep_after and quiet >= self.sleep_after:
+            state = SLEEP
+        elif self.idle_after and quiet >= self.idle_after:
+            state = IDLE
+        else:
+            state = ACTIVE
+
+        if state != self.state:
+            self.transitions += 1
+            print(f"[Scale] Örnekleme: {self.state} -> {state}")
+            self.state = state
+        return state
+
+    def set_powered(self, now, powered):
+        """HX711 açıldı/kapandı (duty cycle için)"""
+        self._account(now)
+        self.powered = powered
+
+    def _account(self, now):
+        if self.last_update is not None:
+            elapsed = now - self.last_update
+            self.time_in[self.state] += elapsed
+            if self.powered:
+                self.powered_time += elapsed
+        self.last_update = now
+
+    def get_stats(self, now):
+        """Durum süreleri ve duty cycle (HX711'in açık kaldığı süre oranı)"""
+        self._account(now)
+        total = sum(self.time_in.values())
+        return {
+            "state": self.state,
+            "enabled": self.enabled,
+            "powered": self.powered,
+            "time_in": {state: round(seconds, 1) for state, seconds in self.time_in.items()},
+            "duty_cycle": round(self.powered_time / total, 3) if total else 1.0,
+            "transitions": self.transitions
+        }
+
+
+# Test fonksiyonu - 15 dk'lık sentetik gün: 1 dk kullanım, sonra boşta
+if __name__ == "__main__":
+    policy = AcquisitionPolicy(idle_after=30.0, sleep_after=300.0)
+    sleep_check, wake_time = 5.0, 0.5
+    next_check = None
+    t = 0.0
+    while t < 900.0:
+        busy = t < 60.0
+        state = policy.update(t, busy, settled=not busy)
+        if state == SLEEP:
+            # Uykuda: sleep_check'te bir kez wake_time kadar açılır
+            if next_check is None or t >= next_check:
+                policy.set_powered(t, True)
+                next_check = t + sleep_check
+            elif policy.powered and t >= next_check - sleep_check + wake_time:
+                policy.set_powered(t, False)
+        elif not policy.powered:
+            policy.set_powered(t, True)
+        t += 0.1
+    print(policy.get_stats(t))
@@ -0,0 +1,173 @@
+# Tartı Kalibrasyon Profili - kalıcı offset / reference unit ve sıfır takibi
+#
+# Tare ve kalibrasyon sonuçları data/ altında saklanır; açılışta yüklenince
+# tare beklenmeden API hazır olur. Çok noktalı doğrusallaştırma tablosu yük
+# hücresinin doğrusal olmayan hatasını düzeltir. ZeroTracker, tartı boş ve
+# sakinken offset'i yavaşça ham okumaya çeker (sıcaklık kayması).
+
+import json
+import os
+from datetime import datetime
+
+
+class CalibrationStore:
+    """Kalibrasyon profili: {"reference_unit", "offset", "timestamp", "linearization", "cells"}"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        """Kayıtlı profil (yoksa veya bozuksa None)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                profile = json.load(f)
+            float(profile["reference_unit"]), float(profile["offset"])
+            return profile
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"[Calibration] Profil okunamadı ({self.path}): {e}")
+            return None
+
+    def save(self, reference_unit, offset, linearization=None, cells=None):
+        """
+        Profili kaydet (geçici dosya + rename: yarım yazılmış profil kalmaz)
+
+        Args:
+            cells: Çoklu hücrede {"trims", "zeros"}
+        """
+        profile = {
+            "reference_unit": reference_unit,
+            "offset": offset,
+            "timestamp": datetime.now().isoformat(),
+            "linearization": linearization or []
+        }
+        if cells is not None:
+            profile["cells"] = cells
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(profile, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            return profile
+        except Exception as e:
+            print(f"[Calibration] Profil kaydedilemedi: {e}")
+            return None
+
+
+class LinearizationTable:
+    """
+    Parçalı doğrusal düzeltme: [[ölçülen_gram, gerçek_gram], ...]
+
+    (0, 0) noktası örtük olarak eklenir; son noktadan sonra son parçanın eğimi
+    kullanılır, sıfırın altı düzeltilmez.
+    """
+
+    def __init__(self, points=None):
+        self.set_points(points or [])
+
+    def set_points(self, points):
+        points = sorted((float(m), float(a)) for m, a in points if m > 0)
+        self.points = [list(p) for p in points]
+        self.measured = [0.0] + [m for m, _ in points]
+        self.actual = [0.0] + [a for _, a in points]
+
+    def add_point(self, measured, actual):
+        """Nokta ekle (aynı ölçülen değere yakın eski nokta değiştirilir)"""
+        points = [p for p in self.points if abs(p[0] - measured) > 1.0]
+        self.set_points(points + [[measured, actual]])
+
+    def apply(self, grams):
+        measured = self.measured
+        if len(measured) < 2 or grams <= 0:
+            return grams
+        actual = self.actual
+        # Tablo birkaç nokta - doğrusal arama yeterli
+        i = 1
+        while i < len(measured) - 1 and grams > measured[i]:
+            i += 1
+        slope = (actual[i] - actual[i - 1]) / (measured[i] - measured[i - 1])
+        return actual[i - 1] + (grams - measured[i - 1]) * slope
+
+
+class ZeroTracker:
+    """
+    Otomatik sıfır takibi
+
+    Tartı boş, kararlı ve okunan değer band içindeyse offset, filtrelenmiş ham
+    değere her örnekte rate oranında yaklaştırılır. Toplam düzeltme son tare'e
+    göre max_drift gramla sınırlıdır; yavaşça konan gerçek bir yük sıfırlanmaz.
+    """
+
+    def __init__(self, band=1.0, rate=0.02, max_drift=20.0):
+        """
+        Args:
+            band: Sıfır kabul edilen en fazla sapma (gram)
+            rate: Örnek başına düzeltme oranı (0-1)
+            max_drift: Tare offset'inden en fazla toplam düzeltme (gram)
+        """
+        self.band = band
+        self.rate = rate
+        self.max_drift = max_drift
+        self.base_offset = None
+        self.corrections = 0
+
+    def reset(self, offset):
+        """Tare/kalibrasyon/profil yüklemesinden sonra referans offset"""
+        self.base_offset = offset
+
+    def update(self, offset, filtered_raw, reference_unit, settled):
+        """
+        Returns:
+            Yeni offset veya düzeltme yoksa None
+        """
+        if not settled or self.base_offset is None:
+            return None
+        if abs(filtered_raw - offset) > self.band * abs(reference_unit):
+            return None
+
+        new_offset = offset + self.rate * (filtered_raw - offset)
+        limit = self.max_drift * abs(reference_unit)
+        new_offset = min(max(new_offset, self.base_offset - limit), self.base_offset + limit)
+        if new_offset == offset:
+            return None
+        self.corrections += 1
+        return new_offset
+
+    def drift(self, offset, reference_unit):
+        """Tare'den bu yana düzeltilen kayma (gram)"""
+        if self.base_offset is None:
+            return 0.0
+        return (offset - self.base_offset) / reference_unit
+
+
+# Test fonksiyonu - yavaş sıcaklık kayması ve doğrusallaştırma
+if __name__ == "__main__":
+    import random
+
+    random.seed(0)
+    reference_unit = 210.0
+    offset = 8400.0
+    tracker = ZeroTracker()
+    tracker.reset(offset)
+
+    # 10 örnek/sn, 10 dakikada +3 g kayma (boş tartı)
+    for i in range(6000):
+        drift_raw = 3.0 * reference_unit * i / 6000
+        filtered = 8400 + drift_raw + random.gauss(0, 10)
+        new_offset = tracker.update(offset, filtered, reference_unit, settled=True)
+        if new_offset is not None:
+            offset = new_offset
+        if i % 1000 == 999:
+            error = (8400 + drift_raw - offset) / reference_unit
+            print(f"t={(i + 1) / 10:5.0f}s kayma: {drift_raw / reference_unit:5.2f} g  takip: "
+                  f"{tracker.drift(offset, reference_unit):5.2f} g  kalan hata: {error:5.2f} g")
+
+    table = LinearizationTable([[100.4, 100.0], [497.0, 500.0], [1005.0, 1000.0]])
+    for grams in (50.0, 100.4, 300.0, 497.0, 750.0, 1005.0, 1500.0):
+        print(f"ölçülen {grams:7.1f} g -> düzeltilmiş {table.apply(grams):7.1f} g")
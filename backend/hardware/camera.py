@@ -1,4 +1,4 @@
-# Kamera Modülü - Görüntü Yakalama (rpicam-still CLI Wrapper)
+# Kamera Modülü - Görüntü Yakalama (Sürekli açık kamera akışı)
 
 import os
 import subprocess
@@ -6,7 +6,12 @@ import time
 import platform
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont
-from config import CAMERA_RESOLUTION, CAMERA_FORMAT, CAMERA_ROTATION
+from config import (
+    CAMERA_RESOLUTION, CAMERA_FORMAT, CAMERA_ROTATION,
+    CAMERA_STREAM_BACKEND, CAMERA_STREAM_FPS, CAMERA_STREAM_FORMAT,
+    CAMERA_CAPTURE_TIMEOUT, CAMERA_STREAM_ARGS
+)
+from hardware.camera_stream import CameraStream, create_frame_source
 
 class Camera:
     def __init__(self):
@@ -17,22 +22,28 @@ class Camera:
         
         if self.mock_mode:
             print("[Camera] Mock mod aktif (Raspberry Pi dışı platform)")
-            self.temp_file = None
+            self.vid_cmd = None
         else:
-            # rpicam-still komutunun varlığını kontrol et
-            self.cmd = "rpicam-still"
-            self.vid_cmd = "rpicam-vid"  # Video önizleme için
+            # rpicam-vid komutunun varlığını kontrol et (önizleme için)
+            self.vid_cmd = "rpicam-vid"
             try:
-                subprocess.run([self.cmd, "--help"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+                subprocess.run([self.vid_cmd, "--help"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
             except (FileNotFoundError, subprocess.CalledProcessError):
-                print(f"[Uyarı] '{self.cmd}' bulunamadı. 'libcamera-still' deneniyor...")
-                self.cmd = "libcamera-still"
+                print(f"[Uyarı] '{self.vid_cmd}' bulunamadı. 'libcamera-vid' kullanılacak...")
                 self.vid_cmd = "libcamera-vid"
-                
-            print(f"[Camera] CLI modu kullanılıyor ({self.cmd})")
-            
-            # Geçici dosya yolu
-            self.temp_file = "/tmp/nutriquant_cam_capture.jpg"
+        
+        # Sensörü sürekli açık tut - her çekimde süreç başlatma maliyeti yok
+        source = create_frame_source(
+            CAMERA_STREAM_BACKEND,
+            CAMERA_RESOLUTION,
+            CAMERA_STREAM_FPS,
+            mock_mode=self.mock_mode,
+            extra_args=CAMERA_STREAM_ARGS,
+            format=CAMERA_STREAM_FORMAT
+        )
+        self.stream = CameraStream(source)
+        self.stream.start()
+        print(f"[Camera] Kamera akışı başlatıldı ({source.name})")
     
     def _detect_raspberry_pi(self):
         """Raspberry Pi platformunu tespit et"""
@@ -48,47 +59,34 @@ class Camera:
         except:
             return False
 
+    def capture_frame(self, timeout=CAMERA_CAPTURE_TIMEOUT):
+        """
+        Çağrıdan sonra yakalanan ilk kareyi döndür (Frame)
+        
+        Raises:
+            TimeoutError: Akış süre içinde kare vermezse (önizleme açıkken akış durur)
+        """
+        return self.stream.wait_for_next_frame(timeout=timeout)
+
     def capture_image(self):
-        """Görüntü yakala ve numpy array döndür"""
-        # Mock modda gerçek kamera kullanma
-        if self.mock_mode:
-            return self._get_mock_image()
+        """
+        Görüntü yakala ve numpy array döndür
         
+        Raises:
+            TimeoutError: Gerçek kamerada kare alınamazsa (akış durmuş/yeniden
+                başlıyor, örn. önizleme açık) - sahte görüntü sınıflandırılmasın
+        """
         try:
-            # Komut: rpicam-still -n (preview yok) -t 100 (100ms gecikme) --width W --height H -o output.jpg
-            # --nopreview (-n) önemli, yoksa ekrana basmaya çalışır
-            # -t süresi pozlama ve AWB için biraz zaman tanır. Çok kısa olursa karanlık/yeşil çıkabilir.
-            cmd_args = [
-                self.cmd,
-                "-n",
-                "-t", "200", 
-                "--width", str(CAMERA_RESOLUTION[0]),
-                "--height", str(CAMERA_RESOLUTION[1]),
-                "-o", self.temp_file,
-                "--force" # Dosya varsa üzerine yaz
-            ]
-            
-            # Komutu çalıştır
-            subprocess.run(cmd_args, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            frame = self.capture_frame()
             
-            # Dosyayı oku
-            if os.path.exists(self.temp_file):
-                pil_image = Image.open(self.temp_file)
-                pil_image = pil_image.convert("RGB")
-                
-                # Döndürme işlemi
-                if CAMERA_ROTATION != 0:
-                    pil_image = pil_image.rotate(CAMERA_ROTATION)
-                
-                # Numpy array'e çevir
-                image_array = np.array(pil_image)
-                return image_array
-            else:
-                print("Hata: Görüntü dosyası oluşturulamadı.")
-                return self._get_mock_image()
+            if CAMERA_ROTATION != 0:
+                return np.array(frame.to_pil().rotate(CAMERA_ROTATION))
+            return frame.to_array()
                 
         except Exception as e:
             print(f"Kamera yakalama hatası: {e}")
+            if not self.mock_mode:
+                raise
             return self._get_mock_image()
 
     def _get_mock_image(self):
@@ -136,8 +134,6 @@ class Camera:
     
     def save_image(self, filepath):
         """Görüntüyü dosyaya kaydet"""
-        # Zaten dosyaya kaydediyoruz ama istenen yere kopyalayalım/taşıyalım
-        # Veya yeniden capture yapalım
         array = self.capture_image()
         image = Image.fromarray(array)
         image.save(filepath)
@@ -153,6 +149,9 @@ class Camera:
             print("[Camera] Önizleme zaten çalışıyor")
             return True
         
+        # Kamera aynı anda tek süreç tarafından kullanılabilir
+        self.stream.stop()
+        
         try:
             # rpicam-vid -t 0 (sonsuz süre) --fullscreen
             cmd_args = [
@@ -174,6 +173,7 @@ class Camera:
         except Exception as e:
             print(f"[Camera] Önizleme başlatma hatası: {e}")
             self.preview_process = None
+            self.stream.start()
             return False
     
     def stop_preview(self):
@@ -193,17 +193,16 @@ class Camera:
                 pass
         finally:
             self.preview_process = None
+            # Akışı yeniden başlat (sensör tekrar ısınsın)
+            self.stream.start()
     
     def cleanup(self):
         """Temizlik"""
         # Önizleme varsa durdur
-        self.stop_preview()
+        if self.preview_process is not None:
+            self.stop_preview()
         
-        if not self.mock_mode and self.temp_file and os.path.exists(self.temp_file):
-            try:
-                os.remove(self.temp_file)
-            except:
-                pass
+        self.stream.stop()
 
 # Test fonksiyonu
 if __name__ == "__main__":
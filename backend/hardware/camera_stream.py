@@ -0,0 +1,464 @@
+# Kamera Akışı - Sürekli Açık (Warm) Kamera Servisi
+#
+# Her taramada yeni bir rpicam-still süreci başlatmak yerine sensörü açık tutar
+# (AE/AWB yakınsamış halde) ve istendiğinde en son kareyi verir.
+# Kaynaklar takılabilir: Picamera2, rpicam-vid MJPEG/YUV420 borusu veya sahte kaynak.
+# Kareler bellekte kalır; model ISP tarafından küçültülmüş ham RGB buffer'ı
+# doğrudan alır, diske JPEG yazıp geri okumak gerekmez.
+
+import io
+import shutil
+import subprocess
+import threading
+import time
+import numpy as np
+from PIL import Image, ImageDraw
+
+JPEG_SOI = b"\xff\xd8"
+JPEG_EOI = b"\xff\xd9"
+
+
+def yuv420_to_rgb(buffer, width, height):
+    """
+    Planar YUV420 (I420) buffer'ını RGB uint8 array'e çevir (BT.601 limited range)
+
+    Args:
+        buffer: width * height * 3/2 byte'lık ham kare
+        width, height: Kare boyutu (genişlik 64'ün katı olmalı, aksi halde satır dolgusu olur)
+    """
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    y_size = width * height
+    c_size = y_size // 4
+
+    y = data[:y_size].reshape(height, width).astype(np.float32)
+    u = data[y_size:y_size + c_size].reshape(height // 2, width // 2).astype(np.float32)
+    v = data[y_size + c_size:y_size + 2 * c_size].reshape(height // 2, width // 2).astype(np.float32)
+
+    # Kroma düzlemlerini 2x2 bloklara genişlet
+    u = u.repeat(2, axis=0).repeat(2, axis=1) - 128.0
+    v = v.repeat(2, axis=0).repeat(2, axis=1) - 128.0
+    y = (y - 16.0) * 1.164
+
+    rgb = np.empty((height, width, 3), dtype=np.float32)
+    rgb[..., 0] = y + 1.596 * v
+    rgb[..., 1] = y - 0.392 * u - 0.813 * v
+    rgb[..., 2] = y + 2.017 * u
+    np.clip(rgb, 0, 255, out=rgb)
+    return rgb.astype(np.uint8)
+
+
+class Frame:
+    """Kameradan gelen tek kare (JPEG bytes, ham YUV420 veya RGB numpy array)"""
+
+    __slots__ = ("data", "format", "size", "timestamp", "sequence", "_rgb")
+
+    def __init__(self, data, format, size, timestamp, sequence):
+        self.data = data
+        self.format = format  # "jpeg", "yuv420" veya "rgb"
+        self.size = size  # (genişlik, yükseklik)
+        self.timestamp = timestamp
+        self.sequence = sequence
+        self._rgb = None  # Dönüşüm sadece kare gerçekten kullanılırsa yapılır
+
+    @property
+    def age(self):
+        """Karenin yaşı (saniye)"""
+        return time.time() - self.timestamp
+
+    def to_pil(self):
+        """PIL Image olarak döndür"""
+        if self.format == "jpeg":
+            return Image.open(io.BytesIO(self.data)).convert("RGB")
+        return Image.fromarray(self.to_array())
+
+    def to_array(self):
+        """RGB numpy array (H, W, 3) uint8 olarak döndür"""
+        if self.format == "rgb":
+            return self.data
+        if self._rgb is None:
+            if self.format == "yuv420":
+                self._rgb = yuv420_to_rgb(self.data, self.size[0], self.size[1])
+            else:
+                self._rgb = np.asarray(self.to_pil())
+        return self._rgb
+
+    def to_jpeg(self, quality=90):
+        """JPEG bytes olarak döndür"""
+        if self.format == "jpeg":
+            return self.data
+        img_io = io.BytesIO()
+        Image.fromarray(self.to_array()).save(img_io, format="JPEG", quality=quality)
+        return img_io.getvalue()
+
+
+# ==================== KARE KAYNAKLARI ====================
+
+class FrameSource:
+    """Kare kaynağı arayüzü"""
+
+    name = "base"
+    format = "rgb"
+
+    def start(self):
+        pass
+
+    def read_frame(self):
+        """Bir sonraki kareyi bekle ve döndür (kaynak kapandıysa None)"""
+        raise NotImplementedError
+
+    def stop(self):
+        pass
+
+
+class RpicamSource(FrameSource):
+    """
+    rpicam-vid sürecini açık tutar ve stdout'tan kareleri okur
+
+    "yuv420" formatında kareler ISP tarafından istenen boyuta küçültülmüş ham
+    buffer olarak gelir (JPEG kodlama/çözme yok); "mjpeg" formatında JPEG
+    kareleri SOI/EOI marker'larına göre ayrıştırılır.
+    """
+
+    name = "rpicam"
+
+    def __init__(self, resolution, fps, cmd="rpicam-vid", extra_args=None, format="yuv420"):
+        self.resolution = resolution
+        self.fps = fps
+        self.cmd = cmd
+        self.extra_args = list(extra_args or [])
+        self.format = format
+        self.frame_bytes = resolution[0] * resolution[1] * 3 // 2
+        self.process = None
+        self._buffer = bytearray()
+
+    def start(self):
+        codec = "yuv420" if self.format == "yuv420" else "mjpeg"
+        cmd_args = [
+            self.cmd,
+            "-n",  # Önizleme yok
+            "-t", "0",  # Sonsuz süre
+            "--codec", codec,
+            "--width", str(self.resolution[0]),
+            "--height", str(self.resolution[1]),
+            "--framerate", str(self.fps),
+            "-o", "-",  # stdout'a yaz
+        ] + self.extra_args
+
+        self._buffer = bytearray()
+        self.process = subprocess.Popen(
+            cmd_args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=0
+        )
+        print(f"[CameraStream] {self.cmd} başlatıldı ({codec}, PID: {self.process.pid})")
+
+    def read_frame(self):
+        if self.process is None:
+            return None
+        if self.format == "yuv420":
+            return self._read_raw_frame()
+        return self._read_jpeg_frame()
+
+    def _read_raw_frame(self):
+        """Sabit boyutlu ham YUV420 karesini oku"""
+        while len(self._buffer) < self.frame_bytes:
+            chunk = self.process.stdout.read(self.frame_bytes - len(self._buffer))
+            if not chunk:
+                return None
+            self._buffer.extend(chunk)
+
+        frame = bytes(self._buffer[:self.frame_bytes])
+        del self._buffer[:self.frame_bytes]
+        return frame
+
+    def _read_jpeg_frame(self):
+        """Tampondaki ilk tam JPEG'i ayıkla (SOI ... EOI)"""
+        while True:
+            start = self._buffer.find(JPEG_SOI)
+            if start >= 0:
+                end = self._buffer.find(JPEG_EOI, start + 2)
+                if end >= 0:
+                    jpeg = bytes(self._buffer[start:end + 2])
+                    del self._buffer[:end + 2]
+                    return jpeg
+            elif len(self._buffer) > 1:
+                # SOI yoksa baştaki çöpü at (son byte yarım marker olabilir)
+                del self._buffer[:-1]
+
+            chunk = self.process.stdout.read(65536)
+            if not chunk:
+                return None
+            self._buffer.extend(chunk)
+
+    def stop(self):
+        if self.process is None:
+            return
+        try:
+            self.process.terminate()
+            self.process.wait(timeout=2)
+        except Exception:
+            try:
+                self.process.kill()
+            except Exception:
+                pass
+        finally:
+            self.process = None
+
+
+class Picamera2Source(FrameSource):
+    """Picamera2 ile video konfigürasyonunda sürekli kare yakalama"""
+
+    name = "picamera2"
+    format = "rgb"
+
+    def __init__(self, resolution, fps):
+        self.resolution = resolution
+        self.fps = fps
+        self.picam2 = None
+
+    def start(self):
+        from picamera2 import Picamera2
+
+        self.picam2 = Picamera2()
+        # BGR888 bellekte [R, G, B] sırasıyla gelir
+        config = self.picam2.create_video_configuration(
+            main={"size": tuple(self.resolution), "format": "BGR888"},
+            controls={"FrameRate": self.fps}
+        )
+        self.picam2.configure(config)
+        self.picam2.start()
+        print("[CameraStream] Picamera2 başlatıldı")
+
+    def read_frame(self):
+        if self.picam2 is None:
+            return None
+        return self.picam2.capture_array("main")
+
+    def stop(self):
+        if self.picam2 is None:
+            return
+        try:
+            self.picam2.stop()
+            self.picam2.close()
+        except Exception:
+            pass
+        finally:
+            self.picam2 = None
+
+
+class FakeFrameSource(FrameSource):
+    """Test için sahte kaynak - sabit görüntü veya hareketli test deseni üretir"""
+
+    name = "fake"
+    format = "rgb"
+
+    def __init__(self, resolution, fps, image_path=None):
+        self.resolution = resolution
+        self.fps = fps
+        self.image_path = image_path
+        self._base = None
+        self._counter = 0
+        self._next_time = 0.0
+
+    def start(self):
+        width, height = self.resolution
+        if self.image_path:
+            img = Image.open(self.image_path).convert("RGB").resize((width, height))
+        else:
+            # Gradient arka plan (mavi-mor-pembe)
+            img = Image.new("RGB", (width, height))
+            draw = ImageDraw.Draw(img)
+            for y in range(height):
+                r = int(100 + (y / height) * 155)
+                g = int(50 + (y / height) * 100)
+                b = int(200 - (y / height) * 50)
+                draw.line([(0, y), (width, y)], fill=(r, g, b))
+        self._base = np.array(img, dtype=np.uint8)
+        self._counter = 0
+        self._next_time = time.time()
+
+    def read_frame(self):
+        if self._base is None:
+            return None
+
+        # Kare hızını taklit et
+        self._next_time += 1.0 / self.fps
+        delay = self._next_time - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            self._next_time = time.time()
+
+        frame = self._base.copy()
+        if not self.image_path:
+            # Kareler birbirinden ayırt edilebilsin diye kayan beyaz çizgi
+            x = (self._counter * 8) % frame.shape[1]
+            frame[:, x:x + 4] = 255
+        self._counter += 1
+        return frame
+
+    def stop(self):
+        self._base = None
+
+
+def create_frame_source(backend, resolution, fps, mock_mode=False, extra_args=None, format="yuv420"):
+    """
+    Yapılandırmaya göre kare kaynağı oluştur
+
+    Args:
+        backend: "auto", "picamera2", "rpicam" veya "fake"
+        resolution: (genişlik, yükseklik)
+        fps: Kare hızı
+        mock_mode: Raspberry Pi dışı platform ise True
+        extra_args: rpicam-vid'e eklenecek ek argümanlar
+        format: rpicam-vid çıkış formatı ("yuv420" veya "mjpeg")
+    """
+    if backend == "fake" or (backend == "auto" and mock_mode):
+        return FakeFrameSource(resolution, fps)
+
+    if backend in ("auto", "picamera2"):
+        try:
+            import picamera2  # noqa: F401
+            return Picamera2Source(resolution, fps)
+        except ImportError:
+            if backend == "picamera2":
+                print("[CameraStream] picamera2 bulunamadı, rpicam-vid deneniyor...")
+
+    for cmd in ("rpicam-vid", "libcamera-vid"):
+        if shutil.which(cmd):
+            return RpicamSource(resolution, fps, cmd=cmd, extra_args=extra_args, format=format)
+
+    print("[CameraStream] Kamera aracı bulunamadı, sahte kaynak kullanılıyor")
+    return FakeFrameSource(resolution, fps)
+
+
+# ==================== AKIŞ SERVİSİ ====================
+
+class CameraStream:
+    """Kaynağı arka plan thread'inde sürekli okur, en son kareyi saklar"""
+
+    def __init__(self, source):
+        self.source = source
+        self.cond = threading.Condition()
+        self.latest = None
+        self.sequence = 0
+        self.running = False
+        self.reader_thread = None
+        self.last_error = None
+        self.restarts = 0
+
+    def start(self):
+        """Akışı başlat (zaten çalışıyorsa bir şey yapmaz)"""
+        if self.running:
+            return
+        self.running = True
+        self.reader_thread = threading.Thread(target=self._reader_loop, daemon=True)
+        self.reader_thread.start()
+
+    def _reader_loop(self):
+        """Kaynaktan kareleri oku; kaynak düşerse yeniden başlat"""
+        backoff = 0.5
+        while self.running:
+            try:
+                self.source.start()
+                backoff = 0.5
+                while self.running:
+                    data = self.source.read_frame()
+                    if data is None:
+                        raise RuntimeError("Kaynak kare vermeyi bıraktı")
+                    self._publish(data)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                if self.running:
+                    print(f"[CameraStream] Kaynak hatası: {self.last_error}")
+            finally:
+                self.source.stop()
+
+            if self.running:
+                self.restarts += 1
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 5.0)
+
+    def _publish(self, data):
+        if self.source.format == "rgb":
+            size = (data.shape[1], data.shape[0])
+        else:
+            size = tuple(self.source.resolution)
+
+        with self.cond:
+            self.sequence += 1
+            self.latest = Frame(data, self.source.format, size, time.time(), self.sequence)
+            self.cond.notify_all()
+
+    def get_latest_frame(self, max_age=None, timeout=3.0):
+        """
+        En son kareyi döndür
+
+        Args:
+            max_age: Kare bundan eskiyse yenisini bekle (saniye, None = sınırsız)
+            timeout: Bekleme süresi (saniye)
+        """
+        deadline = time.time() + timeout
+        with self.cond:
+            while True:
+                frame = self.latest
+                if frame is not None and (max_age is None or frame.age <= max_age):
+                    return frame
+                remaining = deadline - time.time()
+                if remaining <= 0 or not self.running:
+                    raise TimeoutError("Kameradan kare alınamadı")
+                self.cond.wait(remaining)
+
+    def wait_for_next_frame(self, timeout=3.0):
+        """Çağrıdan sonra yakalanan ilk kareyi döndür"""
+        deadline = time.time() + timeout
+        with self.cond:
+            start_sequence = self.sequence
+            while self.sequence == start_sequence:
+                remaining = deadline - time.time()
+                if remaining <= 0 or not self.running:
+                    raise TimeoutError("Kameradan kare alınamadı")
+                self.cond.wait(remaining)
+            return self.latest
+
+    def stop(self):
+        """Akışı durdur ve kamerayı serbest bırak"""
+        self.running = False
+        self.source.stop()
+        with self.cond:
+            self.cond.notify_all()
+        if self.reader_thread:
+            self.reader_thread.join(timeout=3)
+            self.reader_thread = None
+
+    def get_stats(self):
+        """Akış durumu"""
+        frame = self.latest
+        return {
+            "source": self.source.name,
+            "running": self.running,
+            "frames": self.sequence,
+            "restarts": self.restarts,
+            "last_frame_age": round(frame.age, 3) if frame else None,
+            "last_error": self.last_error
+        }
+
+
+# Test fonksiyonu
+if __name__ == "__main__":
+    stream = CameraStream(FakeFrameSource((640, 480), 15))
+    stream.start()
+
+    try:
+        start = time.time()
+        frame = stream.wait_for_next_frame()
+        print(f"İlk kare: {frame.size} ({(time.time() - start) * 1000:.1f} ms)")
+
+        start = time.time()
+        for _ in range(10):
+            frame = stream.wait_for_next_frame()
+        print(f"10 kare: {(time.time() - start) * 1000:.1f} ms, son kare #{frame.sequence}")
+        print(stream.get_stats())
+    finally:
+        stream.stop()
@@ -0,0 +1,228 @@
+# Tartı Filtreleri - Ham HX711 örnekleri için artımlı (örnek başına) filtre zinciri
+#
+# Filtreler ham ADC sayıları üzerinde çalışır (tare/kalibrasyon değişince durum
+# bozulmaz). Her filtre update(x) ile yeni örneği alıp filtrelenmiş değeri döndürür;
+# pencere geçmişi filtrenin içinde tutulur, donanım tekrar okunmaz.
+
+import bisect
+from collections import deque
+
+
+class MedianFilter:
+    """Kayan medyan - tekil sıçramaları (GPIO zamanlama hatası, titreşim) atar"""
+
+    def __init__(self, size=5):
+        self.size = size
+        self.reset()
+
+    def reset(self):
+        self.window = deque()
+        self.sorted = []
+
+    def update(self, x):
+        self.window.append(x)
+        bisect.insort(self.sorted, x)
+        if len(self.window) > self.size:
+            old = self.window.popleft()
+            del self.sorted[bisect.bisect_left(self.sorted, old)]
+        n = len(self.sorted)
+        if n % 2:
+            return self.sorted[n // 2]
+        return (self.sorted[n // 2 - 1] + self.sorted[n // 2]) / 2.0
+
+
+class MovingAverageFilter:
+    """Kayan ortalama (toplam artımlı tutulur)"""
+
+    def __init__(self, size=4):
+        self.size = size
+        self.reset()
+
+    def reset(self):
+        self.window = deque()
+        self.total = 0.0
+
+    def update(self, x):
+        self.window.append(x)
+        self.total += x
+        if len(self.window) > self.size:
+            self.total -= self.window.popleft()
+        return self.total / len(self.window)
+
+
+class IIRFilter:
+    """
+    Üstel yumuşatma: y += alpha * (x - y)
+
+    step_threshold: Fark bu değeri aşarsa (tabak kondu/kaldırıldı) doğrudan yeni
+    değere atlanır, yavaş yaklaşma beklenmez.
+    """
+
+    def __init__(self, alpha=0.3, step_threshold=None):
+        self.alpha = alpha
+        self.step_threshold = step_threshold
+        self.reset()
+
+    def reset(self):
+        self.value = None
+
+    def update(self, x):
+        if self.value is None or (self.step_threshold is not None and abs(x - self.value) > self.step_threshold):
+            self.value = float(x)
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+
+class KalmanFilter:
+    """
+    Sabit değer modeli için 1 boyutlu Kalman filtresi
+
+    process_var: Gerçek ağırlığın örnekler arası değişim varyansı (ham sayı²)
+    measurement_var: HX711 ölçüm gürültüsü varyansı (ham sayı²)
+    step_threshold: IIRFilter ile aynı - büyük değişimde belirsizlik sıfırlanır
+    """
+
+    def __init__(self, process_var=50.0, measurement_var=400.0, step_threshold=None):
+        self.process_var = process_var
+        self.measurement_var = measurement_var
+        self.step_threshold = step_threshold
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.error_var = 0.0
+
+    def update(self, x):
+        if self.value is None or (self.step_threshold is not None and abs(x - self.value) > self.step_threshold):
+            self.value = float(x)
+            self.error_var = self.measurement_var
+            return self.value
+
+        self.error_var += self.process_var
+        gain = self.error_var / (self.error_var + self.measurement_var)
+        self.value += gain * (x - self.value)
+        self.error_var *= (1.0 - gain)
+        return self.value
+
+
+class FilterChain:
+    """Filtreleri sırayla uygular (örn. medyan -> kayan ortalama)"""
+
+    def __init__(self, filters):
+        self.filters = list(filters)
+        self.value = None
+
+    def reset(self):
+        for f in self.filters:
+            f.reset()
+        self.value = None
+
+    def update(self, x):
+        for f in self.filters:
+            x = f.update(x)
+        self.value = x
+        return x
+
+
+class WindowStats:
+    """
+    Son size örneğin ortalaması ve standart sapması (artımlı)
+
+    Toplamlar ilk örneğe göre kaydırılarak tutulur; ham sayılar ~10^6 olsa da
+    kareler toplamında hassasiyet kaybı olmaz.
+    """
+
+    def __init__(self, size=20):
+        self.size = size
+        self.reset()
+
+    def reset(self):
+        self.window = deque()
+        self.ref = None
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def update(self, x):
+        if self.ref is None:
+            self.ref = x
+        d = x - self.ref
+        self.window.append(d)
+        self.total += d
+        self.total_sq += d * d
+        if len(self.window) > self.size:
+            old = self.window.popleft()
+            self.total -= old
+            self.total_sq -= old * old
+
+    @property
+    def count(self):
+        return len(self.window)
+
+    @property
+    def mean(self):
+        if not self.window:
+            return None
+        return self.ref + self.total / len(self.window)
+
+    @property
+    def variance(self):
+        n = len(self.window)
+        if n < 2:
+            return 0.0
+        return max(0.0, (self.total_sq - self.total * self.total / n) / (n - 1))
+
+    @property
+    def std(self):
+        return self.variance ** 0.5
+
+
+FILTER_TYPES = {
+    "median": MedianFilter,
+    "moving_average": MovingAverageFilter,
+    "iir": IIRFilter,
+    "kalman": KalmanFilter
+}
+
+
+def create_filter_chain(spec):
+    """
+    Yapılandırmadan filtre zinciri oluştur
+
+    Args:
+        spec: [{"type": "median", "size": 5}, {"type": "kalman", "measurement_var": 400}, ...]
+    """
+    filters = []
+    for item in spec:
+        params = {key: value for key, value in item.items() if key != "type"}
+        filters.append(FILTER_TYPES[item["type"]](**params))
+    return FilterChain(filters)
+
+
+# Test fonksiyonu - gürültülü basamak sinyalinde filtre karşılaştırması
+if __name__ == "__main__":
+    import random
+
+    random.seed(0)
+    reference_unit = 210
+    signal = [0] * 30 + [250 * reference_unit] * 50  # 3 sn boş, sonra 250 g
+    samples = [s + random.gauss(0, 60) + (3000 if i % 17 == 0 else 0) for i, s in enumerate(signal)]
+
+    chains = {
+        "ham": [],
+        "medyan5": [{"type": "median", "size": 5}],
+        "medyan5+ortalama4": [{"type": "median", "size": 5}, {"type": "moving_average", "size": 4}],
+        "medyan5+kalman": [{"type": "median", "size": 5}, {"type": "kalman", "step_threshold": 2000}],
+        "medyan3+iir": [{"type": "median", "size": 3}, {"type": "iir", "alpha": 0.3, "step_threshold": 2000}]
+    }
+
+    for name, spec in chains.items():
+        chain = create_filter_chain(spec)
+        out = [chain.update(x) for x in samples]
+        settled = out[45:]
+        stats = WindowStats(len(settled))
+        for y in settled:
+            stats.update(y)
+        # Basamaktan sonra hedefin ±1 g içine kaç örnekte girildi
+        settle = next((i for i, y in enumerate(out[30:]) if abs(y - signal[-1]) < reference_unit), None)
+        print(f"{name:20s} gürültü: {stats.std / reference_unit:6.3f} g  oturma: {settle} örnek")
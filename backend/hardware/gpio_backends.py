@@ -0,0 +1,367 @@
+# GPIO Arka Uçları - HX711 sürücüsü için pin erişimi
+#
+# HX711 doğrudan RPi.GPIO'ya bağlı değildir; aynı arayüzü sağlayan bir arka uç
+# kullanır:
+#   rpi   - RPi.GPIO (Pi 4 ve öncesi)
+#   lgpio - lgpio (/dev/gpiochip, Pi 5 dahil)
+#   fake  - HX711 çipini simüle eden yazılım arka ucu (geliştirme/benchmark)
+#
+# shift_in() bir örneğin tüm bitlerini tek çağrıda okur: GPIO fonksiyonları yerel
+# değişkenlere bağlanır, bit başına format karşılaştırması yapılmaz. Saat darbesi
+# arası Python yükü azaldıkça PD_SCK'nin 60 µs'den uzun yüksek kalıp çipi
+# kapatma riski de azalır.
+
+import random
+import threading
+import time
+
+
+class GPIOBackend:
+    """Arka uç arayüzü (pin numaraları BCM)"""
+
+    name = "base"
+
+    def setup_output(self, pin):
+        raise NotImplementedError
+
+    def setup_input(self, pin):
+        raise NotImplementedError
+
+    def write(self, pin, value):
+        raise NotImplementedError
+
+    def read(self, pin):
+        raise NotImplementedError
+
+    def add_falling_edge(self, pin, callback):
+        """callback(pin) - DOUT düşen kenarında çağrılır"""
+        raise NotImplementedError
+
+    def remove_edge(self, pin):
+        raise NotImplementedError
+
+    def cleanup(self):
+        pass
+
+    def shift_in(self, dout, sck, bits):
+        """
+        PD_SCK'ye bits kadar darbe ver, DOUT'u her darbeden sonra oku (MSB önce)
+
+        Returns:
+            Okunan bitlerden oluşan tamsayı
+        """
+        write = self.write
+        read = self.read
+        value = 0
+        for _ in range(bits):
+            write(sck, 1)
+            write(sck, 0)
+            value = (value << 1) | read(dout)
+        return value
+
+
+class RPiGPIOBackend(GPIOBackend):
+    name = "rpi"
+
+    def __init__(self):
+        import RPi.GPIO as GPIO
+        self.GPIO = GPIO
+        GPIO.setmode(GPIO.BCM)
+
+    def setup_output(self, pin):
+        self.GPIO.setup(pin, self.GPIO.OUT)
+
+    def setup_input(self, pin):
+        self.GPIO.setup(pin, self.GPIO.IN)
+
+    def write(self, pin, value):
+        self.GPIO.output(pin, value)
+
+    def read(self, pin):
+        return self.GPIO.input(pin)
+
+    def add_falling_edge(self, pin, callback):
+        self.GPIO.add_event_detect(pin, self.GPIO.FALLING, callback=callback)
+
+    def remove_edge(self, pin):
+        self.GPIO.remove_event_detect(pin)
+
+    def cleanup(self):
+        self.GPIO.cleanup()
+
+    def shift_in(self, dout, sck, bits):
+        output = self.GPIO.output
+        input = self.GPIO.input
+        value = 0
+        for _ in range(bits):
+            output(sck, 1)
+            output(sck, 0)
+            value = (value << 1) | input(dout)
+        return value
+
+
+class LgpioBackend(GPIOBackend):
+    name = "lgpio"
+
+    def __init__(self, chip=0):
+        import lgpio
+        self.lgpio = lgpio
+        self.handle = lgpio.gpiochip_open(chip)
+        self.callbacks = {}
+        self.claimed = set()
+
+    def setup_output(self, pin):
+        self.lgpio.gpio_claim_output(self.handle, pin, 0)
+        self.claimed.add(pin)
+
+    def setup_input(self, pin):
+        self.lgpio.gpio_claim_input(self.handle, pin)
+        self.claimed.add(pin)
+
+    def write(self, pin, value):
+        self.lgpio.gpio_write(self.handle, pin, 1 if value else 0)
+
+    def read(self, pin):
+        return self.lgpio.gpio_read(self.handle, pin)
+
+    def add_falling_edge(self, pin, callback):
+        lgpio = self.lgpio
+        lgpio.gpio_free(self.handle, pin)
+        lgpio.gpio_claim_alert(self.handle, pin, lgpio.FALLING_EDGE)
+        self.callbacks[pin] = lgpio.callback(
+            self.handle, pin, lgpio.FALLING_EDGE,
+            lambda chip, gpio, level, tick: callback(gpio)
+        )
+
+    def remove_edge(self, pin):
+        callback = self.callbacks.pop(pin, None)
+        if callback is not None:
+            callback.cancel()
+        self.lgpio.gpio_free(self.handle, pin)
+        self.lgpio.gpio_claim_input(self.handle, pin)
+
+    def cleanup(self):
+        for pin in list(self.callbacks):
+            self.remove_edge(pin)
+        for pin in self.claimed:
+            try:
+                self.lgpio.gpio_free(self.handle, pin)
+            except Exception:
+                pass
+        self.lgpio.gpiochip_close(self.handle)
+
+    def shift_in(self, dout, sck, bits):
+        write = self.lgpio.gpio_write
+        read = self.lgpio.gpio_read
+        handle = self.handle
+        value = 0
+        for _ in range(bits):
+            write(handle, sck, 1)
+            write(handle, sck, 0)
+            value = (value << 1) | read(handle, dout)
+        return value
+
+
+class FakeGPIOBackend(GPIOBackend):
+    """
+    HX711 çip simülasyonu
+
+    - rate örnek/sn hızında dönüşüm yapar, örnek hazır olunca DOUT'u düşürür
+    - 24 veri bitinden sonraki darbe sayısı sonraki kanal/kazancı seçer
+      (1: A/128, 2: B/32, 3: A/64)
+    - PD_SCK 60 µs'den uzun yüksek kalırsa çip kapanır, düşünce A/128 ile açılır
+    - rate=None: her okumada örnek hazırdır (benchmark)
+    """
+
+    name = "fake"
+
+    CHANNEL_BY_PULSES = {1: "A128", 2: "B32", 3: "A64"}
+
+    def __init__(self, rate=10.0, noise=20, dout=None, sck=None):
+        self.rate = rate
+        self.noise = noise
+        self.dout = dout
+        self.sck = sck
+        self.raw = {"A128": 0, "A64": 0, "B32": 0}  # kanal -> ham değer
+
+        self.lock = threading.Lock()
+        self.sck_level = 0
+        self.sck_high_since = 0.0
+        self.clocked = False  # Son read()'den beri saat darbesi verildi mi
+        self.dout_level = 1
+        self.bits = []
+        self.pulses_after_data = 0
+        self.channel = "A128"
+        self.powered = True
+        self.callback = None
+        self.conversions = 0
+
+        self.running = rate is not None
+        if self.running:
+            self.thread = threading.Thread(target=self._convert_loop, name="fake-hx711", daemon=True)
+            self.thread.start()
+
+    def set_raw(self, value, channel="A128"):
+        """Simüle edilen ham ADC değeri (A64 ve B32 için ayrı ayarlanabilir)"""
+        self.raw[channel] = int(value)
+
+    def _sample(self):
+        value = self.raw[self.channel] + random.randint(-self.noise, self.noise)
+        value &= 0xFFFFFF
+        return [(value >> (23 - i)) & 1 for i in range(24)]
+
+    def _convert(self):
+        """Yeni örnek hazırla (kilit tutulurken çağrılır); kenar oluştuysa True"""
+        if self.pulses_after_data:
+            self.channel = self.CHANNEL_BY_PULSES.get(self.pulses_after_data, self.channel)
+        self.pulses_after_data = 0
+        self.bits = self._sample()
+        self.conversions += 1
+        falling = self.dout_level == 1
+        self.dout_level = 0
+        return falling
+
+    def _convert_loop(self):
+        interval = 1.0 / self.rate
+        next_time = time.monotonic()
+        while self.running:
+            next_time += interval
+            time.sleep(max(0.0, next_time - time.monotonic()))
+            with self.lock:
+                if self.sck_level and time.monotonic() - self.sck_high_since > 60e-6:
+                    self.powered = False
+                    self.dout_level = 1
+                    self.bits = []
+                if not self.powered:
+                    continue
+                falling = self._convert()
+                callback = self.callback
+            if falling and callback is not None:
+                callback(self.dout)
+
+    def setup_output(self, pin):
+        if self.sck is None:
+            self.sck = pin
+
+    def setup_input(self, pin):
+        if self.dout is None:
+            self.dout = pin
+
+    def write(self, pin, value):
+        with self.lock:
+            if value and not self.sck_level:
+                self.sck_level = 1
+                self.sck_high_since = time.monotonic()
+                self.clocked = True
+                if self.bits:
+                    self.dout_level = self.bits.pop(0)
+                else:
+                    # 25-27. darbe: sonraki dönüşümün kanalı, DOUT yüksek kalır
+                    self.pulses_after_data += 1
+                    self.dout_level = 1
+            elif not value and self.sck_level:
+                self.sck_level = 0
+                if not self.powered:
+                    self.powered = True
+                    self.channel = "A128"
+                    self.pulses_after_data = 0
+
+    def read(self, pin):
+        with self.lock:
+            # rate=None: saat darbesiz okuma (is_ready) yeni örneği hemen hazırlar
+            if self.rate is None and not self.clocked and self.dout_level == 1 and not self.sck_level:
+                self._convert()
+            self.clocked = False
+            return self.dout_level
+
+    def add_falling_edge(self, pin, callback):
+        self.callback = callback
+
+    def remove_edge(self, pin):
+        self.callback = None
+
+    def cleanup(self):
+        self.running = False
+
+
+def create_gpio_backend(name="auto", chip=0):
+    """
+    GPIO arka ucunu oluştur
+
+    Args:
+        name: "auto" (rpi, olmazsa lgpio), "rpi", "lgpio" veya "fake"
+        chip: lgpio gpiochip numarası
+
+    Raises:
+        ImportError: İstenen (veya hiçbir) donanım arka ucu yoksa
+    """
+    if name == "fake":
+        return FakeGPIOBackend()
+    if name == "rpi":
+        return RPiGPIOBackend()
+    if name == "lgpio":
+        return LgpioBackend(chip)
+
+    errors = []
+    for factory in (RPiGPIOBackend, lambda: LgpioBackend(chip)):
+        try:
+            return factory()
+        except Exception as e:
+            errors.append(str(e))
+    raise ImportError(f"GPIO arka ucu bulunamadı ({'; '.join(errors)})")
+
+
+# Benchmark: örnek/sn (eski bit bit okuma ile shift_in karşılaştırması)
+# Kullanım: python -m hardware.gpio_backends [null|fake|rpi|lgpio] [dout] [sck]
+#   null: pin erişimi bedava (C fonksiyonu gibi) - sadece sürücünün Python yükünü ölçer
+if __name__ == "__main__":
+    import sys
+    from hardware.hx711 import HX711
+
+    class NullGPIOBackend(GPIOBackend):
+        name = "null"
+
+        def setup_output(self, pin):
+            pass
+
+        def setup_input(self, pin):
+            pass
+
+        def write(self, pin, value):
+            pass
+
+        def read(self, pin):
+            return 0
+
+    backend_name = sys.argv[1] if len(sys.argv) > 1 else "null"
+    dout = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    sck = int(sys.argv[3]) if len(sys.argv) > 3 else 6
+
+    if backend_name == "null":
+        gpio = NullGPIOBackend()
+    elif backend_name == "fake":
+        gpio = FakeGPIOBackend(rate=None)  # Her okumada örnek hazır
+    else:
+        gpio = create_gpio_backend(backend_name)
+    hx = HX711(dout, sck, gpio=gpio)
+    hx.set_reading_format("MSB", "MSB")
+
+    def legacy_read():
+        with hx.readLock:
+            hx.waitReady()
+            data = [hx.readNextByte(), hx.readNextByte(), hx.readNextByte()]
+            for _ in range(hx.GAIN):
+                hx.readNextBit()
+        return hx.bytesToLong(data)
+
+    duration = 2.0 if backend_name in ("null", "fake") else 5.0
+    for label, fn in (("eski (bit bit)", legacy_read), ("shift_in", hx.read_long)):
+        count = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < duration:
+            fn()
+            count += 1
+        elapsed = time.perf_counter() - start
+        print(f"[{gpio.name}] {label:15s}: {count / elapsed:9.1f} örnek/sn ({elapsed / count * 1e6:7.1f} µs/örnek)")
+
+    gpio.cleanup()
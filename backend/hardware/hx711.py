@@ -1,21 +1,30 @@
-import RPi.GPIO as GPIO
 import time
 import threading
+from hardware.gpio_backends import create_gpio_backend
+
+# Bit order reversal table for LSB-first bit format, resolved once per byte
+# instead of comparing bit_format on every bit.
+REVERSED_BITS = [int('{:08b}'.format(i)[::-1], 2) for i in range(256)]
+
+# Extra PD_SCK pulses after the 24 data bits -> channel/gain of next conversion
+GAIN_PULSES = {128: 1, 64: 3, 32: 2}
 
 class HX711:
 
-    def __init__(self, dout, pd_sck, gain=128):
+    def __init__(self, dout, pd_sck, gain=128, gpio=None):
         self.PD_SCK = pd_sck
 
         self.DOUT = dout
 
+        # GPIO backend (RPi.GPIO, lgpio or fake) - see gpio_backends.py
+        self.gpio = gpio if gpio is not None else create_gpio_backend()
+
         # Mutex for reading from the HX711, in case multiple threads in client
         # software try to access get values from the class at the same time.
         self.readLock = threading.Lock()
         
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setup(self.PD_SCK, GPIO.OUT)
-        GPIO.setup(self.DOUT, GPIO.IN)
+        self.gpio.setup_output(self.PD_SCK)
+        self.gpio.setup_input(self.DOUT)
 
         self.GAIN = 0
 
@@ -44,7 +53,7 @@ class HX711:
 
     
     def is_ready(self):
-        return GPIO.input(self.DOUT) == 0
+        return self.gpio.read(self.DOUT) == 0
 
     
     def set_gain(self, gain):
@@ -55,11 +64,19 @@ class HX711:
         elif gain == 32:
             self.GAIN = 2
 
-        GPIO.output(self.PD_SCK, False)
+        self.gpio.write(self.PD_SCK, False)
 
         # Read out a set of raw bytes and throw it away.
         self.readRawBytes()
 
+
+    def set_next_gain(self, gain):
+        # Select the channel/gain of the NEXT conversion without a throwaway
+        # read: the trailing pulses of the next readout program it, so the
+        # sample currently waiting still belongs to the previous selection.
+        # Used to interleave channel A and B (see HX711Acquisition).
+        self.GAIN = GAIN_PULSES[gain]
+
         
     def get_gain(self):
         if self.GAIN == 1:
@@ -77,9 +94,9 @@ class HX711:
        # Clock HX711 Digital Serial Clock (PD_SCK).  DOUT will be
        # ready 1us after PD_SCK rising edge, so we sample after
        # lowering PD_SCL, when we know DOUT will be stable.
-       GPIO.output(self.PD_SCK, True)
-       GPIO.output(self.PD_SCK, False)
-       value = GPIO.input(self.DOUT)
+       self.gpio.write(self.PD_SCK, True)
+       self.gpio.write(self.PD_SCK, False)
+       value = self.gpio.read(self.DOUT)
 
        # Convert Boolean to int and return it.
        return int(value)
@@ -102,29 +119,29 @@ class HX711:
        return byteValue 
         
 
-    def readRawBytes(self):
-        # Wait for and get the Read Lock, in case another thread is already
-        # driving the HX711 serial interface.
-        self.readLock.acquire()
-
-        # Wait until HX711 is ready for us to read a sample.
+    def waitReady(self, poll_interval=0.0005):
+        # Sleep between DOUT polls instead of spinning, so a core isn't pinned
+        # at 100% while the ADC converts (100 ms per sample at 10 SPS).
         while not self.is_ready():
-           pass
+           time.sleep(poll_interval)
 
-        # Read three bytes of data from the HX711.
-        firstByte  = self.readNextByte()
-        secondByte = self.readNextByte()
-        thirdByte  = self.readNextByte()
 
-        # HX711 Channel and gain factor are set by number of bits read
-        # after 24 data bits.
-        for i in range(self.GAIN):
-           # Clock a bit out of the HX711 and throw it away.
-           self.readNextBit()
+    def readRawBytesUnlocked(self):
+        # Caller holds readLock and has seen DOUT low (sample ready).
 
-        # Release the Read Lock, now that we've finished driving the HX711
-        # serial interface.
-        self.readLock.release()           
+        # Clock out the 24 data bits plus the channel/gain bits in a single
+        # backend call (no per-bit method dispatch or format checks), then
+        # drop the gain bits.
+        raw = self.gpio.shift_in(self.DOUT, self.PD_SCK, 24 + self.GAIN) >> self.GAIN
+
+        firstByte  = (raw >> 16) & 0xFF
+        secondByte = (raw >> 8) & 0xFF
+        thirdByte  = raw & 0xFF
+
+        if self.bit_format == 'LSB':
+           firstByte = REVERSED_BITS[firstByte]
+           secondByte = REVERSED_BITS[secondByte]
+           thirdByte = REVERSED_BITS[thirdByte]
 
         # Depending on how we're configured, return an ordered list of raw byte
         # values.
@@ -134,6 +151,45 @@ class HX711:
            return [firstByte, secondByte, thirdByte]
 
 
+    def readRawBytes(self):
+        # Wait for and get the Read Lock, in case another thread is already
+        # driving the HX711 serial interface.
+        with self.readLock:
+           # Wait until HX711 is ready for us to read a sample.
+           self.waitReady()
+           return self.readRawBytesUnlocked()
+
+
+    def try_read_long(self):
+        # Non-blocking read for DOUT edge callbacks: returns None if another
+        # thread is driving the serial interface or no sample is ready (e.g.
+        # the edge came from our own clocking).
+        if not self.readLock.acquire(blocking=False):
+           return None
+        try:
+           if not self.is_ready():
+              return None
+           dataBytes = self.readRawBytesUnlocked()
+        finally:
+           self.readLock.release()
+
+        return self.bytesToLong(dataBytes)
+
+
+    def bytesToLong(self, dataBytes):
+        # Join the raw bytes into a single 24bit 2s complement value.
+        twosComplementValue = ((dataBytes[0] << 16) |
+                               (dataBytes[1] << 8)  |
+                               dataBytes[2])
+
+        # Convert from 24bit twos-complement to a signed value.
+        signedIntValue = self.convertFromTwosComplement24bit(twosComplementValue)
+
+        # Record the latest sample value we've read.
+        self.lastVal = signedIntValue
+        return int(signedIntValue)
+
+
     def read_long(self):
         # Get a sample from the HX711 in the form of raw bytes.
         dataBytes = self.readRawBytes()
@@ -378,8 +434,8 @@ class HX711:
         # Because a rising edge on HX711 Digital Serial Clock (PD_SCK).  We then
         # leave it held up and wait 100us.  After 60us the HX711 should be
         # powered down.
-        GPIO.output(self.PD_SCK, False)
-        GPIO.output(self.PD_SCK, True)
+        self.gpio.write(self.PD_SCK, False)
+        self.gpio.write(self.PD_SCK, True)
 
         time.sleep(0.0001)
 
@@ -394,7 +450,7 @@ class HX711:
         self.readLock.acquire()
 
         # Lower the HX711 Digital Serial Clock (PD_SCK) line.
-        GPIO.output(self.PD_SCK, False)
+        self.gpio.write(self.PD_SCK, False)
 
         # Wait 100 us for the HX711 to power back up.
         time.sleep(0.0001)
@@ -417,7 +473,10 @@ class HX711:
 
 
 def hx711_add_event_detect(hx711_instance, event_callback):
-    GPIO.add_event_detect(hx711_instance.DOUT, GPIO.FALLING, 
-        callback=event_callback)
+    hx711_instance.gpio.add_falling_edge(hx711_instance.DOUT, event_callback)
+
+
+def hx711_remove_event_detect(hx711_instance):
+    hx711_instance.gpio.remove_edge(hx711_instance.DOUT)
 
 # EOF - hx711.py
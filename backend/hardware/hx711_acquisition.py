@@ -0,0 +1,268 @@
+# HX711 Örnek Toplama - DOUT düşen kenar kesmesiyle okuma
+#
+# HX711 yeni örnek hazır olduğunda DOUT'u düşürür. Kenar callback'i örneği okuyup
+# halka buffer'a yazar; örnekler arasında hiçbir thread CPU harcamaz. Kesme
+# kullanılamazsa (kenar algılama desteklenmiyorsa) uyuyarak yoklayan bir okuma
+# thread'ine geçilir.
+#
+# Birden çok kanal (örn. A/128 ve B/32 hücreleri) dönüşümlü okunur: her okumanın
+# son saat darbeleri SONRAKİ dönüşümün kanalını seçer, set_gain'deki gibi atılan
+# okuma olmaz. Her örnek kendi kanalının buffer'ına yazılır.
+#
+# Güç tasarrufu: set_interval() ile kesme kapatılıp örnekler seyrek okunur;
+# power_down()/power_up() HX711'i kapatır/açar, açılıştaki oturmamış örnekler atılır.
+
+import threading
+import time
+from hardware.hx711 import hx711_add_event_detect, hx711_remove_event_detect
+from hardware.sample_buffer import SampleRingBuffer
+
+
+class HX711Acquisition:
+    def __init__(self, hx, buffer_size=64, mode="interrupt", watchdog_interval=0.5, channels=None, buffers=None):
+        """
+        Args:
+            hx: HX711 sürücüsü (kazancı channels[0] ile başlatılmış olmalı)
+            buffer_size: Halka buffer kapasitesi (örnek)
+            mode: "interrupt" (DOUT kenar kesmesi) veya "poll" (okuma thread'i)
+            watchdog_interval: Bu süre örnek gelmezse hazır örnek elle okunur (saniye)
+            channels: Dönüşümlü okunacak kazançlar (örn. [128, 32]) - varsayılan tek kanal
+            buffers: Kanal başına halka buffer (varsayılan: yenileri oluşturulur)
+        """
+        self.hx = hx
+        self.channels = list(channels) if channels else [hx.get_gain()]
+        self.buffers = buffers or [SampleRingBuffer(buffer_size) for _ in self.channels]
+        self.buffer = self.buffers[0]
+        self.slot = 0  # Bekleyen örneğin kanalı (channels indeksi)
+        self.slot_lock = threading.Lock()
+        self.reads = 0
+
+        self.interval = None  # None: tam hız (kesme), aksi halde okumalar arası saniye
+        self.edge_enabled = False
+        self.powered = True
+        self.discard_until = 0.0  # Açılıştan sonra oturma süresi (time.monotonic)
+        self.settling = 0  # Oturma süresinde okunup atılan örnekler
+        self.wakeups = 0
+        self.mode = mode
+        self.watchdog_interval = watchdog_interval
+        self.running = False
+        self.threads = []
+
+        self.spurious = 0  # Kendi saat darbelerimizden veya kilit meşgulken gelen kenarlar
+        self.errors = 0
+        self.kicks = 0  # Watchdog'un kurtardığı kaçırılmış kenarlar
+
+    def start(self):
+        """Örnek toplamayı başlat"""
+        self.running = True
+
+        if self.mode == "interrupt":
+            try:
+                self._enable_edge()
+            except Exception as e:
+                print(f"[Scale] DOUT kesmesi kullanılamadı ({e}), yoklama moduna geçiliyor")
+                self.mode = "poll"
+
+        if self.mode == "poll":
+            self._start_thread(self._poll_loop, "hx711-poll")
+        else:
+            # DOUT zaten düşükken başladıysak kenar gelmez - watchdog ilk örneği alır
+            self._start_thread(self._watchdog_loop, "hx711-watchdog")
+
+        print(f"[Scale] Örnek toplama başladı (mod: {self.mode})")
+
+    def _enable_edge(self):
+        if not self.edge_enabled:
+            hx711_add_event_detect(self.hx, self._on_data_ready)
+            self.edge_enabled = True
+
+    def _disable_edge(self):
+        if self.edge_enabled:
+            self.edge_enabled = False
+            try:
+                hx711_remove_event_detect(self.hx)
+            except Exception as e:
+                print(f"[Scale] DOUT kesmesi kaldırılamadı: {e}")
+
+    def set_interval(self, interval):
+        """
+        Örnekleme hızı: None tam hız (her örnek), aksi halde interval saniyede bir okuma
+
+        Kesme modunda seyrek okumada kesme kapatılır, örnekler watchdog thread'inde
+        okunur; okunmayan dönüşümler için callback çalışmaz.
+        """
+        with self.slot_lock:
+            self.interval = interval
+            if self.mode == "interrupt" and self.powered:
+                if interval is None:
+                    self._enable_edge()
+                else:
+                    self._disable_edge()
+
+    def power_down(self):
+        """HX711'i kapat (PD_SCK yüksek) - açılana kadar örnek gelmez"""
+        with self.slot_lock:
+            if not self.powered:
+                return
+            self.powered = False
+            if self.mode == "interrupt":
+                self._disable_edge()
+            self.hx.power_down()
+
+    def power_up(self, settle_time=0.4):
+        """
+        HX711'i aç; settle_time boyunca gelen (oturmamış) örnekler atılır
+
+        Açılışta çip A/128'e döner: ilk kanal farklıysa power_up bir okuma atar.
+        """
+        with self.slot_lock:
+            if self.powered:
+                return
+            self.hx.set_next_gain(self.channels[0])
+            self.hx.power_up()
+            self.slot = 0
+            self.discard_until = time.monotonic() + settle_time
+            self.powered = True
+            self.wakeups += 1
+            if self.mode == "interrupt" and self.interval is None:
+                self._enable_edge()
+
+    def _start_thread(self, target, name):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+
+    def _read(self, blocking=False):
+        """
+        Bekleyen örneği oku ve sonraki dönüşümün kanalını seç
+
+        Kilit tutulurken çip hiç beklenmez (try_read_long): kapalı çipte DOUT
+        düşmez, beklemek power_up()'ı sonsuza dek kilitlerdi.
+
+        Args:
+            blocking: slot_lock için bekle (örnek için değil)
+
+        Returns:
+            (kanal indeksi, değer) veya okunamadıysa None
+        """
+        if not self.slot_lock.acquire(blocking):
+            return None
+        try:
+            if not self.powered:
+                return None
+            slot = self.slot
+            next_slot = (slot + 1) % len(self.channels)
+            if next_slot != slot:
+                self.hx.set_next_gain(self.channels[next_slot])
+            value = self.hx.try_read_long()
+            if value is None:
+                return None
+            self.slot = next_slot
+            self.reads += 1
+            if time.monotonic() < self.discard_until:
+                self.settling += 1
+                return slot, None
+            return slot, value
+        finally:
+            self.slot_lock.release()
+
+    def _on_data_ready(self, channel=None):
+        """DOUT düşen kenar callback'i (RPi.GPIO olay thread'inde çalışır)"""
+        try:
+            result = self._read()
+        except Exception as e:
+            self.errors += 1
+            print(f"[Scale] Örnek okuma hatası: {e}")
+            return
+
+        if result is None:
+            self.spurious += 1
+            return
+        slot, value = result
+        if value is not None:
+            self.buffers[slot].push(value)
+
+    def _watchdog_loop(self):
+        """
+        Okunmayan örnekte DOUT düşük kalır ve yeni kenar oluşmaz (örn. okuma
+        sırasında kilit başka thread'deydi). Uzun süre örnek gelmezse elle oku.
+        Seyrek okumada (set_interval) örnekler de burada, interval aralıklarla okunur.
+        """
+        last_count = self.buffer.count
+        while self.running:
+            interval = self.interval
+            if interval is not None:
+                time.sleep(interval)
+            else:
+                self.buffer.wait_for_new(last_count, timeout=self.watchdog_interval)
+            if self.buffer.count == last_count and self.running and self.powered:
+                if interval is not None:
+                    # Dönüşüm bitene kadar kısa bekle (10 SPS: en fazla 100 ms)
+                    deadline = time.monotonic() + 0.2
+                    while not self.hx.is_ready() and time.monotonic() < deadline:
+                        time.sleep(0.005)
+                if self.hx.is_ready():
+                    if interval is None:
+                        self.kicks += 1
+                    self._on_data_ready()
+            last_count = self.buffer.count
+
+    def _wait_ready(self, poll_interval=0.0005):
+        """
+        Örnek hazır olana kadar kilitsiz bekle
+
+        Returns:
+            False: beklerken çip kapatıldı veya toplama durdu
+        """
+        while not self.hx.is_ready():
+            if not (self.running and self.powered):
+                return False
+            time.sleep(poll_interval)
+        return True
+
+    def _poll_loop(self):
+        """Kesme yoksa: örnek hazır olana kadar kilit dışında uyuyarak bekler"""
+        while self.running:
+            if not self.powered:
+                time.sleep(0.05)
+                continue
+            try:
+                if not self._wait_ready():
+                    continue
+                # Beklerken power_down gelmiş olabilir: _read kilit altında yeniden bakar
+                result = self._read(blocking=True)
+                if result is None:
+                    continue
+                slot, value = result
+                if value is not None:
+                    self.buffers[slot].push(value)
+                if self.interval is not None:
+                    time.sleep(self.interval)
+            except Exception as e:
+                self.errors += 1
+                print(f"[Scale] Örnek okuma hatası: {e}")
+                time.sleep(0.5)
+
+    def stop(self):
+        """Kesmeyi kaldır ve thread'leri durdur"""
+        self.running = False
+        if self.mode == "interrupt":
+            self._disable_edge()
+        for thread in self.threads:
+            thread.join(timeout=2)
+        self.threads = []
+
+    def get_stats(self):
+        """Toplama istatistikleri"""
+        return {
+            "mode": self.mode,
+            "channels": self.channels,
+            "samples": self.reads,
+            "spurious_edges": self.spurious,
+            "watchdog_kicks": self.kicks,
+            "errors": self.errors,
+            "interval": self.interval,
+            "powered": self.powered,
+            "wakeups": self.wakeups,
+            "settling_discarded": self.settling
+        }
@@ -0,0 +1,247 @@
+# Çoklu Yük Hücresi - Birden çok HX711 ve A/B kanallarının tek tartıda toplanması
+#
+# Her HX711 çipi kendi DOUT kesmesiyle okunur (çipler eşzamanlı örnekler); aynı
+# çipteki hücreler (A/128, B/32) dönüşümlü okunur, kanal değişimi için örnek
+# atılmaz. Birleştirme thread'i her hücreden yeni örnek gelince bir "çerçeve"
+# oluşturur: trim ağırlıklı toplam, Scale'in filtre/tare/kalibrasyon zincirine
+# tek bir HX711 gibi verilir. Hücre sıfırları (tare anında) ağırlık merkezi için
+# tutulur.
+
+import threading
+import numpy as np
+from hardware.hx711 import HX711
+from hardware.hx711_acquisition import HX711Acquisition
+from hardware.sample_buffer import SampleRingBuffer
+
+
+def solve_corner_trims(deltas, weights):
+    """
+    Köşe ayarı: her hücrenin üzerine sırayla bilinen ağırlık konduğunda okunan
+    hücre değişimlerinden (deltas[k][i]) toplamı konumdan bağımsız yapan trim'ler
+
+    sum_i trim_i * deltas[k][i] = reference_unit * weights[k]  (her k için)
+
+    Returns:
+        (trims - ortalaması 1, reference_unit)
+    """
+    deltas = np.asarray(deltas, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    trims, *_ = np.linalg.lstsq(deltas, weights, rcond=None)
+    trims /= trims.mean()
+    reference_unit = float(np.mean(deltas @ trims / weights))
+    return trims.tolist(), reference_unit
+
+
+class LoadCellArray:
+    """
+    Scale için sanal HX711: offset / reference unit toplam sinyale uygulanır,
+    örnekler buffer'a (HX711Acquisition gibi) yazılır.
+    """
+
+    def __init__(self, cells, gpio, buffer_size=64, mode="interrupt"):
+        """
+        Args:
+            cells: [{"dout", "sck", "gain" (128/64: A, 32: B), "x", "y", "trim"}, ...]
+            gpio: GPIO arka ucu
+            buffer_size: Hücre ve toplam buffer kapasitesi (örnek)
+            mode: HX711Acquisition modu
+        """
+        self.cells = [dict(cell) for cell in cells]
+        self.positions = np.array([[c.get("x", 0.0), c.get("y", 0.0)] for c in self.cells], dtype=np.float64)
+        self.trims = np.array([c.get("trim", 1.0) for c in self.cells], dtype=np.float64)
+        self.zeros = None  # Hücre başına boş tartı ham değeri (tare anında)
+
+        self.OFFSET = 0.0
+        self.REFERENCE_UNIT = 1.0
+
+        # Tüm hücre buffer'ları tek Condition paylaşır: birleştirme thread'i tek yerde bekler
+        self.cond = threading.Condition()
+        self.cell_buffers = [SampleRingBuffer(buffer_size, self.cond) for _ in self.cells]
+        self.buffer = SampleRingBuffer(buffer_size)
+
+        # Aynı (dout, sck) çiftindeki hücreler tek çipte dönüşümlü okunur
+        chips = {}
+        for index, cell in enumerate(self.cells):
+            chips.setdefault((cell["dout"], cell["sck"]), []).append(index)
+        self.chips = []
+        for (dout, sck), indices in chips.items():
+            gains = [self.cells[i].get("gain", 128) for i in indices]
+            if len(set(gains)) != len(gains):
+                raise ValueError(f"HX711 (DOUT {dout}) üzerinde aynı kanal iki kez tanımlı")
+            hx = HX711(dout, sck, gain=gains[0], gpio=gpio)
+            acquisition = HX711Acquisition(
+                hx, buffer_size, mode, channels=gains,
+                buffers=[self.cell_buffers[i] for i in indices]
+            )
+            self.chips.append(acquisition)
+
+        self.running = False
+        self.thread = None
+        self.frames = 0
+
+    # --- HX711 arayüzü (Scale'in kullandığı kısım) ---
+
+    def set_reading_format(self, byte_format="LSB", bit_format="MSB"):
+        for chip in self.chips:
+            chip.hx.set_reading_format(byte_format, bit_format)
+
+    def set_offset(self, offset):
+        self.OFFSET = offset
+
+    def get_offset(self):
+        return self.OFFSET
+
+    def set_reference_unit(self, reference_unit):
+        if reference_unit == 0:
+            raise ValueError("Reference unit 0 olamaz")
+        self.REFERENCE_UNIT = reference_unit
+
+    def get_reference_unit(self):
+        return self.REFERENCE_UNIT
+
+    # --- Örnek toplama (HX711Acquisition arayüzü) ---
+
+    def start(self):
+        self.running = True
+        for chip in self.chips:
+            chip.start()
+        self.thread = threading.Thread(target=self._combine_loop, name="load-cells", daemon=True)
+        self.thread.start()
+        print(f"[Scale] {len(self.cells)} yük hücresi, {len(self.chips)} HX711")
+
+    def _combine_loop(self):
+        """Her hücreden en az bir yeni örnek gelince trim ağırlıklı toplamı yaz"""
+        last_counts = [0] * len(self.cell_buffers)
+        while self.running:
+            with self.cond:
+                ready = self.cond.wait_for(
+                    lambda: all(b.count > n for b, n in zip(self.cell_buffers, last_counts)),
+                    timeout=0.5
+                )
+                if not ready:
+                    continue
+                last_counts = [b.count for b in self.cell_buffers]
+                latest = [b.window(1) for b in self.cell_buffers]
+            timestamp = max(float(ts[0]) for ts, _ in latest)
+            values = np.array([float(v[0]) for _, v in latest])
+            self.buffer.push(int(round(float(self.trims @ values))), timestamp)
+            self.frames += 1
+
+    def set_interval(self, interval):
+        for chip in self.chips:
+            chip.set_interval(interval)
+
+    def power_down(self):
+        for chip in self.chips:
+            chip.power_down()
+
+    def power_up(self, settle_time=0.4):
+        for chip in self.chips:
+            chip.power_up(settle_time)
+
+    def stop(self):
+        self.running = False
+        for chip in self.chips:
+            chip.stop()
+        if self.thread:
+            self.thread.join(timeout=2)
+
+    # --- Hücre başına ---
+
+    def cell_means(self, n):
+        """Her hücrenin son n örneğinin ortalaması (ham)"""
+        return np.array([float(b.latest(n).mean()) for b in self.cell_buffers])
+
+    def capture_zero(self, n):
+        """Tare: hücre sıfırları, son n örneğin ortalaması (toplam offset Scale'de)"""
+        self.zeros = self.cell_means(n)
+
+    def set_trims(self, trims):
+        """Yeni trim'ler; toplam offset hücre sıfırlarından yeniden hesaplanır"""
+        self.trims = np.array(trims, dtype=np.float64)
+        if self.zeros is not None:
+            self.OFFSET = float(self.trims @ self.zeros)
+
+    def get_profile(self):
+        """Kalibrasyon profili için trim'ler ve hücre sıfırları"""
+        return {
+            "trims": self.trims.tolist(),
+            "zeros": self.zeros.tolist() if self.zeros is not None else None
+        }
+
+    def load_profile(self, profile):
+        """Kayıtlı trim/sıfırlar (hücre sayısı değiştiyse yok sayılır)"""
+        trims = profile.get("trims") or []
+        zeros = profile.get("zeros")
+        if len(trims) != len(self.cells) or (zeros is not None and len(zeros) != len(self.cells)):
+            print("[Scale] Kayıtlı hücre profili SCALE_CELLS ile uyuşmuyor, yok sayıldı")
+            return
+        self.trims = np.array(trims, dtype=np.float64)
+        self.zeros = np.array(zeros, dtype=np.float64) if zeros is not None else None
+
+    def get_cells(self):
+        """
+        Hücre yükleri (gram) ve ağırlık merkezi (x, y - hücre konumlarıyla aynı birim)
+
+        Tare yapılmadıysa yükler None; toplam yük ~0 ise merkez None.
+        """
+        loads = None
+        center = None
+        if self.zeros is not None:
+            loads = self.trims * (self.cell_means(1) - self.zeros) / self.REFERENCE_UNIT
+            total = loads.sum()
+            if total > 1.0:
+                center = (loads @ self.positions) / total
+        return {
+            "cells": [
+                {
+                    "gain": cell.get("gain", 128),
+                    "dout": cell["dout"],
+                    "trim": round(float(self.trims[i]), 4),
+                    "load": round(float(loads[i]), 1) if loads is not None else None
+                }
+                for i, cell in enumerate(self.cells)
+            ],
+            "center_of_mass": {"x": round(float(center[0]), 3), "y": round(float(center[1]), 3)}
+            if center is not None else None
+        }
+
+    def get_stats(self):
+        """Çip başına toplama istatistikleri"""
+        return {
+            "mode": self.chips[0].mode if self.chips else None,
+            "frames": self.frames,
+            "chips": [chip.get_stats() for chip in self.chips]
+        }
+
+
+# Test fonksiyonu - iki hücre tek simüle HX711'in A ve B kanallarında
+if __name__ == "__main__":
+    import time
+    from hardware.gpio_backends import FakeGPIOBackend
+
+    gpio = FakeGPIOBackend(rate=20.0)
+    gpio.set_raw(1000, "A128")
+    gpio.set_raw(-500, "B32")
+    array = LoadCellArray(
+        [{"dout": 5, "sck": 6, "gain": 128, "x": -1.0}, {"dout": 5, "sck": 6, "gain": 32, "x": 1.0}],
+        gpio
+    )
+    array.set_reading_format("MSB", "MSB")
+    array.set_reference_unit(100.0)
+    array.start()
+    time.sleep(1.0)
+    array.capture_zero(5)
+    print(f"Sıfırlar: {array.zeros}")
+
+    # 300 g, A hücresine daha yakın: A +20000, B +10000
+    gpio.set_raw(1000 + 20000, "A128")
+    gpio.set_raw(-500 + 10000, "B32")
+    time.sleep(1.0)
+    print(array.get_cells())
+    print(f"Toplam: {(array.buffer.latest(1)[0] - float(array.trims @ array.zeros)) / 100.0:.1f} g")
+    print(array.get_stats())
+
+    print(solve_corner_trims([[21000, 0], [0, 19000]], [100, 100]))
+    array.stop()
+    gpio.cleanup()
@@ -0,0 +1,99 @@
+# Örnek Halka Buffer'ı - HX711 ham örnekleri için sabit boyutlu, thread-safe kuyruk
+#
+# Her örnek zaman damgasıyla (time.monotonic) numpy dizilerinde tutulur. Yazan
+# taraf (GPIO kesme callback'i) asla bloklanmaz; okuyanlar yeni örnek gelene
+# kadar Condition üzerinde uyur (CPU harcamadan).
+
+import threading
+import time
+import numpy as np
+
+
+class SampleRingBuffer:
+    def __init__(self, capacity=64, cond=None):
+        """
+        Args:
+            capacity: Tutulacak en fazla örnek (eskiler üzerine yazılır)
+            cond: Paylaşılan Condition (örn. birden çok hücreyi tek thread bekler)
+        """
+        self.capacity = capacity
+        self.values = np.zeros(capacity, dtype=np.int64)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.count = 0  # Şimdiye kadar yazılan toplam örnek (sıra numarası)
+        self.cond = cond if cond is not None else threading.Condition()
+
+    def push(self, value, timestamp=None):
+        """Örnek ekle ve bekleyenleri uyandır"""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        with self.cond:
+            slot = self.count % self.capacity
+            self.values[slot] = value
+            self.timestamps[slot] = timestamp
+            self.count += 1
+            self.cond.notify_all()
+
+    def _slots(self, start, end):
+        return np.arange(start, end) % self.capacity
+
+    def latest(self, n=1):
+        """Son n örnek (eskiden yeniye, en fazla capacity kadar)"""
+        with self.cond:
+            n = min(n, self.count, self.capacity)
+            return self.values[self._slots(self.count - n, self.count)]
+
+    def window(self, n=None):
+        """
+        Son n örnek zaman damgalarıyla (varsayılan: buffer'daki tümü)
+
+        Returns:
+            (timestamps, values) - kopya diziler, eskiden yeniye
+        """
+        with self.cond:
+            n = min(self.capacity if n is None else n, self.count, self.capacity)
+            slots = self._slots(self.count - n, self.count)
+            return self.timestamps[slots], self.values[slots]
+
+    def since(self, last_count):
+        """
+        last_count'tan sonra gelen örnekler (taşanlar atlanır)
+
+        Returns:
+            (yeni_count, timestamps, values)
+        """
+        with self.cond:
+            start = max(last_count, self.count - self.capacity)
+            slots = self._slots(start, self.count)
+            return self.count, self.timestamps[slots], self.values[slots]
+
+    def sample_rate(self, n=None):
+        """Penceredeki örneklerden ölçülen örnek/sn (yetersiz örnekte 0)"""
+        timestamps, _ = self.window(n)
+        if len(timestamps) < 2 or timestamps[-1] <= timestamps[0]:
+            return 0.0
+        return (len(timestamps) - 1) / (timestamps[-1] - timestamps[0])
+
+    def wait_for_new(self, last_count, timeout=None):
+        """
+        last_count'tan sonra yeni örnek gelene kadar bekle
+
+        Returns:
+            Güncel örnek sayısı (zaman aşımında last_count)
+        """
+        with self.cond:
+            self.cond.wait_for(lambda: self.count > last_count, timeout)
+            return self.count
+
+    def collect(self, n, timeout=None):
+        """
+        Şu andan itibaren gelecek n yeni örneği topla
+
+        Raises:
+            TimeoutError: n örnek timeout içinde gelmezse
+        """
+        n = min(n, self.capacity)
+        with self.cond:
+            target = self.count + n
+            if not self.cond.wait_for(lambda: self.count >= target, timeout):
+                raise TimeoutError(f"{n} örnek beklenirken zaman aşımı ({target - self.count} eksik)")
+            return self.values[self._slots(self.count - n, self.count)]
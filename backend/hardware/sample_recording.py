@@ -0,0 +1,343 @@
+# Ham Örnek Kaydı ve Tekrar Oynatma - filtre/kararlılık testi için gerçek HX711 verisi
+#
+# SampleRecorder tartının işlediği ham örnekleri (zaman damgası + 24 bit sayı)
+# sabit boyutlu ikili kayıtlar olarak dosyaya ekler: 40 baytlık başlıktan sonra
+# dosya doğrudan numpy dizisi/memmap olarak açılabilir. ReplayHX711 aynı dosyayı
+# HX711 arayüzüyle gerçek veya hızlandırılmış sürede oynatır; tüm tartı zinciri
+# (toplama, filtre, kararlılık, işler) donanım olmadan çalışır.
+#
+# Dosya: başlık "<8sIIddd" (magic, sürüm, kayıt boyutu, offset, reference unit,
+# başlangıç unix zamanı) + kayıtlar [("timestamp", <f8), ("raw", <i4)]
+# (timestamp: kayıt başından saniye).
+
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+import numpy as np
+
+MAGIC = b"NQRAWHX1"
+VERSION = 1
+HEADER = struct.Struct("<8sIIddd")
+RECORD_DTYPE = np.dtype([("timestamp", "<f8"), ("raw", "<i4")])
+
+
+def load_recording(path):
+    """
+    Kayıt dosyasını aç (kayıtlar memmap - dosya belleğe okunmaz)
+
+    Returns:
+        (başlık dict, kayıt dizisi)
+    """
+    with open(path, 'rb') as f:
+        magic, version, record_size, offset, reference_unit, started_at = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"Geçersiz kayıt dosyası: {path}")
+    header = {
+        "offset": offset,
+        "reference_unit": reference_unit,
+        "timestamp": datetime.fromtimestamp(started_at).isoformat()
+    }
+    count = (os.path.getsize(path) - HEADER.size) // RECORD_DTYPE.itemsize
+    if count == 0:
+        return header, np.zeros(0, dtype=RECORD_DTYPE)
+    records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER.size, shape=(count,))
+    return header, records
+
+
+class SampleRecorder:
+    """Ham örnekleri ikili dosyaya ekler (tartı okuma thread'inden)"""
+
+    def __init__(self, path, offset=0.0, reference_unit=1.0, max_seconds=None):
+        """
+        Args:
+            path: Kayıt dosyası (varsa üzerine yazılır)
+            offset, reference_unit: Kayıt anındaki kalibrasyon (oynatmada kullanılır)
+            max_seconds: Bu süreden sonra kayıt kendiliğinden durur
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_seconds = max_seconds
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize,
+                                    float(offset), float(reference_unit), time.time()))
+        self.origin = None  # İlk örneğin time.monotonic zamanı
+        self.samples = 0
+        self.lock = threading.Lock()
+
+    @property
+    def active(self):
+        return self.file is not None
+
+    def write(self, timestamps, values):
+        """
+        Örnek dizisini ekle (SampleRingBuffer.since çıktısı)
+
+        Returns:
+            False: kayıt durdu (max_seconds doldu veya kapalı)
+        """
+        with self.lock:
+            if self.file is None:
+                return False
+            if self.origin is None:
+                self.origin = float(timestamps[0])
+            records = np.empty(len(values), dtype=RECORD_DTYPE)
+            records["timestamp"] = np.asarray(timestamps, dtype=np.float64) - self.origin
+            records["raw"] = values
+            records.tofile(self.file)
+            self.samples += len(records)
+            expired = self.max_seconds is not None and records["timestamp"][-1] >= self.max_seconds
+        if expired:
+            self.close()
+            return False
+        return True
+
+    def close(self):
+        with self.lock:
+            if self.file is None:
+                return
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+            self.file = None
+        print(f"[Scale] Kayıt tamamlandı: {self.path} ({self.samples} örnek)")
+
+    def get_stats(self):
+        return {"path": self.path, "active": self.active, "samples": self.samples}
+
+
+class ReplayHX711:
+    """
+    Kayıt dosyasını oynatan HX711 (HX711Acquisition ile "poll" modunda kullanılır)
+
+    Örnek i, oynatma başından (timestamp_i - timestamp_0) / speed saniye sonra
+    hazır olur. Gerçek çip gibi sadece en son dönüşüm okunur: okuma gecikirse
+    (düşük hız, uyku) aradaki örnekler atlanır. speed 0: bekleme yok, her örnek
+    sırayla (benchmark).
+    """
+
+    def __init__(self, path, speed=1.0, loop=False):
+        """
+        Args:
+            path: SampleRecorder dosyası
+            speed: Oynatma hızı (1: gerçek süre, 10: 10 kat hızlı, 0: beklemesiz)
+            loop: Kayıt bitince baştan oynat
+        """
+        self.header, records = load_recording(path)
+        if not len(records):
+            raise ValueError(f"Kayıt boş: {path}")
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.timestamps = np.asarray(records["timestamp"], dtype=np.float64)
+        self.values = np.asarray(records["raw"], dtype=np.int64)
+        self.duration = float(self.timestamps[-1] - self.timestamps[0])
+
+        self.index = 0
+        self.start_time = None  # İlk okumada başlar
+        self.powered = True
+        self.finished = threading.Event()
+        self.readLock = threading.Lock()
+        self.skipped = 0
+        self.loops = 0
+
+        self.GAIN = 128
+        self.OFFSET = 1
+        self.REFERENCE_UNIT = 1
+
+    # --- Oynatma ---
+
+    def _due(self, index):
+        """Örneğin hazır olacağı time.monotonic zamanı"""
+        if self.start_time is None:
+            self.start_time = time.monotonic()
+        if self.speed <= 0:
+            return self.start_time
+        return self.start_time + (self.timestamps[index] - self.timestamps[0]) / self.speed
+
+    def _latest_due(self, now):
+        """now'a kadar hazır olmuş en son örneğin indeksi (yoksa None)"""
+        if self.index >= len(self.values):
+            if not self.loop:
+                self.finished.set()
+                return None
+            self.index = 0
+            self.start_time = now
+            self.loops += 1
+        if self._due(self.index) > now:
+            return None
+        if self.speed <= 0:
+            return self.index
+        elapsed = (now - self.start_time) * self.speed + self.timestamps[0]
+        latest = int(np.searchsorted(self.timestamps, elapsed, side='right')) - 1
+        return max(latest, self.index)
+
+    def _take(self, index):
+        self.skipped += index - self.index
+        self.index = index + 1
+        return int(self.values[index])
+
+    def is_ready(self):
+        if not self.powered:
+            return False
+        with self.readLock:
+            return self._latest_due(time.monotonic()) is not None
+
+    def waitReady(self, poll_interval=0.0005):
+        while not self.is_ready():
+            if self.powered and self.index < len(self.values):
+                time.sleep(min(0.1, max(poll_interval, self._due(self.index) - time.monotonic())))
+            else:
+                time.sleep(0.05)
+
+    def read_long(self):
+        while True:
+            self.waitReady()
+            with self.readLock:
+                index = self._latest_due(time.monotonic())
+                if index is not None:
+                    return self._take(index)
+
+    def try_read_long(self):
+        if not self.powered or not self.readLock.acquire(blocking=False):
+            return None
+        try:
+            index = self._latest_due(time.monotonic())
+            return self._take(index) if index is not None else None
+        finally:
+            self.readLock.release()
+
+    def power_down(self):
+        self.powered = False
+
+    def power_up(self):
+        # Kapalıyken geçen süredeki örnekler (gerçek çipte dönüşüm yok) atlanır
+        self.powered = True
+
+    def reset(self):
+        self.power_down()
+        self.power_up()
+
+    def get_progress(self):
+        return {
+            "path": self.path,
+            "speed": self.speed,
+            "index": self.index,
+            "samples": len(self.values),
+            "duration": round(self.duration, 1),
+            "skipped": self.skipped,
+            "loops": self.loops,
+            "finished": self.finished.is_set()
+        }
+
+    # --- HX711 arayüzü ---
+
+    def set_reading_format(self, byte_format="LSB", bit_format="MSB"):
+        pass
+
+    def set_gain(self, gain):
+        self.GAIN = gain
+
+    def set_next_gain(self, gain):
+        self.GAIN = gain
+
+    def get_gain(self):
+        return self.GAIN
+
+    def set_offset(self, offset):
+        self.OFFSET = offset
+
+    def get_offset(self):
+        return self.OFFSET
+
+    def set_reference_unit(self, reference_unit):
+        if reference_unit == 0:
+            raise ValueError("Reference unit 0 olamaz")
+        self.REFERENCE_UNIT = reference_unit
+
+    def get_reference_unit(self):
+        return self.REFERENCE_UNIT
+
+    def get_value(self, times=3):
+        return float(np.median([self.read_long() for _ in range(times)])) - self.OFFSET
+
+    def get_weight(self, times=3):
+        return self.get_value(times) / self.REFERENCE_UNIT
+
+    def tare(self, times=15):
+        self.set_offset(float(np.median([self.read_long() for _ in range(times)])))
+
+
+def run_pipeline(path, filters_spec, stability_kwargs, reference_unit=None, offset=None):
+    """
+    Kaydı filtre zinciri ve kararlılık algılayıcıdan kayıttaki zaman damgalarıyla,
+    beklemeden geçir (tekrarlanabilir regresyon testi ve benchmark)
+
+    Returns:
+        (olaylar [(zaman, olay, gram)], örnek başına süre µs)
+    """
+    from hardware.filters import create_filter_chain
+    from hardware.stability import StabilityDetector
+
+    header, records = load_recording(path)
+    reference_unit = reference_unit or header["reference_unit"] or 1.0
+    offset = header["offset"] if offset is None else offset
+    filters = create_filter_chain(filters_spec)
+    stability = StabilityDetector(**stability_kwargs)
+
+    events = []
+    timestamps = records["timestamp"].tolist()
+    values = records["raw"].tolist()
+    started = time.perf_counter()
+    for timestamp, raw in zip(timestamps, values):
+        grams = (filters.update(raw) - offset) / reference_unit
+        for event in stability.update(grams, timestamp):
+            events.append((round(timestamp, 2), event["type"], round(event["weight"], 1)))
+    elapsed = time.perf_counter() - started
+    return events, elapsed / max(1, len(values)) * 1e6
+
+
+# Test fonksiyonu - sentetik kayıt (boş, 250 g tabak, kaldırma), oynatma ve benchmark
+#   python -m hardware.sample_recording [kayit.bin]
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    from config import (
+        SCALE_FILTERS, SCALE_STABLE_WINDOW, SCALE_STABLE_TOLERANCE, SCALE_STABLE_HOLD,
+        SCALE_EMPTY_THRESHOLD, SCALE_CHANGE_THRESHOLD
+    )
+
+    if len(sys.argv) > 1:
+        path = sys.argv[1]
+    else:
+        import random
+        random.seed(0)
+        path = os.path.join(tempfile.gettempdir(), "nutriquant_synthetic.bin")
+        recorder = SampleRecorder(path, offset=8400, reference_unit=210.0)
+        t = np.arange(0, 600, 0.1)  # 10 dk, 10 SPS
+        load = np.where((t % 60 > 20) & (t % 60 < 45), 250.0, 0.0)
+        raw = 8400 + load * 210.0 + np.array([random.gauss(0, 40) for _ in t])
+        recorder.write(t + 1000.0, raw.round().astype(np.int64))
+        recorder.close()
+
+    stability_kwargs = {
+        "window": SCALE_STABLE_WINDOW, "tolerance": SCALE_STABLE_TOLERANCE, "hold_time": SCALE_STABLE_HOLD,
+        "empty_threshold": SCALE_EMPTY_THRESHOLD, "change_threshold": SCALE_CHANGE_THRESHOLD
+    }
+    header, records = load_recording(path)
+    print(f"{path}: {len(records)} örnek, {records['timestamp'][-1]:.0f} s, {header}")
+
+    events, per_sample = run_pipeline(path, SCALE_FILTERS, stability_kwargs)
+    for event in events[:8]:
+        print(f"  {event}")
+    print(f"{len(events)} olay, örnek başına {per_sample:.1f} µs "
+          f"({1e6 / per_sample:.0f} örnek/sn, 10 SPS'nin {1e5 / per_sample:.0f} katı)")
+
+    # Sürücü üzerinden 100x hızlı: 10 sn kayıt ~0.1 sn
+    replay = ReplayHX711(path, speed=100.0)
+    started = time.monotonic()
+    values = [replay.read_long() for _ in range(100)]
+    print(f"ReplayHX711 100x: 100 okuma {time.monotonic() - started:.2f} s, {replay.get_progress()}")
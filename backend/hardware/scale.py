@@ -1,26 +1,60 @@
 # HX711 Tartı Modülü - Ağırlık Ölçümü
 
+import os
 import time
 import sys
 import threading
 
+from config import (
+    HX711_DOUT_PIN, HX711_SCK_PIN, HX711_REFERENCE_UNIT, TARE_SAMPLES,
+    HX711_ACQUISITION_MODE, HX711_BUFFER_SIZE, HX711_GPIO_BACKEND, HX711_GPIO_CHIP,
+    SCALE_FILTERS, SCALE_NOISE_WINDOW, SCALE_STABLE_WINDOW, SCALE_STABLE_TOLERANCE,
+    SCALE_STABLE_HOLD, SCALE_EMPTY_THRESHOLD, SCALE_CHANGE_THRESHOLD,
+    SCALE_STREAM_DELTA, SCALE_STREAM_HEARTBEAT,
+    SCALE_CALIBRATION_SAMPLES, SCALE_CALIBRATION_SETTLE, SCALE_JOB_TIMEOUT, SCALE_JOB_HISTORY,
+    SCALE_CALIBRATION_FILE, SCALE_ZERO_TRACK_BAND, SCALE_ZERO_TRACK_RATE, SCALE_ZERO_TRACK_MAX,
+    SCALE_ZERO_TRACK_SAVE_INTERVAL, SCALE_CELLS, DATA_DIR,
+    SCALE_POWER_POLICY, SCALE_IDLE_AFTER, SCALE_IDLE_INTERVAL, SCALE_SLEEP_AFTER,
+    SCALE_SLEEP_CHECK_INTERVAL, SCALE_WAKE_SETTLE, SCALE_WAKE_SAMPLES,
+    SCALE_RECORDING_DIR, SCALE_RECORDING_MAX_SECONDS, SCALE_REPLAY_FILE, SCALE_REPLAY_SPEED, SCALE_REPLAY_LOOP
+)
+from collections import OrderedDict, deque
+from datetime import datetime
+from hardware.filters import create_filter_chain, WindowStats
+from hardware.sample_buffer import SampleRingBuffer
+from hardware.stability import StabilityDetector
+from hardware.scale_jobs import TareJob, CalibrationJob, LinearizationJob, CornerJob
+from hardware.calibration import CalibrationStore, LinearizationTable, ZeroTracker
+from hardware.acquisition_policy import AcquisitionPolicy, IDLE, SLEEP
+from hardware.sample_recording import SampleRecorder
+
 # Import denemesi ve hata ayıklama
-try:
-    from hardware.hx711 import HX711
-    import RPi.GPIO as GPIO
-    MODE = "REAL"
-    print("[Scale] Gerçek donanım sürücüleri yüklendi (HX711).")
-except ImportError as e:
-    print(f"\n[DIKKAT] Donanım sürücü hatası: {e}")
-    print("[DIKKAT] Sistem SIMULASYON moduna geçiyor. Rastgele değerler üretilecek.\n")
-    from hardware.mock_hardware import MockHX711 as HX711, MockGPIO as GPIO
-    MODE = "MOCK"
-except Exception as e:
-    print(f"\n[DIKKAT] Beklenmedik başlatma hatası: {e}")
-    from hardware.mock_hardware import MockHX711 as HX711, MockGPIO as GPIO
-    MODE = "MOCK"
+if SCALE_REPLAY_FILE:
+    # Kayıt oynatma: donanım/GPIO gerekmez, zincirin geri kalanı REAL gibi çalışır
+    from hardware.sample_recording import ReplayHX711
+    from hardware.hx711_acquisition import HX711Acquisition
+    from hardware.mock_hardware import MockGPIO as GPIO
+    MODE = "REPLAY"
+    print(f"[Scale] Kayıt oynatılacak: {SCALE_REPLAY_FILE} (hız: {SCALE_REPLAY_SPEED}x)")
+else:
+    try:
+        from hardware.hx711 import HX711
+        from hardware.hx711_acquisition import HX711Acquisition
+        from hardware.load_cells import LoadCellArray, solve_corner_trims
+        from hardware.gpio_backends import create_gpio_backend
+        GPIO = create_gpio_backend(HX711_GPIO_BACKEND, HX711_GPIO_CHIP)
+        MODE = "FAKE" if GPIO.name == "fake" else "REAL"
+        print(f"[Scale] HX711 sürücüsü yüklendi (GPIO: {GPIO.name}).")
+    except ImportError as e:
+        print(f"\n[DIKKAT] Donanım sürücü hatası: {e}")
+        print("[DIKKAT] Sistem SIMULASYON moduna geçiyor. Rastgele değerler üretilecek.\n")
+        from hardware.mock_hardware import MockHX711 as HX711, MockGPIO as GPIO
+        MODE = "MOCK"
+    except Exception as e:
+        print(f"\n[DIKKAT] Beklenmedik başlatma hatası: {e}")
+        from hardware.mock_hardware import MockHX711 as HX711, MockGPIO as GPIO
+        MODE = "MOCK"
 
-from config import HX711_DOUT_PIN, HX711_SCK_PIN, HX711_REFERENCE_UNIT, TARE_SAMPLES
 
 class Scale:
     def __init__(self):
@@ -29,10 +63,75 @@ class Scale:
         self.lock = threading.Lock()  # Thread-safe erişim için
         self.reading_thread = None
         self.running = False
+        self.acquisition = None  # REAL modda DOUT kesmesiyle örnek toplama
+        self.cells = None  # SCALE_CELLS tanımlıysa çoklu hücre (sanal HX711)
+        self.corner_points = {}  # Köşe ayarı: hücre -> (hücre değişimleri, bilinen gram)
+        
+        # Zaman damgalı ham örnekler + örnek başına çalışan filtre zinciri
+        self.samples = SampleRingBuffer(HX711_BUFFER_SIZE)
+        self.filters = create_filter_chain(SCALE_FILTERS)
+        self.noise = WindowStats(SCALE_NOISE_WINDOW)
+        self.filtered_raw = None
+        
+        # Kararlılık algılama ve olay dinleyicileri (placed/stable/unsettled/removed)
+        self.stability = StabilityDetector(
+            window=SCALE_STABLE_WINDOW,
+            tolerance=SCALE_STABLE_TOLERANCE,
+            hold_time=SCALE_STABLE_HOLD,
+            empty_threshold=SCALE_EMPTY_THRESHOLD,
+            change_threshold=SCALE_CHANGE_THRESHOLD
+        )
+        self.listeners = []
+        self.event_cond = threading.Condition()
+        self.event_seq = 0
+        self.last_event = None
+        
+        # Ağırlık yayını: filtrelenmiş değer SCALE_STREAM_DELTA kadar değişince,
+        # durum değişince veya SCALE_STREAM_HEARTBEAT dolunca dinleyiciler çağrılır
+        self.weight_listeners = []
+        self.last_published = None  # (filtrelenmiş gram, durum, zaman)
+        
+        # Tare/kalibrasyon işleri: okuma thread'inde sırayla, aynı örnek akışından
+        self.job_queue = deque()
+        self.active_job = None
+        self.jobs = OrderedDict()  # id -> iş (son SCALE_JOB_HISTORY iş)
+        self.job_seq = 0
+        
+        # Kalıcı kalibrasyon profili, doğrusallaştırma ve sıfır takibi (REAL/FAKE)
+        self.calibration_store = CalibrationStore(os.path.join(DATA_DIR, SCALE_CALIBRATION_FILE))
+        self.calibration_saved_at = None
+        self.linearization = LinearizationTable()
+        self.zero_tracker = ZeroTracker(SCALE_ZERO_TRACK_BAND, SCALE_ZERO_TRACK_RATE, SCALE_ZERO_TRACK_MAX)
+        self.saved_offset = None
+        self.offset_saved_at = time.monotonic()
+        
+        # Güç politikası: hareket/istemci yoksa düşük hız, uzun boşlukta HX711 uykuda
+        self.power_policy = AcquisitionPolicy(SCALE_IDLE_AFTER, SCALE_SLEEP_AFTER, SCALE_POWER_POLICY)
+        self.demand_sources = []  # fn() -> True ise tam hız (örn. bağlı WebSocket istemcisi)
+        self.demand = False
+        self.demand_checked_at = 0.0
+        self.wake_requested = False
+        self.policy_checked_at = 0.0
+        self.sample_interval = None  # Uygulanan örnekleme aralığı (None: tam hız)
+        self.next_peek = 0.0  # Uykuda sonraki kısa uyanma
+        self.peek_count = None  # Kısa uyanmadaki örnek sayısı (SCALE_WAKE_SAMPLES gelince tekrar uyu)
+        self.peek_deadline = 0.0
+        
+        # Ham örnek kaydı (ReplayHX711 / SCALE_REPLAY_FILE ile oynatılır)
+        self.recorder = None
         
         try:
             # HX711 başlat (GPIO 5=DOUT, 6=SCK)
-            self.hx = HX711(HX711_DOUT_PIN, HX711_SCK_PIN)
+            if self.mode == "MOCK":
+                self.hx = HX711(HX711_DOUT_PIN, HX711_SCK_PIN)
+            elif self.mode == "REPLAY":
+                self.hx = ReplayHX711(SCALE_REPLAY_FILE, SCALE_REPLAY_SPEED, SCALE_REPLAY_LOOP)
+            elif SCALE_CELLS:
+                # Birden çok hücre: toplam sinyal tek HX711 gibi işlenir
+                self.cells = LoadCellArray(SCALE_CELLS, GPIO, HX711_BUFFER_SIZE, HX711_ACQUISITION_MODE)
+                self.hx = self.cells
+            else:
+                self.hx = HX711(HX711_DOUT_PIN, HX711_SCK_PIN, gpio=GPIO)
             
             if self.mode == "MOCK":
                 print("[Scale] MOCK modda başlatıldı - Simülasyon aktif")
@@ -40,110 +139,613 @@ class Scale:
                 # Reading format ayarla (MSB, MSB)
                 self.hx.set_reading_format("MSB", "MSB")
                 
-                # Reference unit ayarla (kalibrasyon değeri)
-                print(f"[Scale] Reference unit ayarlanıyor: {HX711_REFERENCE_UNIT}")
-                self.hx.set_reference_unit(HX711_REFERENCE_UNIT)
-                
-                # Tare yap (offset ayarla)
-                print("[Scale] Tare yapılıyor...")
-                self.hx.tare(TARE_SAMPLES)
+                # Oynatmada kayıt anındaki kalibrasyon kullanılır
+                profile = self.hx.header if self.mode == "REPLAY" else self.calibration_store.load()
+                if profile is not None:
+                    # Kayıtlı profil: tare beklemeden hazır
+                    self.hx.set_reference_unit(profile["reference_unit"])
+                    self.hx.set_offset(profile["offset"])
+                    self.linearization.set_points(profile.get("linearization", []))
+                    if self.cells is not None and profile.get("cells"):
+                        self.cells.load_profile(profile["cells"])
+                    self.calibration_saved_at = profile.get("timestamp")
+                    self.saved_offset = profile["offset"]
+                    print(f"[Scale] Kalibrasyon profili yüklendi (reference unit: {profile['reference_unit']:.2f}, "
+                          f"offset: {profile['offset']:.0f}, {len(self.linearization.points)} doğrusallaştırma noktası)")
+                else:
+                    # Reference unit ayarla (kalibrasyon değeri)
+                    print(f"[Scale] Reference unit ayarlanıyor: {HX711_REFERENCE_UNIT}")
+                    self.hx.set_reference_unit(HX711_REFERENCE_UNIT)
+                    
+                self.zero_tracker.reset(self.hx.get_offset())
             
             # Sürekli okuma thread'i başlat (MOCK modda da çalışsın)
             self.running = True
-            self.reading_thread = threading.Thread(target=self._continuous_reading, daemon=True)
+            if self.mode == "MOCK":
+                target = self._continuous_reading
+            else:
+                # Örnekler kesme callback'inde halka buffer'a yazılır, thread sadece bekler
+                if self.cells is not None:
+                    self.acquisition = self.cells
+                else:
+                    # Kayıt oynatıcının DOUT kesmesi yok: okuma thread'i örnek zamanını bekler
+                    mode = "poll" if self.mode == "REPLAY" else HX711_ACQUISITION_MODE
+                    self.acquisition = HX711Acquisition(self.hx, HX711_BUFFER_SIZE, mode)
+                self.samples = self.acquisition.buffer
+                self.acquisition.start()
+                target = self._acquisition_reading
+            self.reading_thread = threading.Thread(target=target, daemon=True)
             self.reading_thread.start()
             
             print(f"[Scale] Başlatıldı (Mod: {self.mode}, Continuous reading)")
             
+            if self.mode != "MOCK" and self.calibration_saved_at is None:
+                # Profil yok: okuma thread'inde tare yap - sonraki açılışlar için kaydedilir
+                print("[Scale] Tare yapılıyor...")
+                self.tare()
+            
         except Exception as e:
             print(f"[Scale] Başlatma hatası: {e}")
             print("[Scale] MOCK moda geçiliyor...")
             self.mode = "MOCK"
     
     def _continuous_reading(self):
-        """Arka planda sürekli ağırlık oku"""
+        """Arka planda sürekli ağırlık oku (MOCK)"""
+        last_count = self.samples.count
+        next_sample = 0.0
+        burst = 0
         while self.running:
             try:
-                # HX711'den ağırlık oku (3 örnek ortalaması)
-                weight = self.hx.get_weight(3)
-                
-                with self.lock:
-                    # Negatif değerleri filtrele, gram cinsine çevir
-                    self.current_weight = max(0, int(weight))
+                self._advance_jobs()
+                if time.monotonic() >= next_sample:
+                    # Mock gram değerini ham sayıya çevir (offset 0) - filtreler aynı birimde çalışsın
+                    weight = self.hx.get_weight(1)
+                    self.samples.push(int(round(weight * HX711_REFERENCE_UNIT)))
+                    last_count = self._process_samples(last_count)
+                    # Politikaya göre sonraki örnek: tam hız, düşük hız veya uyku kontrolü
+                    state = self._apply_power_policy()
+                    burst = burst + 1 if state == SLEEP else 0
+                    if state == SLEEP and burst % SCALE_WAKE_SAMPLES == 0:
+                        delay = SCALE_SLEEP_CHECK_INTERVAL
+                    elif state == IDLE:
+                        delay = SCALE_IDLE_INTERVAL
+                    else:
+                        delay = 0.0
+                    next_sample = time.monotonic() + delay
+                else:
+                    self._apply_power_policy()
+                self._publish_weight()
                 
-                # Kısa bekleme (CPU kullanımını azaltmak için)
+                # Kısa bekleme (HX711 ~10 örnek/sn)
                 time.sleep(0.1)
                 
             except Exception as e:
                 print(f"[Scale] Okuma hatası: {e}")
                 time.sleep(0.5)
     
-    def read_weight(self):
-        """Anlık ağırlık değerini döndür (gram)"""
+    def _acquisition_reading(self):
+        """Yeni örnek geldikçe ağırlığı güncelle (örnekler arasında uyur)"""
+        last_count = self.samples.count
+        while self.running:
+            # Uykuda sık uyan: wake() isteği ve kısa kontrol zamanı kaçmasın
+            timeout = 0.25 if self.power_policy.state == SLEEP else min(1.0, SCALE_STREAM_HEARTBEAT)
+            count = self.samples.wait_for_new(last_count, timeout=timeout)
+            self._advance_jobs()
+            if count != last_count:
+                last_count = self._process_samples(last_count)
+            self._publish_weight()
+            self._apply_power_policy()
+    
+    def _apply_power_policy(self):
+        """
+        Politikaya göre örnekleme hızını ve HX711 gücünü ayarla (okuma thread'inde)
+        
+        Returns:
+            Güncel durum (active / idle / sleep)
+        """
+        now = time.monotonic()
+        if not self.wake_requested and now - self.policy_checked_at < 0.25:
+            return self.power_policy.state
+        self.policy_checked_at = now
+        
+        # Dış kaynaklar (WebSocket abonesi, şarj durumu) saniyede bir sorulur
+        if now - self.demand_checked_at >= 1.0:
+            self.demand_checked_at = now
+            self.demand = any(self._check_demand(source) for source in list(self.demand_sources))
+        busy = self.wake_requested or self.demand or self.active_job is not None or bool(self.job_queue)
+        self.wake_requested = False
+        state = self.power_policy.update(now, busy, settled=self.stability.state != "unsettled")
+        
+        if self.acquisition is None:
+            return state  # MOCK: hız döngüde ayarlanır
+        
+        if state == SLEEP:
+            if self.power_policy.powered:
+                # Kısa uyanmada yeterli (oturmuş) örnek işlendiyse tekrar kapat
+                if (self.peek_count is None or now > self.peek_deadline
+                        or self.samples.count >= self.peek_count + SCALE_WAKE_SAMPLES):
+                    self.acquisition.power_down()
+                    self.power_policy.set_powered(now, False)
+                    self.next_peek = now + SCALE_SLEEP_CHECK_INTERVAL
+            elif now >= self.next_peek:
+                # Kısa kontrol tam hızda: medyan filtresini çevirecek kadar örnek okunur,
+                # kapalıyken tabak konduysa "placed" olayı üretilir ve tam hıza dönülür
+                if self.sample_interval is not None:
+                    self.sample_interval = None
+                    self.acquisition.set_interval(None)
+                self._power_up(now)
+                self.peek_count = self.samples.count
+                self.peek_deadline = now + SCALE_WAKE_SETTLE + 1.0
+            return state
+        
+        self.peek_count = None
+        if not self.power_policy.powered:
+            self._power_up(now)
+        interval = SCALE_IDLE_INTERVAL if state == IDLE else None
+        if interval != self.sample_interval:
+            self.sample_interval = interval
+            self.acquisition.set_interval(interval)
+        return state
+    
+    def _power_up(self, now):
+        self.acquisition.power_up(SCALE_WAKE_SETTLE)
+        self.power_policy.set_powered(now, True)
+    
+    def _check_demand(self, source):
+        try:
+            return bool(source())
+        except Exception as e:
+            print(f"[Scale] Talep kaynağı hatası: {e}")
+            return False
+    
+    def wake(self):
+        """Tam hıza dön (istemci ağırlık istedi) - uykudaysa HX711 hemen açılır"""
+        self.wake_requested = True
+    
+    def add_demand_source(self, callback):
+        """callback() True döndükçe tam hızda kal (saniyede bir, tartı thread'inden çağrılır)"""
+        self.demand_sources.append(callback)
+    
+    def _process_samples(self, last_count):
+        """Yeni ham örnekleri sırayla filtreden geçir, ağırlığı güncelle"""
+        count, timestamps, values = self.samples.since(last_count)
+        if not len(values):
+            return count
+        
+        recorder = self.recorder
+        if recorder is not None and not recorder.write(timestamps, values) and self.recorder is recorder:
+            self.recorder = None  # SCALE_RECORDING_MAX_SECONDS doldu
+        
+        events = []
+        finished = []
         with self.lock:
-            return self.current_weight
+            for timestamp, raw in zip(timestamps.tolist(), values.tolist()):
+                filtered = self.filters.update(raw)
+                self.noise.update(raw)
+                job = self.active_job
+                if job is not None and job.feed(raw, timestamp):
+                    # Sonraki örnekler yeni offset/reference unit ile çevrilir
+                    self._complete_job(job)
+                    finished.append(job)
+                events.extend(self.stability.update(self._to_grams(filtered), timestamp))
+                if self.active_job is None and self.mode != "MOCK":
+                    self._track_zero(filtered)
+            
+            self.filtered_raw = filtered
+            # Negatif değerleri filtrele, gram cinsine çevir
+            self.current_weight = max(0, int(self._to_grams(filtered)))
+        
+        for job in finished:
+            self._report_job(job)
+        for event in events:
+            self._emit(event)
+        if finished:
+            self._publish_weight(force=True)
+        
+        # Sıfır takibinin düzelttiği offset'i ara sıra kaydet
+        if (self.mode != "MOCK" and self.hx.get_offset() != self.saved_offset
+                and time.monotonic() - self.offset_saved_at > SCALE_ZERO_TRACK_SAVE_INTERVAL):
+            self._save_calibration()
+        return count
+    
+    def _track_zero(self, filtered):
+        """Tartı boş ve sakinse offset'i kaymaya göre düzelt (self.lock tutulurken)"""
+        settled = self.stability.state == "empty" and self.stability.is_quiet()
+        offset = self.zero_tracker.update(
+            self.hx.get_offset(), filtered, self.hx.get_reference_unit(), settled
+        )
+        if offset is not None:
+            self.hx.set_offset(offset)
     
-    def tare(self):
-        """Tartıyı sıfırla - offset'i yeniden ayarla"""
+    def _save_calibration(self):
+        """Güncel offset, reference unit ve doğrusallaştırma tablosunu kaydet"""
+        if self.mode == "REPLAY":
+            return  # Oynatılan kaydın kalibrasyonu cihaz profilinin üzerine yazılmaz
+        offset = self.hx.get_offset()
+        profile = self.calibration_store.save(
+            self.hx.get_reference_unit(), offset, self.linearization.points,
+            cells=self.cells.get_profile() if self.cells is not None else None
+        )
+        self.offset_saved_at = time.monotonic()
+        if profile is not None:
+            self.saved_offset = offset
+            self.calibration_saved_at = profile["timestamp"]
+    
+    def _advance_jobs(self):
+        """Süresi dolan işi düşür, sıradaki işi başlat (okuma thread'inde)"""
+        now = time.monotonic()
+        with self.lock:
+            job = self.active_job
+            if job is not None and job.expired(now):
+                job.fail(f"Zaman aşımı: {len(job.values)}/{job.samples} örnek toplandı")
+                self.active_job = None
+                print(f"[Scale] {job.type} işi #{job.id} başarısız: {job.error}")
+            if self.active_job is None and self.job_queue:
+                self.active_job = self.job_queue.popleft()
+                self.active_job.start(now)
+    
+    def _complete_job(self, job):
+        """Toplanan örneklerden sonucu hesapla ve uygula (self.lock tutulurken)"""
+        self.active_job = None
         try:
-            print("[Scale] Tare yapılıyor...")
-            if self.mode != "MOCK":
-                self.hx.tare(TARE_SAMPLES)
-            else:
-                self.hx.tare(TARE_SAMPLES)  # Mock HX711 de tare yapabilir
-            print(f"[Scale] Tare tamamlandı")
-            with self.lock:
+            offset = 0 if self.mode == "MOCK" else self.hx.get_offset()
+            result = job.compute(offset, self._reference_unit())
+            if job.type == "tare":
+                if self.mode == "MOCK":
+                    self.hx.tare(TARE_SAMPLES)  # Simülasyonda tabak boşalır
+                else:
+                    self.hx.set_offset(result["offset"])
+                    self.zero_tracker.reset(result["offset"])
+                    if self.cells is not None:
+                        self.cells.capture_zero(job.samples)
                 self.current_weight = 0
+            elif job.type == "linearization":
+                self.linearization.add_point(result["measured"], result["actual"])
+            elif job.type == "corner":
+                self._apply_corner_point(result)
+            else:
+                self.hx.set_reference_unit(result["reference_unit"])
+                # Eski birimle ölçülen doğrusallaştırma noktaları geçersiz
+                self.linearization.set_points([])
+            # Tare: sıfıra düşüş "removed" olayı üretmesin; kalibrasyon: ağırlık yeni birimle yeniden otursun
+            self.stability.reset()
+            job.finish(result)
         except Exception as e:
-            print(f"[Scale] Tare hatası: {e}")
+            job.fail(e)
+    
+    def _apply_corner_point(self, result):
+        """Köşe noktasını kaydet; tüm hücreler ölçülünce trim ve reference unit hesapla"""
+        self.corner_points[result["cell"]] = (result["deltas"], result["known_weight"])
+        result["remaining"] = [i for i in range(len(self.cells.cells)) if i not in self.corner_points]
+        if result["remaining"]:
+            return
+        
+        cells = sorted(self.corner_points)
+        trims, reference_unit = solve_corner_trims(
+            [self.corner_points[i][0] for i in cells],
+            [self.corner_points[i][1] for i in cells]
+        )
+        self.corner_points = {}
+        self.cells.set_trims(trims)
+        self.hx.set_reference_unit(reference_unit)
+        self.zero_tracker.reset(self.hx.get_offset())
+        self.linearization.set_points([])
+        result["trims"] = trims
+        result["reference_unit"] = reference_unit
+    
+    def _report_job(self, job):
+        """Biten işi logla ve profili kaydet (okuma thread'inde, kilit dışında)"""
+        if job.status != "done":
+            print(f"[Scale] {job.type} işi #{job.id} başarısız: {job.error}")
+            return
+        if job.type == "tare":
+            print(f"[Scale] Tare tamamlandı (offset: {job.result['offset']:.0f})")
+        elif job.type == "linearization":
+            print(f"[Scale] Doğrusallaştırma noktası eklendi: {job.result['measured']:.1f} g -> {job.result['actual']} g")
+        elif job.type == "corner":
+            if job.result["remaining"]:
+                print(f"[Scale] Köşe ayarı: hücre {job.result['cell']} ölçüldü, kalan: {job.result['remaining']}")
+                return
+            print(f"[Scale] Köşe ayarı tamamlandı (trim: {[round(t, 4) for t in job.result['trims']]}, "
+                  f"reference unit: {job.result['reference_unit']:.2f})")
+        else:
+            print(f"[Scale] Kalibrasyon tamamlandı! Yeni reference unit: {job.result['reference_unit']:.2f}")
+        if self.mode != "MOCK":
+            self._save_calibration()
+    
+    def _submit_job(self, job, error=None):
+        """İşi kaydet ve sıraya koy (error verilirse veya okuma thread'i çalışmıyorsa hemen başarısız)"""
+        if error is None and not self.running:
+            error = "Tartı okuma thread'i çalışmıyor"
+        with self.lock:
+            self.job_seq += 1
+            job.id = self.job_seq
+            self.jobs[job.id] = job
+            while len(self.jobs) > SCALE_JOB_HISTORY:
+                self.jobs.popitem(last=False)
+            if error is not None:
+                job.fail(error)
+            else:
+                self.job_queue.append(job)
+        return job
     
-    def calibrate(self, known_weight_grams):
+    def start_tare(self):
+        """Tare işini başlat (beklemeden döner) - sonraki TARE_SAMPLES örnekten offset"""
+        print("[Scale] Tare işi sıraya alındı")
+        return self._submit_job(TareJob(None, TARE_SAMPLES, timeout=SCALE_JOB_TIMEOUT))
+    
+    def start_calibration(self, known_weight_grams, linearization=False, cell=None):
         """
-        Kalibrasyon yap - bilinen ağırlık ile reference unit hesapla
+        Kalibrasyon işini başlat (beklemeden döner)
         
         Kullanım:
         1. Tartıyı sıfırla (tare)
         2. Bilinen ağırlığı koy (örn: 1000g)
-        3. Bu fonksiyonu çağır: scale.calibrate(1000)
+        3. scale.start_calibration(1000) - ağırlık SCALE_CALIBRATION_SETTLE sn oturur,
+           sonraki SCALE_CALIBRATION_SAMPLES örneğin medyanından reference unit hesaplanır
+        4. (İsteğe bağlı) Farklı ağırlıklarla linearization=True - reference unit değişmez,
+           ölçülen -> bilinen gram noktası doğrusallaştırma tablosuna eklenir
+        
+        Çoklu hücre köşe ayarı (tare sonrası): ağırlık sırayla her hücrenin üzerine konur
+        ve cell=0, 1, ... ile çağrılır; son hücrede trim'ler ve reference unit hesaplanır.
+        
+        Raises:
+            ValueError: known_weight_grams pozitif değilse
         """
+        params = dict(
+            samples=SCALE_CALIBRATION_SAMPLES,
+            settle_time=SCALE_CALIBRATION_SETTLE,
+            timeout=SCALE_JOB_TIMEOUT + SCALE_CALIBRATION_SETTLE
+        )
+        if cell is not None:
+            if self.cells is None:
+                raise ValueError("Köşe ayarı için SCALE_CELLS tanımlı olmalı")
+            if not 0 <= cell < len(self.cells.cells):
+                raise ValueError(f"Geçersiz hücre: {cell}")
+            job = CornerJob(None, known_weight_grams, cell, self.cells, **params)
+        elif linearization:
+            job = LinearizationJob(None, known_weight_grams, **params)
+        else:
+            job = CalibrationJob(None, known_weight_grams, **params)
         if self.mode == "MOCK":
-            print("[Scale] MOCK modda kalibrasyon yapılamaz")
-            return HX711_REFERENCE_UNIT
+            return self._submit_job(job, error="MOCK modda kalibrasyon yapılamaz")
+        print(f"[Scale] Kalibrasyon işi sıraya alındı ({known_weight_grams}g ile)")
+        return self._submit_job(job)
+    
+    def get_job(self, job_id):
+        """İş durumu (bilinmeyen id için None)"""
+        job = self.jobs.get(job_id)
+        return job.to_dict() if job is not None else None
+    
+    def _emit(self, event):
+        """Olayı kaydet, bekleyenleri uyandır ve dinleyicilere ilet (tartı thread'inde)"""
+        with self.event_cond:
+            self.event_seq += 1
+            event = dict(event, weight=round(event["weight"], 1), seq=self.event_seq,
+                         timestamp=datetime.now().isoformat())
+            self.last_event = event
+            self.event_cond.notify_all()
         
-        try:
-            print(f"[Scale] Kalibrasyon başlıyor ({known_weight_grams}g ile)...")
-            print("[Scale] Lütfen birkaç saniye bekleyin...")
-            
-            # Birkaç okuma yap ve ortalama al
-            time.sleep(1)
-            value = self.hx.get_value(10)
-            
-            # Reference unit hesapla
-            new_reference_unit = value / known_weight_grams
-            
-            print(f"[Scale] Okunan değer: {value}")
-            print(f"[Scale] Yeni reference unit: {new_reference_unit}")
-            
-            # Yeni reference unit'i ayarla
-            self.hx.set_reference_unit(new_reference_unit)
-            
-            print(f"[Scale] Kalibrasyon tamamlandı!")
-            print(f"[Scale] config.py dosyasında HX711_REFERENCE_UNIT = {int(new_reference_unit)} olarak güncelleyin")
-            
-            return new_reference_unit
-            
-        except Exception as e:
-            print(f"[Scale] Kalibrasyon hatası: {e}")
-            return HX711_REFERENCE_UNIT
+        print(f"[Scale] Olay: {event['type']} ({event['weight']} g)")
+        for listener in list(self.listeners):
+            try:
+                listener(event)
+            except Exception as e:
+                print(f"[Scale] Olay dinleyici hatası: {e}")
+    
+    def _publish_weight(self, force=False):
+        """Değişim eşiği aşıldıysa (veya heartbeat zamanıysa) ağırlık dinleyicilerini çağır"""
+        if not self.weight_listeners:
+            return
+        
+        now = time.monotonic()
+        with self.lock:
+            if self.filtered_raw is None:
+                return
+            filtered = self._to_grams(self.filtered_raw)
+            weight = self.current_weight
+            state = self.stability.state
+        
+        last = self.last_published
+        if (not force and last is not None
+                and abs(filtered - last[0]) < SCALE_STREAM_DELTA
+                and state == last[1]
+                and now - last[2] < SCALE_STREAM_HEARTBEAT):
+            return
+        self.last_published = (filtered, state, now)
+        
+        sample = {"weight": weight, "filtered": round(filtered, 1), "state": state}
+        for listener in list(self.weight_listeners):
+            try:
+                listener(sample)
+            except Exception as e:
+                print(f"[Scale] Ağırlık dinleyici hatası: {e}")
+    
+    def add_weight_listener(self, callback):
+        """callback({"weight", "filtered", "state"}) - tartı thread'inden, sadece değişimde"""
+        self.weight_listeners.append(callback)
+    
+    def add_listener(self, callback):
+        """callback(event) - tartı thread'inden çağrılır, hızlı dönmelidir"""
+        self.listeners.append(callback)
+    
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+    
+    def get_state(self):
+        """Kararlılık durumu: empty / unsettled / stable"""
+        with self.lock:
+            stable_weight = self.stability.stable_weight
+            return {
+                "state": self.stability.state,
+                "stable_weight": round(stable_weight, 1) if stable_weight is not None else None,
+                "last_event": self.last_event
+            }
+    
+    def wait_for_stable(self, timeout=None):
+        """
+        Ağırlık oturana kadar bekle (zaten kararlıysa hemen döner)
+        
+        Returns:
+            Kararlı ağırlık (gram) veya zaman aşımında None
+        """
+        with self.event_cond:
+            self.event_cond.wait_for(lambda: self.stability.state == "stable", timeout)
+            return self.stability.stable_weight
+    
+    def _to_grams(self, raw):
+        """Ham sayıyı grama çevir (MOCK: offset 0, doğrusallaştırma yok)"""
+        if self.mode == "MOCK":
+            return raw / HX711_REFERENCE_UNIT
+        return self.linearization.apply((raw - self.hx.get_offset()) / self.hx.get_reference_unit())
+    
+    def _reference_unit(self):
+        return HX711_REFERENCE_UNIT if self.mode == "MOCK" else self.hx.get_reference_unit()
+    
+    def read_weight(self):
+        """Anlık ağırlık değerini döndür (gram)"""
+        with self.lock:
+            return self.current_weight
+    
+    def get_filtered_weight(self):
+        """Filtrelenmiş ağırlık (gram, ondalıklı, negatif olabilir) - örnek yoksa None"""
+        with self.lock:
+            if self.filtered_raw is None:
+                return None
+            return self._to_grams(self.filtered_raw)
+    
+    def get_noise(self):
+        """Son SCALE_NOISE_WINDOW ham örneğin standart sapması (gram)"""
+        with self.lock:
+            return self.noise.std / abs(self._reference_unit())
+    
+    def get_raw_window(self, n=None):
+        """
+        Son n ham örnek (donanım tekrar okunmaz)
+        
+        Returns:
+            {"timestamps": [...], "raw": [...], "grams": [...]} - eskiden yeniye
+        """
+        timestamps, values = self.samples.window(n)
+        return {
+            "timestamps": timestamps.tolist(),
+            "raw": values.tolist(),
+            "grams": [round(self._to_grams(v), 2) for v in values.tolist()]
+        }
+    
+    def get_measurement(self):
+        """Anlık ölçüm özeti: ağırlık, filtrelenmiş değer, gürültü ve örnek hızı"""
+        filtered = self.get_filtered_weight()
+        return {
+            "weight": self.read_weight(),
+            "filtered": round(filtered, 2) if filtered is not None else None,
+            "noise": round(self.get_noise(), 3),
+            "sample_rate": round(self.samples.sample_rate(), 2),
+            "samples": self.samples.count,
+            "load_cells": self.cells.get_cells() if self.cells is not None else None
+        }
+    
+    def tare(self, timeout=None):
+        """Tartıyı sıfırla ve bitmesini bekle (script kullanımı; API start_tare kullanır)"""
+        job = self.start_tare()
+        job.wait(SCALE_JOB_TIMEOUT if timeout is None else timeout)
+        return job.to_dict()
+    
+    def calibrate(self, known_weight_grams, timeout=None):
+        """
+        Kalibrasyon yap ve bitmesini bekle (script kullanımı)
+        
+        Returns:
+            Yeni reference unit (başarısızsa mevcut değer)
+        """
+        job = self.start_calibration(known_weight_grams)
+        job.wait(SCALE_JOB_TIMEOUT + SCALE_CALIBRATION_SETTLE if timeout is None else timeout)
+        if job.status == "done":
+            return job.result["reference_unit"]
+        return self._reference_unit()
+    
+    def get_calibration(self):
+        """Kalibrasyon profili ve sıfır takibi durumu (MOCK modda None)"""
+        if self.mode == "MOCK":
+            return None
+        with self.lock:
+            offset = self.hx.get_offset()
+            reference_unit = self.hx.get_reference_unit()
+            return {
+                "reference_unit": round(reference_unit, 3),
+                "offset": round(offset, 1),
+                "linearization": self.linearization.points,
+                "zero_drift": round(self.zero_tracker.drift(offset, reference_unit), 2),
+                "zero_corrections": self.zero_tracker.corrections,
+                "cells": self.cells.get_profile() if self.cells is not None else None,
+                "corner_points": sorted(self.corner_points),
+                "saved_at": self.calibration_saved_at
+            }
+    
+    def start_recording(self, max_seconds=SCALE_RECORDING_MAX_SECONDS):
+        """
+        Ham örnekleri DATA_DIR/SCALE_RECORDING_DIR altına kaydetmeye başla
+        
+        Returns:
+            Kayıt durumu (path, samples)
+        """
+        self.stop_recording()
+        name = datetime.now().strftime("scale_%Y%m%d_%H%M%S.bin")
+        path = os.path.join(DATA_DIR, SCALE_RECORDING_DIR, name)
+        self.recorder = SampleRecorder(
+            path, self.hx.get_offset() if self.mode != "MOCK" else 0.0,
+            self._reference_unit(), max_seconds
+        )
+        print(f"[Scale] Ham örnek kaydı başladı: {path}")
+        return self.recorder.get_stats()
+    
+    def stop_recording(self):
+        """Kaydı kapat (kayıt yoksa None)"""
+        recorder, self.recorder = self.recorder, None
+        if recorder is None:
+            return None
+        recorder.close()
+        return recorder.get_stats()
+    
+    def get_recording(self):
+        """Kayıt ve (REPLAY modda) oynatma durumu"""
+        return {
+            "recording": self.recorder.get_stats() if self.recorder is not None else None,
+            "replay": self.hx.get_progress() if self.mode == "REPLAY" else None
+        }
+    
+    def get_stats(self):
+        """Örnek toplama istatistikleri (MOCK modda sadece güç politikası)"""
+        stats = {"power": self.get_power_stats()}
+        if self.acquisition is not None:
+            stats.update(self.acquisition.get_stats())
+        return stats
+    
+    def get_power_stats(self):
+        """Güç politikası durumu, durum süreleri ve duty cycle"""
+        return {
+            **self.power_policy.get_stats(time.monotonic()),
+            "sample_interval": self.sample_interval,
+            "sample_rate": round(self.samples.sample_rate(8), 2)
+        }
     
     def cleanup(self):
         """GPIO temizle ve thread'i durdur"""
         try:
             # Thread'i durdur
             self.running = False
+            if self.acquisition:
+                self.acquisition.stop()
             if self.reading_thread:
                 self.reading_thread.join(timeout=2)
             
+            self.stop_recording()
+            
+            # Sıfır takibinin son düzeltmesini kaydet
+            if self.mode != "MOCK" and self.hx.get_offset() != self.saved_offset:
+                self._save_calibration()
+            
             # GPIO temizle
             if self.mode != "MOCK":
                 GPIO.cleanup()
@@ -0,0 +1,190 @@
+# Tartı İşleri - Tare ve kalibrasyon, okuma thread'inin kendi örnek akışından
+#
+# İş nesnesi API'den oluşturulur, tartı thread'i tarafından sırayla çalıştırılır:
+# filtreden geçen her ham örnek aktif işe de verilir (feed), HX711 ayrıca
+# okunmaz. Yeterli örnek toplanınca sonuç hesaplanır ve aynı thread'de, örnekler
+# arasında uygulanır; event loop beklemez, okumalar yarım tare/kalibrasyon görmez.
+
+import threading
+import time
+from datetime import datetime
+import numpy as np
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def trimmed_mean(values, trim=0.2):
+    """Üstten ve alttan %20 aykırı örneği atıp ortalama al (HX711.read_average gibi)"""
+    values = np.sort(np.asarray(values))
+    trim_count = int(len(values) * trim)
+    if trim_count:
+        values = values[trim_count:-trim_count]
+    return float(values.mean())
+
+
+class ScaleJob:
+    """Örnek toplayan iş (alt sınıflar compute ile sonucu hesaplar)"""
+
+    type = "job"
+
+    def __init__(self, job_id, samples, settle_time=0.0, timeout=10.0):
+        """
+        Args:
+            job_id: İş numarası
+            samples: Toplanacak ham örnek sayısı
+            settle_time: Başladıktan sonra atlanacak süre (saniye) - ağırlık otursun
+            timeout: Başlangıçtan itibaren en fazla süre (saniye)
+        """
+        self.id = job_id
+        self.samples = samples
+        self.settle_time = settle_time
+        self.timeout = timeout
+
+        self.status = PENDING
+        self.values = []
+        self.started_at = None  # time.monotonic (örnek zaman damgalarıyla aynı saat)
+        self.result = None
+        self.error = None
+        self.created_at = datetime.now().isoformat()
+        self.finished_at = None
+        self.done = threading.Event()
+
+    def start(self, now):
+        self.status = RUNNING
+        self.started_at = now
+
+    def feed(self, raw, timestamp):
+        """Yeni ham örnek; yeterli örnek toplandıysa True"""
+        if timestamp < self.started_at + self.settle_time:
+            return False
+        self.values.append(raw)
+        return len(self.values) >= self.samples
+
+    def expired(self, now):
+        return self.status == RUNNING and now - self.started_at > self.timeout
+
+    def compute(self, offset, reference_unit):
+        raise NotImplementedError
+
+    def finish(self, result):
+        self.result = result
+        self._end(DONE)
+
+    def fail(self, error):
+        self.error = str(error)
+        self._end(FAILED)
+
+    def _end(self, status):
+        self.status = status
+        self.finished_at = datetime.now().isoformat()
+        self.done.set()
+
+    def wait(self, timeout=None):
+        """İş bitene kadar bekle (thread'den; event loop'ta çağrılmamalı)"""
+        return self.done.wait(timeout)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "type": self.type,
+            "status": self.status,
+            "progress": round(min(1.0, len(self.values) / self.samples), 2),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+
+
+class TareJob(ScaleJob):
+    """Boş tartıda offset: örneklerin kırpılmış ortalaması"""
+
+    type = "tare"
+
+    def compute(self, offset, reference_unit):
+        return {"offset": trimmed_mean(self.values)}
+
+
+class CalibrationJob(ScaleJob):
+    """Bilinen ağırlıkla reference unit: (medyan - offset) / gram"""
+
+    type = "calibration"
+
+    def __init__(self, job_id, known_weight, samples=10, settle_time=1.0, timeout=10.0):
+        if known_weight <= 0:
+            raise ValueError("Bilinen ağırlık pozitif olmalı")
+        super().__init__(job_id, samples, settle_time, timeout)
+        self.known_weight = known_weight
+
+    def compute(self, offset, reference_unit):
+        value = float(np.median(self.values)) - offset
+        reference_unit = value / self.known_weight
+        if abs(reference_unit) < 1.0:
+            raise ValueError(f"Tartıda ağırlık algılanmadı (okunan değer: {value:.0f})")
+        return {"reference_unit": reference_unit, "value": value, "known_weight": self.known_weight}
+
+    def to_dict(self):
+        return {**super().to_dict(), "known_weight": self.known_weight}
+
+
+class LinearizationJob(CalibrationJob):
+    """Doğrusallaştırma noktası: mevcut reference unit ile ölçülen gram -> bilinen gram"""
+
+    type = "linearization"
+
+    def compute(self, offset, reference_unit):
+        measured = (float(np.median(self.values)) - offset) / reference_unit
+        if measured <= 0:
+            raise ValueError(f"Tartıda ağırlık algılanmadı (ölçülen: {measured:.1f} g)")
+        return {"measured": measured, "actual": self.known_weight}
+
+
+
+class CornerJob(CalibrationJob):
+    """Çoklu hücre köşe ayarı: ağırlık bir hücrenin üzerindeyken hücre başına değişim"""
+
+    type = "corner"
+
+    def __init__(self, job_id, known_weight, cell, cells, samples=10, settle_time=1.0, timeout=10.0):
+        super().__init__(job_id, known_weight, samples, settle_time, timeout)
+        self.cell = cell
+        self.cells = cells
+
+    def compute(self, offset, reference_unit):
+        if self.cells.zeros is None:
+            raise ValueError("Önce tare yapılmalı (hücre sıfırları yok)")
+        deltas = self.cells.cell_means(self.samples) - self.cells.zeros
+        return {"cell": self.cell, "deltas": deltas.tolist(), "known_weight": self.known_weight}
+
+    def to_dict(self):
+        return {**super().to_dict(), "cell": self.cell}
+
+# Test fonksiyonu - sentetik örnek akışıyla tare + kalibrasyon
+if __name__ == "__main__":
+    import random
+
+    random.seed(0)
+    offset_raw, reference_unit = 8400, 210.0
+    now = time.monotonic()
+
+    tare = TareJob(1, samples=10)
+    tare.start(now)
+    t = now
+    while True:
+        t += 0.1
+        if tare.feed(offset_raw + random.gauss(0, 60), t):
+            break
+    tare.finish(tare.compute(0, 1))
+    print(f"Tare: {tare.to_dict()}")
+
+    calibration = CalibrationJob(2, known_weight=500)
+    calibration.start(t)
+    while True:
+        t += 0.1
+        if calibration.feed(offset_raw + 500 * reference_unit + random.gauss(0, 60), t):
+            break
+    calibration.finish(calibration.compute(tare.result["offset"], 1))
+    print(f"Kalibrasyon: {calibration.to_dict()}")
@@ -0,0 +1,105 @@
+# Tartı Kararlılık Algılama - placed / stable / unsettled / removed olayları
+#
+# Filtrelenmiş ağırlık örnek başına verilir. Kayan penceredeki standart sapma
+# tolerans altında hold_time boyunca kalırsa ağırlık "oturmuş" sayılır ve tek
+# bir stable olayı üretilir; istemcilerin 10 Hz yoklayıp tahmin etmesi gerekmez.
+
+import time
+from hardware.filters import WindowStats
+
+EMPTY = "empty"
+UNSETTLED = "unsettled"
+STABLE = "stable"
+
+
+class StabilityDetector:
+    def __init__(self, window=8, tolerance=0.5, hold_time=0.4, empty_threshold=5.0, change_threshold=2.0):
+        """
+        Args:
+            window: Varyans penceresi (örnek)
+            tolerance: Kararlı sayılmak için en fazla standart sapma (gram)
+            hold_time: Tolerans içinde kalma süresi (saniye)
+            empty_threshold: Bu değerin altı boş tartı (gram)
+            change_threshold: Kararlı ağırlıktan bu kadar sapma yeni yerleşme başlatır (gram)
+        """
+        self.window = window
+        self.tolerance = tolerance
+        self.hold_time = hold_time
+        self.empty_threshold = empty_threshold
+        self.change_threshold = change_threshold
+
+        self.stats = WindowStats(window)
+        self.state = EMPTY
+        self.stable_weight = None
+        self.stable_since = None  # Tolerans içine girilen an
+
+    def reset(self):
+        """Tare/kalibrasyon sonrası: pencereyi temizle, durumu boşa çek (olay üretmeden)"""
+        self.stats.reset()
+        self.state = EMPTY
+        self.stable_weight = None
+        self.stable_since = None
+
+    def is_quiet(self):
+        """Pencere dolu ve sapma tolerans içinde (durumdan bağımsız)"""
+        return self.stats.count >= self.window and self.stats.std <= self.tolerance
+
+    def update(self, weight, timestamp=None):
+        """
+        Yeni filtrelenmiş ağırlık örneği
+
+        Returns:
+            Üretilen olayların listesi: [{"type", "weight"}] (çoğu örnekte boş)
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        self.stats.update(weight)
+        events = []
+
+        if self.state == EMPTY:
+            if weight >= self.empty_threshold:
+                self._transition(UNSETTLED)
+                events.append({"type": "placed", "weight": weight})
+            return events
+
+        if weight < self.empty_threshold:
+            self._transition(EMPTY)
+            events.append({"type": "removed", "weight": weight})
+            return events
+
+        if self.state == STABLE:
+            if abs(weight - self.stable_weight) > self.change_threshold:
+                self._transition(UNSETTLED)
+                events.append({"type": "unsettled", "weight": weight})
+            return events
+
+        # UNSETTLED: pencere dolu ve sapma tolerans içinde hold_time kadar kalmalı
+        if self.is_quiet():
+            if self.stable_since is None:
+                self.stable_since = timestamp
+            if timestamp - self.stable_since >= self.hold_time:
+                self.stable_weight = self.stats.mean
+                self.state = STABLE
+                events.append({"type": "stable", "weight": self.stable_weight})
+        else:
+            self.stable_since = None
+        return events
+
+    def _transition(self, state):
+        self.state = state
+        self.stable_weight = None
+        self.stable_since = None
+
+
+# Test fonksiyonu - tabak konup kaldırılan sentetik sinyal
+if __name__ == "__main__":
+    import random
+
+    random.seed(1)
+    detector = StabilityDetector()
+    # 10 örnek/sn: 1 sn boş, 0.5 sn yükseliş, 2 sn 250 g, 0.3 sn ekleme, 2 sn 300 g, kaldırma
+    signal = [0] * 10 + [50 * i for i in range(1, 6)] + [250] * 20 + [270, 290, 300] + [300] * 20 + [0] * 10
+    for i, target in enumerate(signal):
+        weight = target + random.gauss(0, 0.15)
+        for event in detector.update(weight, timestamp=i * 0.1):
+            print(f"t={i * 0.1:4.1f}s {event['type']:10s} {event['weight']:7.1f} g")
@@ -13,7 +13,6 @@ import sys
 import os
 import json
 import numpy as np
-import subprocess
 from typing import Optional, List
 from datetime import datetime
 from PIL import Image
@@ -27,108 +26,26 @@ from hardware.camera import Camera
 from hardware.battery import Battery
 from hardware.speaker import Speaker
 from ai.food_recognition import FoodRecognizer
+from ai.model_registry import ModelRegistry
+from ai.inference_executor import InferenceExecutor, InferenceQueueFull
+from ai.model_benchmark import run_benchmark, save_results, load_results, load_best_options
 from core.nutrition import NutritionCalculator
 from core.bmi import BMICalculator
-from core.database import Database
-
-try:
-    import tflite_runtime.interpreter as tflite
-except ImportError:
-    print("⚠️ tflite_runtime bulunamadı, tensorflow kullanılıyor...")
-    import tensorflow.lite as tflite
-
-# ==================== TFLITE PREDICTOR CLASS ====================
-
-class TFLitePredictor:
-    """TFLite model ile tahmin yapma"""
-    
-    def __init__(self, tflite_path, class_indices_path):
-        """
-        Args:
-            tflite_path: TFLite model dosya yolu
-            class_indices_path: Sınıf indeksleri JSON dosyası
-        """
-        # TFLite interpreter yükle
-        self.interpreter = tflite.Interpreter(model_path=tflite_path)
-        self.interpreter.allocate_tensors()
-        
-        # Giriş/çıkış detayları
-        self.input_details = self.interpreter.get_input_details()
-        self.output_details = self.interpreter.get_output_details()
-        
-        # Sınıf isimlerini yükle
-        with open(class_indices_path, 'r', encoding='utf-8') as f:
-            class_indices = json.load(f)
-        self.class_names = {v: k for k, v in class_indices.items()}
-        
-        print(f"✅ TFLite model yüklendi: {tflite_path}")
-        print(f"   Giriş boyutu: {self.input_details[0]['shape']}")
-        print(f"   Çıkış boyutu: {self.output_details[0]['shape']}")
-        print(f"   Kategori sayısı: {len(self.class_names)}")
-    
-    def preprocess_image(self, image_data):
-        """Görüntüyü model için hazırlar"""
-        # PIL Image'e çevir
-        if isinstance(image_data, bytes):
-            img = Image.open(io.BytesIO(image_data)).convert('RGB')
-        elif isinstance(image_data, str):
-            img = Image.open(image_data).convert('RGB')
-        else:
-            img = image_data.convert('RGB')
-        
-        img = img.resize((224, 224))
-        
-        # NumPy array'e çevir
-        img_array = np.array(img, dtype=np.float32)
-        
-        # Normalizasyon
-        img_array = img_array / 255.0
-        
-        # Batch dimension ekle
-        img_array = np.expand_dims(img_array, axis=0)
-        
-        return img_array
-    
-    def predict(self, image_data, top_k=5):
-        """
-        Görüntüden tahmin yapar
-        
-        Args:
-            image_data: Görüntü dosya yolu veya bytes
-            top_k: En yüksek K tahmin
-            
-        Returns:
-            Tahmin sonuçları
-        """
-        try:
-            # Görüntüyü hazırla
-            img_array = self.preprocess_image(image_data)
-            print(f"🔍 Preprocessed image shape: {img_array.shape}")
-            
-            # Tahmin yap
-            self.interpreter.set_tensor(self.input_details[0]['index'], img_array)
-            self.interpreter.invoke()
-            predictions = self.interpreter.get_tensor(self.output_details[0]['index'])[0]
-            print(f"📊 Predictions shape: {predictions.shape}, min: {predictions.min():.4f}, max: {predictions.max():.4f}")
-            
-            # Top-K tahminleri al
-            top_indices = np.argsort(predictions)[-top_k:][::-1]
-            
-            results = []
-            for idx in top_indices:
-                if idx not in self.class_names:
-                    print(f"⚠️ Index {idx} not found in class_names")
-                    continue
-                results.append({
-                    'class': self.class_names[idx],
-                    'confidence': float(predictions[idx]),
-                    'percentage': float(predictions[idx] * 100)
-                })
-            
-            return results
-        except Exception as e:
-            print(f"❌ TFLitePredictor.predict error: {type(e).__name__}: {str(e)}")
-            raise
+from core.database import create_database
+from core.photo_archive import PhotoArchiver
+from core.single_flight import SingleFlight
+from core.broadcast import BroadcastHub
+from config import (
+    SCAN_PHOTO_ARCHIVE, SCAN_PHOTO_PATH, LABELS_PATH,
+    MODEL_VARIANTS, MODEL_VARIANT, DEFAULT_MODEL_VARIANT,
+    INFERENCE_WORKERS, INFERENCE_QUEUE_SIZE, SCAN_COALESCE_WINDOW, DATA_DIR,
+    MODEL_NUM_THREADS, MODEL_DELEGATE, MODEL_EXTERNAL_DELEGATE_PATH, MODEL_EXTERNAL_DELEGATE_OPTIONS,
+    MODEL_BENCHMARK_ON_STARTUP, MODEL_BENCHMARK_THREADS, MODEL_BENCHMARK_DELEGATES,
+    MODEL_BENCHMARK_RUNS, MODEL_BENCHMARK_FILE, MODEL_AUTO_TUNE,
+    MODEL_MAX_BATCH, SCAN_TTA_VIEWS, TTA_CENTER_CROP, MODEL_TEST_MAX_FILES,
+    SCAN_STABLE_TIMEOUT, SCALE_POWER_SAVE_ON_MAINS, SCALE_RECORDING_MAX_SECONDS,
+    DATABASE_BACKEND
+)
 
 # FastAPI App
 app = FastAPI(title="Nutriquant API", version="2.0.0")
@@ -147,26 +64,78 @@ scale = Scale()
 camera = Camera()
 battery = Battery()
 speaker = Speaker()
-recognizer = FoodRecognizer()
 nutrition_calc = NutritionCalculator()
 bmi_calc = BMICalculator()
-db = Database()
+db = create_database(DATABASE_BACKEND)
+photo_archiver = PhotoArchiver(os.path.join(backend_dir, SCAN_PHOTO_PATH), enabled=SCAN_PHOTO_ARCHIVE)
 
-# TFLite model predictor
+# TFLite model - tek sefer yüklenir, tüm AI endpoint'leri paylaşır
+model_registry = ModelRegistry(backend_dir)
 try:
-    # Backend klasörü içindeki models klasörü
-    backend_dir = os.path.dirname(os.path.abspath(__file__))
-    model_path = os.path.join(backend_dir, "models", "model_float16.tflite")
-    class_indices_path = os.path.join(backend_dir, "models", "class_indices.json")
-    
-    print(f"🔍 Model yolu: {model_path}")
-    print(f"🔍 Class indices yolu: {class_indices_path}")
-    
-    tflite_predictor = TFLitePredictor(model_path, class_indices_path)
+    tflite_predictor = model_registry.load_variant(
+        MODEL_VARIANTS, MODEL_VARIANT, LABELS_PATH,
+        fallback=DEFAULT_MODEL_VARIANT,
+        interpreter_options={
+            "num_threads": MODEL_NUM_THREADS,
+            "delegate": MODEL_DELEGATE,
+            "external_delegate_path": MODEL_EXTERNAL_DELEGATE_PATH,
+            "external_delegate_options": MODEL_EXTERNAL_DELEGATE_OPTIONS
+        },
+        max_batch=MODEL_MAX_BATCH
+    )
 except Exception as e:
     print(f"⚠️ TFLite model yüklenemedi: {e}")
     tflite_predictor = None
 
+# Sınıf indeksine hizalı besin değerleri tablosu (worker kopyaları paylaşır)
+if tflite_predictor is not None:
+    tflite_predictor.postprocessor.load_nutrition(nutrition_calc.food_db)
+
+# Interpreter benchmark - worker kopyaları oluşmadan önce en hızlı ayarı seç
+benchmark_path = os.path.join(DATA_DIR, MODEL_BENCHMARK_FILE)
+
+def benchmark_model():
+    """Tüm thread/delegate kombinasyonlarını ölç ve kaydet"""
+    results = run_benchmark(
+        tflite_predictor,
+        MODEL_BENCHMARK_THREADS,
+        MODEL_BENCHMARK_DELEGATES,
+        runs=MODEL_BENCHMARK_RUNS,
+        external_delegate_path=MODEL_EXTERNAL_DELEGATE_PATH
+    )
+    save_results(benchmark_path, tflite_predictor.model_name, results)
+    return results
+
+if tflite_predictor is not None:
+    if MODEL_BENCHMARK_ON_STARTUP:
+        benchmark_model()
+    
+    if MODEL_AUTO_TUNE:
+        best = load_best_options(benchmark_path, tflite_predictor.model_name)
+        current = tflite_predictor.interpreter_options
+        if best and (best.get("num_threads"), best.get("delegate")) != (current.get("num_threads"), current.get("delegate")):
+            print(f"⚡ Benchmark sonucuna göre interpreter ayarı: {best}")
+            tflite_predictor.set_interpreter_options(best)
+
+# Çıkarım havuzu - her worker'ın kendi interpreter'ı var, event loop bloklanmaz
+if tflite_predictor is not None:
+    inference_executor = InferenceExecutor(
+        tflite_predictor,
+        num_workers=INFERENCE_WORKERS,
+        max_queue=INFERENCE_QUEUE_SIZE
+    )
+else:
+    inference_executor = None
+
+recognizer = FoodRecognizer(inference_executor)
+
+# Tartı yayınları: tartı thread'i bir kez yayınlar, tüm WebSocket istemcileri abone olur
+weight_hub = BroadcastHub("weight")
+scale_event_hub = BroadcastHub("scale_events", max_queue=16)
+
+# Eşzamanlı tarama isteklerini tek çekim + tek çıkarımda birleştir
+scan_flight = SingleFlight(window=SCAN_COALESCE_WINDOW)
+
 # Pydantic Models
 class ProfileCreate(BaseModel):
     name: str
@@ -195,6 +164,11 @@ class PlateCreate(BaseModel):
     name: str
     weight: float
 
+class CalibrateRequest(BaseModel):
+    known_weight: float  # gram
+    linearization: bool = False  # True: reference unit yerine doğrusallaştırma noktası ekle
+    cell: Optional[int] = None  # Çoklu hücre köşe ayarı: ağırlığın üzerinde durduğu hücre
+
 class ScanCompleteRequest(BaseModel):
     plate_id: Optional[int] = None
 
@@ -217,6 +191,11 @@ async def health_check():
         "battery": battery.get_percentage(),
         "scale_mode": scale.mode,
         "camera_mode": "mock" if camera.mock_mode else "real",
+        "scale_acquisition": scale.get_stats(),
+        "camera_stream": camera.stream.get_stats(),
+        "inference": inference_executor.get_stats() if inference_executor else None,
+        "scan_coalescing": scan_flight.get_stats(),
+        "weight_stream": weight_hub.get_stats(),
         "timestamp": datetime.now().isoformat()
     }
 
@@ -234,6 +213,7 @@ async def get_weight():
         status: Sensör durumu
     """
     try:
+        scale.wake()  # Yoklayan istemci var: düşük hız/uykudan çık
         weight = scale.read_weight()
         
         # Ağırlık durumu kontrolü
@@ -250,47 +230,224 @@ async def get_weight():
         print(f"❌ Ağırlık okuma hatası: {e}")
         raise HTTPException(status_code=500, detail=f"Ağırlık okuma hatası: {str(e)}")
 
+@app.get("/api/scale/samples")
+async def get_scale_samples(n: int = 64):
+    """
+    Ham örnek penceresi ve filtre durumu (donanım tekrar okunmaz)
+    
+    Returns:
+        Filtrelenmiş ağırlık, gürültü (g), örnek hızı ve son n ham örnek
+    """
+    return {
+        **scale.get_measurement(),
+        "window": scale.get_raw_window(n),
+        "scale_mode": scale.mode
+    }
+
 @app.post("/api/scale/tare")
 async def tare_scale():
-    """Tartıyı sıfırla"""
-    scale.tare()
-    return {"status": "success", "message": "Tartı sıfırlandı"}
+    """
+    Tartıyı sıfırla (arka plan işi) - durum /api/scale/jobs/{id} ile izlenir
+    
+    Offset, tartı thread'inin sonraki TARE_SAMPLES örneğinden hesaplanır; istek beklemez.
+    """
+    job = scale.start_tare()
+    if job.status == "failed":
+        raise HTTPException(status_code=409, detail=job.error)
+    return {"status": "started", "message": "Tare başlatıldı", "job": job.to_dict()}
+
+@app.post("/api/scale/calibrate")
+async def calibrate_scale(request: CalibrateRequest):
+    """
+    Bilinen ağırlıkla kalibrasyon (arka plan işi) - önce tare, sonra ağırlığı koyun
+    
+    Returns:
+        job: İş durumu; sonuç (reference_unit) /api/scale/jobs/{id} ile alınır
+    """
+    try:
+        job = scale.start_calibration(request.known_weight, request.linearization, request.cell)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if job.status == "failed":
+        raise HTTPException(status_code=409, detail=job.error)
+    return {"status": "started", "message": "Kalibrasyon başlatıldı", "job": job.to_dict()}
+
+@app.get("/api/scale/calibration")
+async def get_scale_calibration():
+    """Kayıtlı kalibrasyon profili (reference unit, offset, doğrusallaştırma) ve sıfır takibi"""
+    return {"calibration": scale.get_calibration(), "scale_mode": scale.mode}
+
+@app.get("/api/scale/jobs/{job_id}")
+async def get_scale_job(job_id: int):
+    """Tare/kalibrasyon işinin durumu (pending / running / done / failed)"""
+    job = scale.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="İş bulunamadı")
+    return job
+
+async def wait_for_stable_weight(timeout):
+    """
+    Ağırlık oturana kadar bekle (zaten kararlıysa hemen döner)
+    
+    Returns:
+        Kararlı ağırlık (gram) veya zaman aşımında None
+    """
+    scale.wake()
+    state = scale.get_state()
+    if state["state"] == "stable":
+        return state["stable_weight"]
+    
+    queue = scale_event_hub.subscribe()
+    try:
+        # Abone olmadan önce oturmuş olabilir
+        state = scale.get_state()
+        if state["state"] == "stable":
+            return state["stable_weight"]
+        
+        async def next_stable():
+            while True:
+                event = await queue.get()
+                if event["type"] == "stable":
+                    return event["weight"]
+        
+        return await asyncio.wait_for(next_stable(), timeout)
+    except asyncio.TimeoutError:
+        return None
+    finally:
+        scale_event_hub.unsubscribe(queue)
+
+@app.get("/api/scale/power")
+async def get_scale_power():
+    """Örnekleme güç politikası: durum (active / idle / sleep), durum süreleri ve duty cycle"""
+    return {**scale.get_power_stats(), "scale_mode": scale.mode}
+
+@app.post("/api/scale/recording/start")
+async def start_scale_recording(max_seconds: Optional[float] = None):
+    """Ham örnek kaydını başlat (ReplayHX711 ile oynatılabilir ikili dosya)"""
+    recording = scale.start_recording(max_seconds or SCALE_RECORDING_MAX_SECONDS)
+    return {"status": "started", "recording": recording}
+
+@app.post("/api/scale/recording/stop")
+async def stop_scale_recording():
+    """Ham örnek kaydını durdur"""
+    recording = scale.stop_recording()
+    if recording is None:
+        raise HTTPException(status_code=409, detail="Aktif kayıt yok")
+    return {"status": "stopped", "recording": recording}
+
+@app.get("/api/scale/recording")
+async def get_scale_recording():
+    """Kayıt ve oynatma (SCALE_REPLAY_FILE) durumu"""
+    return {**scale.get_recording(), "scale_mode": scale.mode}
+
+@app.get("/api/scale/state")
+async def get_scale_state():
+    """Kararlılık durumu (empty / unsettled / stable) ve son olay"""
+    return scale.get_state()
+
+@app.get("/api/scale/wait-stable")
+async def wait_scale_stable(timeout: float = 5.0):
+    """
+    Ağırlık oturana kadar bekle (long-poll) - yoklama yerine tek istekle
+    
+    Returns:
+        status: "stable" veya "timeout", weight: Kararlı (veya anlık) ağırlık
+    """
+    weight = await wait_for_stable_weight(min(timeout, 30.0))
+    if weight is None:
+        return {"status": "timeout", "weight": scale.read_weight()}
+    return {"status": "stable", "weight": weight}
+
+@app.websocket("/ws/scale-events")
+async def websocket_scale_events(websocket: WebSocket):
+    """Tartı olayları (placed / stable / unsettled / removed) - sadece olay olunca gönderilir"""
+    await websocket.accept()
+    scale.wake()
+    queue = scale_event_hub.subscribe()
+    try:
+        # Bağlanan istemci mevcut durumu hemen alsın
+        await websocket.send_json({"type": "state", **scale.get_state()})
+        while True:
+            await websocket.send_json(await queue.get())
+    except WebSocketDisconnect:
+        print("Tartı olay WebSocket bağlantısı kesildi")
+    except Exception as e:
+        print(f"WebSocket hatası: {e}")
+    finally:
+        scale_event_hub.unsubscribe(queue)
+
+# Kompakt formatta durum kodları
+WEIGHT_STATE_CODES = {"empty": 0, "unsettled": 1, "stable": 2}
+
+def encode_weight_message(sample):
+    """
+    Ağırlık mesajını her format için bir kez kodla (tartı thread'inde, yayın başına)
+    
+    json:    {"weight", "filtered", "state", "timestamp"}
+    compact: [weight, filtered, durum_kodu] (0: empty, 1: unsettled, 2: stable)
+    """
+    return {
+        "json": json.dumps({**sample, "timestamp": datetime.now().isoformat()}),
+        "compact": json.dumps(
+            [sample["weight"], sample["filtered"], WEIGHT_STATE_CODES.get(sample["state"], 1)],
+            separators=(",", ":")
+        )
+    }
 
 @app.websocket("/ws/weight")
-async def websocket_weight(websocket: WebSocket):
-    """Gerçek zamanlı ağırlık stream'i (WebSocket)"""
+async def websocket_weight(websocket: WebSocket, format: str = "json"):
+    """
+    Gerçek zamanlı ağırlık stream'i (WebSocket)
+    
+    Sadece filtrelenmiş ağırlık SCALE_STREAM_DELTA kadar değişince, kararlılık durumu
+    değişince veya SCALE_STREAM_HEARTBEAT dolunca gönderilir.
+    
+    Args:
+        format: "json" (varsayılan) veya "compact"
+    """
     await websocket.accept()
+    scale.wake()
+    message_format = "compact" if format == "compact" else "json"
+    queue = weight_hub.subscribe(replay_last=True)
     try:
         while True:
-            weight = scale.read_weight()
-            await websocket.send_json({
-                "weight": weight,
-                "timestamp": datetime.now().isoformat()
-            })
-            await asyncio.sleep(0.1)  # 10 Hz
+            message = await queue.get()
+            await websocket.send_text(message[message_format])
     except WebSocketDisconnect:
         print("WebSocket bağlantısı kesildi")
     except Exception as e:
         print(f"WebSocket hatası: {e}")
+    finally:
+        weight_hub.unsubscribe(queue)
 
 # ==================== CAMERA ====================
 
+def camera_unavailable_error():
+    """Kameradan kare alınamadığında (akış durmuş/yeniden başlıyor, önizleme açık)"""
+    return HTTPException(
+        status_code=503,
+        detail="Kamera zaman aşımı, lütfen tekrar deneyin",
+        headers={"Retry-After": "1"}
+    )
+
+def encode_jpeg(image_array, quality=85):
+    """Numpy array'i JPEG olarak BytesIO'ya kaydet"""
+    img_io = io.BytesIO()
+    Image.fromarray(image_array).save(img_io, format='JPEG', quality=quality)
+    img_io.seek(0)
+    return img_io
+
 @app.get("/api/camera/capture")
 async def capture_image():
     """Fotoğraf çek ve döndür"""
     try:
-        image_array = camera.capture_image()
-        from PIL import Image
-        
-        # Numpy array'i PIL Image'e çevir
-        pil_image = Image.fromarray(image_array)
-        
-        # BytesIO'ya kaydet
-        img_io = io.BytesIO()
-        pil_image.save(img_io, format='JPEG', quality=85)
-        img_io.seek(0)
+        # Kamera ve JPEG kodlama event loop dışında
+        image_array = await asyncio.to_thread(camera.capture_image)
+        img_io = await asyncio.to_thread(encode_jpeg, image_array)
         
         return StreamingResponse(img_io, media_type="image/jpeg")
+    except TimeoutError:
+        raise camera_unavailable_error()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Kamera hatası: {str(e)}")
 
@@ -308,6 +465,54 @@ async def stop_camera_preview():
 
 # ==================== AI & ANALYSIS ====================
 
+def inference_busy_error():
+    """Çıkarım kuyruğu doluyken döndürülecek hata (geri basınç)"""
+    return HTTPException(
+        status_code=503,
+        detail="Çıkarım kuyruğu dolu, lütfen tekrar deneyin",
+        headers={"Retry-After": "1"}
+    )
+
+def capture_scan_frame():
+    """Sürekli açık kamera akışından kare al (Frame) - bloklar, thread'de çalıştırın"""
+    try:
+        frame = camera.capture_frame()
+    except TimeoutError:
+        raise camera_unavailable_error()
+    
+    # RGB dönüşümü de bu thread'de yapılsın (sonuç karede önbelleklenir)
+    frame.to_array()
+    print(f"✅ Fotoğraf çekildi: {frame.size[0]}x{frame.size[1]} ({frame.format}, kare #{frame.sequence})")
+    return frame
+
+async def capture_and_predict(top_k=5):
+    """
+    Kare al, arşive gönder ve tahmin yap
+    
+    Pencere içinde gelen eşzamanlı çağrılar tek çekim ve tek çıkarımı paylaşır
+    (aynı kameraya birden fazla istek gitmez, sonuçlar karışmaz).
+    
+    Returns:
+        (photo_path, predictions) - çağıranlar arasında paylaşılır, değiştirmeyin
+    """
+    async def run():
+        # Sürekli açık kamera akışından kare al (bellekte, disk yok)
+        frame = await asyncio.to_thread(capture_scan_frame)
+        
+        # Fotoğrafı arka planda arşivle (isteğe bağlı)
+        photo_path = photo_archiver.submit(frame)
+        
+        # TTA açıksa kırpma/ayna görünümleri tek invoke() ile çalışır
+        if SCAN_TTA_VIEWS:
+            predictions = await inference_executor.predict_tta_async(
+                frame.to_array(), SCAN_TTA_VIEWS, top_k=top_k, center_crop=TTA_CENTER_CROP
+            )
+        else:
+            predictions = await inference_executor.predict_async(frame.to_array(), top_k=top_k)
+        return photo_path, predictions
+    
+    return await scan_flight.do(("scan", top_k), run)
+
 @app.post("/api/analyze")
 async def analyze_food(request: AnalyzeRequest):
     """Yemek analizi yap (AI + Besin Hesaplama)"""
@@ -316,10 +521,10 @@ async def analyze_food(request: AnalyzeRequest):
         speaker.play_beep()
         
         # Fotoğraf çek
-        image = camera.capture_image()
+        image = await asyncio.to_thread(camera.capture_image)
         
         # AI ile tanı
-        food_key, confidence = recognizer.recognize(image)
+        food_key, confidence = await recognizer.recognize_async(image)
         
         if not food_key:
             speaker.play_warning()
@@ -341,8 +546,7 @@ async def analyze_food(request: AnalyzeRequest):
         # BMI hesapla (profil varsa)
         bmi_data = None
         if request.profile_id:
-            profiles = db.get_all_profiles()
-            profile = next((p for p in profiles if p['id'] == request.profile_id), None)
+            profile = db.get_profile(request.profile_id)
             if profile:
                 bmi = bmi_calc.calculate(profile['weight'], profile['height'])
                 bmi_comment = bmi_calc.get_comment(bmi, 30)  # Yaş varsayılan
@@ -359,31 +563,62 @@ async def analyze_food(request: AnalyzeRequest):
             "bmi": bmi_data
         }
     
+    except InferenceQueueFull:
+        raise inference_busy_error()
+    except TimeoutError:
+        raise camera_unavailable_error()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/model-test")
-async def test_model(file: UploadFile = File(...)):
+async def test_model(file: List[UploadFile] = File(...), aggregate: bool = True, tta: bool = False):
     """
-    Model test endpoint - model_float16.tflite ile görüntü analizi
+    Model test endpoint - paylaşılan TFLite model ile görüntü analizi
     
     Args:
-        file: Yüklenen görüntü dosyası (multipart/form-data)
+        file: Yüklenen görüntü dosyası (multipart/form-data) - aynı alanla birden fazla
+              dosya gönderilirse hepsi tek invoke() ile çalışır
+        aggregate: Birden fazla dosyada olasılıkların ortalamasıyla tek sonuç (aynı tabak);
+                   False ise dosya başına sonuç ("results")
+        tta: Tek dosyada kırpma/ayna görünümleriyle tahmin (test-time augmentation)
     
     Returns:
         Top 5 tahmin ve güven skorları (class_indices.json kullanarak)
     """
     try:
         # TFLite model kontrolü
-        if tflite_predictor is None:
+        if inference_executor is None:
             raise HTTPException(status_code=503, detail="TFLite model yüklenmedi")
-        
-        # Dosya içeriğini oku
-        contents = await file.read()
-        print(f"📸 Görüntü yüklendi: {len(contents)} bytes, dosya: {file.filename}")
+        if len(file) > MODEL_TEST_MAX_FILES:
+            raise HTTPException(status_code=400, detail=f"En fazla {MODEL_TEST_MAX_FILES} dosya gönderilebilir")
+        
+        # Dosya içeriklerini oku
+        contents = []
+        for upload in file:
+            contents.append(await upload.read())
+            print(f"📸 Görüntü yüklendi: {len(contents[-1])} bytes, dosya: {upload.filename}")
+        
+        # Dosya başına sonuç
+        if len(contents) > 1 and not aggregate:
+            batch_predictions = await inference_executor.predict_batch_async(contents, top_k=5, aggregate=False)
+            return {
+                "status": "success",
+                "model": inference_executor.model_name,
+                "results": [
+                    {"filename": upload.filename, "predictions": predictions.to_list()}
+                    for upload, predictions in zip(file, batch_predictions)
+                ]
+            }
         
         # TFLite predictor ile tahmin yap (top 5)
-        predictions = tflite_predictor.predict(contents, top_k=5)
+        if len(contents) > 1:
+            predictions = await inference_executor.predict_batch_async(contents, top_k=5)
+        elif tta:
+            predictions = await inference_executor.predict_tta_async(
+                contents[0], ["full", "flip", "center", "center_flip"], top_k=5, center_crop=TTA_CENTER_CROP
+            )
+        else:
+            predictions = await inference_executor.predict_async(contents[0], top_k=5)
         
         if not predictions:
             return {
@@ -393,21 +628,18 @@ async def test_model(file: UploadFile = File(...)):
             }
         
         # Sonuçları formatla
-        results = []
-        for pred in predictions:
-            results.append({
-                "food_name": pred['class'],
-                "confidence": pred['confidence'],
-                "percentage": pred['percentage']
-            })
+        results = predictions.to_list()
         
         return {
             "status": "success",
-            "model": "model_float16.tflite",
+            "model": inference_executor.model_name,
+            "images": len(contents),
             "predictions": results,
             "top_match": results[0] if results else None
         }
     
+    except InferenceQueueFull:
+        raise inference_busy_error()
     except HTTPException:
         raise
     except Exception as e:
@@ -427,57 +659,12 @@ async def capture_and_analyze():
     """
     try:
         # TFLite model kontrolü
-        if tflite_predictor is None:
+        if inference_executor is None:
             raise HTTPException(status_code=503, detail="TFLite model yüklenmedi")
         
-        # Fotoğraf dosya yolu (backend klasörü içinde)
-        photo_path = os.path.join(backend_dir, "foto.jpg")
-        
-        # rpicam-still komutu ile fotoğraf çek (arka planda, önizleme yok)
-        print(f"📸 Fotoğraf çekiliyor: {photo_path}")
-        
-        cmd = [
-            "rpicam-still",
-            "--nopreview",  # Önizleme gösterme
-            "--mode", "3280:2464",
-            "--roi", "0,0,1,1",
-            "--autofocus-mode", "auto",
-            "--autofocus-on-capture",
-            "--denoise", "off",
-            "--tuning-file", "/usr/share/libcamera/ipa/rpi/vc4/imx219_noir.json",
-            "--sharpness", "2.0",
-            "--contrast", "1.15",
-            "-o", photo_path
-        ]
-        
-        try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=10,
-                check=True
-            )
-            print(f"✅ Fotoğraf çekildi: {photo_path}")
-            print(f"   Çıktı: {result.stdout}")
-        except subprocess.TimeoutExpired:
-            raise HTTPException(status_code=500, detail="Kamera zaman aşımı (10 saniye)")
-        except subprocess.CalledProcessError as e:
-            print(f"❌ rpicam-still hatası: {e.stderr}")
-            raise HTTPException(status_code=500, detail=f"Kamera hatası: {e.stderr}")
-        except FileNotFoundError:
-            print("⚠️ rpicam-still bulunamadı, mock mode")
-            # Mock mode - test için boş bir görsel oluştur
-            img = Image.new('RGB', (224, 224), color='gray')
-            img.save(photo_path)
-        
-        # Fotoğrafın var olduğunu kontrol et
-        if not os.path.exists(photo_path):
-            raise HTTPException(status_code=500, detail="Fotoğraf oluşturulamadı")
-        
-        # Model ile tahmin yap
-        print(f"🔍 Model analizi yapılıyor...")
-        predictions = tflite_predictor.predict(photo_path, top_k=5)
+        # Fotoğraf çek + model ile tahmin yap (eşzamanlı istekler birleştirilir)
+        print(f"📸 Fotoğraf çekiliyor ve analiz ediliyor...")
+        photo_path, predictions = await capture_and_predict()
         
         if not predictions:
             return {
@@ -487,24 +674,20 @@ async def capture_and_analyze():
             }
         
         # Sonuçları formatla
-        results = []
-        for pred in predictions:
-            results.append({
-                "food_name": pred['class'],
-                "confidence": pred['confidence'],
-                "percentage": pred['percentage']
-            })
+        results = predictions.to_list()
         
         print(f"✅ Analiz tamamlandı. En yüksek tahmin: {results[0]['food_name']} (%{results[0]['percentage']:.1f})")
         
         return {
             "status": "success",
-            "model": "model_float16.tflite",
+            "model": inference_executor.model_name,
             "photo_path": photo_path,
             "predictions": results,
             "top_match": results[0] if results else None
         }
     
+    except InferenceQueueFull:
+        raise inference_busy_error()
     except HTTPException:
         raise
     except Exception as e:
@@ -526,15 +709,16 @@ async def scan_complete(request: ScanCompleteRequest):
         Ağırlık, tahmin edilen yemek, ve hesaplanmış besin değerleri
     """
     try:
-        # 1. Ağırlık ölç
-        total_weight = scale.read_weight()
-        print(f"📊 Ölçülen toplam ağırlık: {total_weight}g")
+        # 1. Ağırlık ölç (oturmasını bekle, zaman aşımında anlık değer)
+        stable_weight = await wait_for_stable_weight(SCAN_STABLE_TIMEOUT)
+        weight_stable = stable_weight is not None
+        total_weight = round(stable_weight) if weight_stable else scale.read_weight()
+        print(f"📊 Ölçülen toplam ağırlık: {total_weight}g ({'kararlı' if weight_stable else 'kararsız'})")
         
         # Tabak ağırlığını çıkar (eğer seçilmişse)
         plate_weight = 0
         if request.plate_id:
-            plates = db.get_all_plates()
-            plate = next((p for p in plates if p['id'] == request.plate_id), None)
+            plate = db.get_plate(request.plate_id)
             if plate:
                 plate_weight = plate['weight']
                 print(f"🍽️ Tabak ağırlığı: {plate_weight}g")
@@ -550,105 +734,35 @@ async def scan_complete(request: ScanCompleteRequest):
         print(f"📸 Fotoğraf çekiliyor ve analiz ediliyor...")
         
         # TFLite model kontrolü
-        if tflite_predictor is None:
+        if inference_executor is None:
             raise HTTPException(status_code=503, detail="TFLite model yüklenmedi")
         
-        # Fotoğraf dosya yolu (backend klasörü içinde)
-        photo_path = os.path.join(backend_dir, "foto.jpg")
-        
-        # rpicam-still komutu ile fotoğraf çek (arka planda, önizleme yok)
-        cmd = [
-            "rpicam-still",
-            "--nopreview",  # Önizleme gösterme
-            "--mode", "3280:2464",
-            "--roi", "0,0,1,1",
-            "--autofocus-mode", "auto",
-            "--autofocus-on-capture",
-            "--denoise", "off",
-            "--tuning-file", "/usr/share/libcamera/ipa/rpi/vc4/imx219_noir.json",
-            "--sharpness", "2.0",
-            "--contrast", "1.15",
-            "-o", photo_path
-        ]
-        
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10, check=True)
-            print(f"✅ Fotoğraf çekildi: {photo_path}")
-        except subprocess.TimeoutExpired:
-            raise HTTPException(status_code=500, detail="Kamera zaman aşımı")
-        except subprocess.CalledProcessError as e:
-            print(f"❌ rpicam-still hatası: {e.stderr}")
-            raise HTTPException(status_code=500, detail=f"Kamera hatası: {e.stderr}")
-        except FileNotFoundError:
-            print("⚠️ rpicam-still bulunamadı, mock mode")
-            img = Image.new('RGB', (224, 224), color='gray')
-            img.save(photo_path)
-        
-        # Fotoğrafın var olduğunu kontrol et
-        if not os.path.exists(photo_path):
-            raise HTTPException(status_code=500, detail="Fotoğraf oluşturulamadı")
-        
-        # 3. Model ile tahmin yap
-        predictions = tflite_predictor.predict(photo_path, top_k=5)
+        # 3. Fotoğraf çek + model ile tahmin yap (eşzamanlı istekler birleştirilir)
+        photo_path, predictions = await capture_and_predict()
         
         if not predictions:
             raise HTTPException(status_code=500, detail="Model tahmin yapamadı")
         
-        top_prediction = predictions[0]
-        food_name = top_prediction['class']
+        # Sonuçları formatla
+        all_predictions = predictions.to_list()
+        top_prediction = all_predictions[0]
+        food_name = top_prediction['food_name']
         confidence = top_prediction['confidence']
         
         print(f"🍽️ Tahmin edilen yemek: {food_name} (%{top_prediction['percentage']:.1f})")
         
-        # 4. Besin değerlerini yükle (datas.json)
-        nutrition_db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "datas.json")
-        
-        with open(nutrition_db_path, 'r', encoding='utf-8') as f:
-            nutrition_db = json.load(f)
-        
-        # 5. Yemek için besin değerlerini bul
-        if food_name not in nutrition_db:
-            print(f"⚠️ {food_name} için besin değeri bulunamadı, varsayılan değerler kullanılıyor")
-            base_nutrition = {
-                "name": food_name,
-                "calorie": 150,
-                "protein": 5.0,
-                "carbohydrate": 20.0,
-                "sugar": 5.0
-            }
-        else:
-            base_nutrition = nutrition_db[food_name]
-        
-        # 6. Ağırlığa göre besin değerlerini hesapla (100g bazında)
-        weight_ratio = weight / 100.0
-        
-        calculated_nutrition = {
-            "name": food_name,
-            "weight": weight,
-            "calorie": round(base_nutrition["calorie"] * weight_ratio, 1),
-            "protein": round(base_nutrition["protein"] * weight_ratio, 1),
-            "carbohydrate": round(base_nutrition["carbohydrate"] * weight_ratio, 1),
-            "sugar": round(base_nutrition.get("sugar", 0) * weight_ratio, 1),
-            "base_values_per_100g": base_nutrition
-        }
+        # 4. Ağırlığa göre besin değerlerini hesapla (sınıf indeksine hizalı tablo, 100g bazında)
+        calculated_nutrition = predictions.nutrition(weight)
         
         print(f"📊 Hesaplanan besin değerleri:")
         print(f"   Kalori: {calculated_nutrition['calorie']} kcal")
         print(f"   Protein: {calculated_nutrition['protein']}g")
         print(f"   Karbonhidrat: {calculated_nutrition['carbohydrate']}g")
         
-        # 7. Tüm tahminleri formatla
-        all_predictions = []
-        for pred in predictions:
-            all_predictions.append({
-                "food_name": pred['class'],
-                "confidence": pred['confidence'],
-                "percentage": pred['percentage']
-            })
-        
         return {
             "status": "success",
             "weight": weight,
+            "weight_stable": weight_stable,
             "food_name": food_name,
             "confidence": confidence,
             "percentage": top_prediction['percentage'],
@@ -658,6 +772,8 @@ async def scan_complete(request: ScanCompleteRequest):
             "timestamp": datetime.now().isoformat()
         }
     
+    except InferenceQueueFull:
+        raise inference_busy_error()
     except HTTPException:
         raise
     except Exception as e:
@@ -667,6 +783,36 @@ async def scan_complete(request: ScanCompleteRequest):
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Scan complete hatası: {error_detail}")
 
+@app.get("/api/ai/benchmark")
+async def get_model_benchmark():
+    """Kayıtlı interpreter benchmark sonuçları ve aktif ayar"""
+    if tflite_predictor is None:
+        raise HTTPException(status_code=503, detail="TFLite model yüklenmedi")
+    
+    return {
+        "model": tflite_predictor.model_name,
+        "current": tflite_predictor.interpreter_options,
+        "recorded": load_results(benchmark_path, tflite_predictor.model_name)
+    }
+
+@app.post("/api/ai/benchmark")
+async def run_model_benchmark():
+    """
+    Interpreter benchmark'ını yeniden çalıştır (sonuç bir sonraki açılışta uygulanır)
+    
+    Ölçüm süresince çıkarım worker'ları duraklatılır (CPU'yu paylaşıp süreleri
+    bozmasınlar); gelen tahmin istekleri kuyrukta bekler, kuyruk dolarsa reddedilir.
+    """
+    if tflite_predictor is None:
+        raise HTTPException(status_code=503, detail="TFLite model yüklenmedi")
+    
+    def run():
+        with inference_executor.paused():
+            return benchmark_model()
+    
+    results = await asyncio.to_thread(run)
+    return {"status": "success", "model": tflite_predictor.model_name, "results": results}
+
 # ==================== PROFILES ====================
 
 @app.get("/api/profiles")
@@ -708,25 +854,35 @@ async def delete_profile(profile_id: int):
     return {"status": "success"}
 
 @app.get("/api/profiles/{profile_id}/history")
-async def get_profile_history(profile_id: int):
-    """Profil geçmiş taramalarını getir"""
+async def get_profile_history(profile_id: int, limit: Optional[int] = None, before: Optional[str] = None,
+                              since: Optional[str] = None, until: Optional[str] = None):
+    """
+    Profil geçmiş taramalarını getir (en yeni en üstte)
+    
+    Args:
+        limit: Sayfa boyutu (verilmezse tüm geçmiş)
+        before: Sonraki sayfa için önceki yanıtın next_cursor değeri
+        since, until: Tarih aralığı (ISO, until hariç) - örn. since=2026-01-01&until=2026-02-01
+    """
     try:
         # Profil bilgisini al
-        profiles = db.get_all_profiles()
-        profile = next((p for p in profiles if p['id'] == profile_id), None)
+        profile = db.get_profile(profile_id)
         
         if not profile:
             raise HTTPException(status_code=404, detail="Profil bulunamadı")
+        if limit is not None and limit < 1:
+            raise HTTPException(status_code=400, detail="limit en az 1 olmalı")
         
-        # Ölçümleri al
-        measurements = db.get_measurements_by_user(profile_id)
-        
-        # Tarihe göre sırala (en yeni en üstte)
-        measurements.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
+        # Ölçümler (user_id, timestamp) indeksinden, sıralama yapılmadan
+        try:
+            measurements, next_cursor = db.query_measurements(profile_id, since, until, before, limit)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Geçersiz tarih veya imleç: {e}")
         
         return {
             "profile_name": profile['name'],
-            "history": measurements
+            "history": measurements,
+            "next_cursor": next_cursor
         }
     except HTTPException:
         raise
@@ -734,6 +890,24 @@ async def get_profile_history(profile_id: int):
         print(f"❌ Geçmiş yükleme hatası: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/profiles/{profile_id}/summary")
+async def get_profile_summary(profile_id: int, period: str = "day",
+                              since: Optional[str] = None, until: Optional[str] = None):
+    """
+    Profilin günlük/haftalık besin toplamları (kalori, protein, karbonhidrat, şeker, ölçüm sayısı)
+    
+    Args:
+        period: "day" veya "week" (ISO hafta)
+        since, until: ISO tarih, ikisi de dahil - varsayılan son 7 gün / bu hafta
+    """
+    if db.get_profile(profile_id) is None:
+        raise HTTPException(status_code=404, detail="Profil bulunamadı")
+    try:
+        summary = db.get_nutrition_summary(profile_id, period, since, until)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"profile_id": profile_id, **summary}
+
 # ==================== PLATES ====================
 
 @app.get("/api/plates")
@@ -771,10 +945,23 @@ async def save_measurement(request: SaveMeasurementRequest):
     return {"status": "success" if success else "failed"}
 
 @app.get("/api/measurements")
-async def get_measurements():
-    """Tüm ölçümleri getir"""
-    measurements = db.load_json("measurements.json", {"measurements": []})
-    return measurements
+async def get_measurements(user_id: Optional[int] = None, limit: Optional[int] = None, before: Optional[str] = None,
+                           since: Optional[str] = None, until: Optional[str] = None):
+    """
+    Ölçümleri getir
+    
+    Parametresiz: tüm ölçümler (eskiden yeniye). Herhangi bir filtre veya limit
+    verilirse en yeniden eskiye sayfa ve sonraki sayfa için next_cursor döner.
+    """
+    if user_id is None and limit is None and before is None and since is None and until is None:
+        return {"measurements": db.get_all_measurements()}
+    if limit is not None and limit < 1:
+        raise HTTPException(status_code=400, detail="limit en az 1 olmalı")
+    try:
+        measurements, next_cursor = db.query_measurements(user_id, since, until, before, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Geçersiz tarih veya imleç: {e}")
+    return {"measurements": measurements, "next_cursor": next_cursor}
 
 # ==================== SETTINGS ====================
 
@@ -854,6 +1041,18 @@ async def get_battery():
 async def startup_event():
     """Uygulama başlangıcı"""
     print("🚀 Nutriquant Backend başlatıldı")
+    
+    # Tartı yayınlarını event loop'a aktar
+    loop = asyncio.get_running_loop()
+    weight_hub.attach(loop)
+    scale_event_hub.attach(loop)
+    scale.add_weight_listener(lambda sample: weight_hub.publish_threadsafe(encode_weight_message(sample)))
+    scale.add_listener(scale_event_hub.publish_threadsafe)
+    
+    # Canlı ağırlık/olay izleyen istemci varken (veya adaptördeyken) tartı tam hızda kalır
+    scale.add_demand_source(lambda: bool(weight_hub.subscribers or scale_event_hub.subscribers))
+    if not SCALE_POWER_SAVE_ON_MAINS:
+        scale.add_demand_source(battery.is_charging)
     print(f"   Scale Mode: {scale.mode}")
     print(f"   Camera Mode: {'Mock' if camera.mock_mode else 'Real'}")
 
@@ -863,6 +1062,10 @@ async def shutdown_event():
     print("🛑 Nutriquant Backend kapatılıyor...")
     scale.cleanup()
     camera.cleanup()
+    photo_archiver.stop()
+    if inference_executor is not None:
+        inference_executor.shutdown()
+    db.close()
 
 # ==================== MAIN ====================
 